@@ -1,10 +1,10 @@
 # app.py
 import gradio as gr
 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
-from gtts import gTTS
-import speech_recognition as sr
-import tempfile
 import os
+from backend.decoding import PROFILE_NAMES, DEFAULT_PROFILE, validate_profile, auto_profile, profile_generation
+from backend.tts_cache import TTSCache, load_synthesizer
+from backend.speech import load_recognizer, SpeechNotUnderstood, SpeechServiceError
 
 # ✅ Load translation model
 model_name = "facebook/nllb-200-distilled-600M"
@@ -14,38 +14,42 @@ model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
 src_lang = "eng_Latn"
 tgt_lang = "hin_Deva"
 
+# ✅ Spoken translations are cached on disk (bounded, LRU) instead of one temp file per click
+tts_cache = TTSCache(
+    os.getenv("TTS_CACHE_DIR", "tts_cache"),
+    max_bytes=int(float(os.getenv("TTS_CACHE_MAX_MB", "200")) * 2**20),
+    synthesizer=load_synthesizer(os.getenv("TTS_ENGINE", "gtts"))
+)
+recognizer = load_recognizer(os.getenv("SPEECH_ENGINE", "google"))
+
 # Translate English text → Hindi + Audio
-def translate_to_hindi(text):
+def translate_to_hindi(text, profile=DEFAULT_PROFILE):
     if not text.strip():
         return "Please enter or speak English text.", None
+    profile = validate_profile(profile)
+    if profile == "auto":
+        profile = auto_profile(text)
     tokenizer.src_lang = src_lang
     encoded = tokenizer(text, return_tensors="pt")
     generated_tokens = model.generate(
         **encoded,
         forced_bos_token_id=tokenizer.convert_tokens_to_ids(tgt_lang),
-        max_length=256,
-        num_beams=5
+        **profile_generation(profile, encoded["input_ids"].shape[1])
     )
     translated = tokenizer.batch_decode(generated_tokens, skip_special_tokens=True)[0]
 
     # Convert translated Hindi text to speech
-    tts = gTTS(translated, lang="hi")
-    tmp_path = tempfile.mktemp(suffix=".mp3")
-    tts.save(tmp_path)
+    _, audio_path = tts_cache.get_or_synthesize(translated, lang="hi")
 
-    return translated, tmp_path
+    return translated, audio_path
 
 # 🎙️ Recognize speech from mic
 def recognize_speech_from_mic(audio_file):
-    recognizer = sr.Recognizer()
-    with sr.AudioFile(audio_file) as source:
-        audio_data = recognizer.record(source)
     try:
-        text = recognizer.recognize_google(audio_data)
-        return text
-    except sr.UnknownValueError:
+        return recognizer.transcribe(audio_file)
+    except SpeechNotUnderstood:
         return "Sorry, I couldn't understand your voice. Please try again."
-    except sr.RequestError:
+    except SpeechServiceError:
         return "Speech recognition service unavailable. Check your internet."
 
 # 🌐 Build Gradio App
@@ -57,12 +61,13 @@ with gr.Blocks(title="English → Hindi Translator with Voice") as demo:
         mic_input = gr.Audio(sources=["microphone"], type="filepath", label="🎤 Speak English")
 
 
+    profile_input = gr.Radio(PROFILE_NAMES, value=DEFAULT_PROFILE, label="Decoding profile")
     translate_button = gr.Button("Translate")
     hindi_output = gr.Textbox(label="Hindi Translation")
     audio_output = gr.Audio(label="Listen to Hindi pronunciation")
 
     # Connect events
-    translate_button.click(fn=translate_to_hindi, inputs=text_input, outputs=[hindi_output, audio_output])
+    translate_button.click(fn=translate_to_hindi, inputs=[text_input, profile_input], outputs=[hindi_output, audio_output])
     mic_input.change(fn=recognize_speech_from_mic, inputs=mic_input, outputs=text_input)
 
 if __name__ == "__main__":
@@ -0,0 +1,99 @@
+# ------------------------------------------------------------
+# batching.py — Dynamic micro-batching for concurrent translations
+# ------------------------------------------------------------
+import threading
+import queue
+import time
+from collections import Counter
+from concurrent.futures import Future
+
+import tracing
+
+
+class BatchScheduler:
+    """
+    Collects concurrent requests for one model and runs them as a single batch.
+
+    Callers `submit()` an item and block on the returned Future. A worker thread
+    waits for the first item, keeps collecting until `window_ms` has elapsed or
+    `max_batch_size` items are queued, then hands the whole batch to `run_batch`
+    and fans the results back out in submission order.
+    """
+
+    def __init__(self, name, run_batch, window_ms=10, max_batch_size=8):
+        self.name = name
+        self._run_batch = run_batch
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._total_batches = 0
+        self._total_items = 0
+        self._worker = threading.Thread(target=self._loop, name=f"batcher-{name}", daemon=True)
+        self._worker.start()
+
+    def configure(self, window_ms=None, max_batch_size=None):
+        """Adjust the batching window and/or maximum batch size at runtime."""
+        if window_ms is not None:
+            self.window_ms = max(0.0, float(window_ms))
+        if max_batch_size is not None:
+            self.max_batch_size = max(1, int(max_batch_size))
+
+    def submit(self, item):
+        """Queue an item for the next batch and return a Future for its result."""
+        future = Future()
+        self._queue.put((item, future, tracing.active_traces()))
+        return future
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window_ms / 1000.0
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            items = [item for item, _, _ in batch]
+            # Stages of the shared generate call count towards every request in the batch
+            traces = {trace for _, _, item_traces in batch for trace in item_traces}
+            try:
+                with tracing.activate(traces):
+                    results = list(tracing.call(self._run_batch, items))
+                if len(results) != len(batch):
+                    raise RuntimeError(
+                        f"Batch '{self.name}' returned {len(results)} results for {len(batch)} requests"
+                    )
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+            else:
+                for (_, future, _), result in zip(batch, results):
+                    future.set_result(result)
+            with self._lock:
+                self._batch_sizes[len(batch)] += 1
+                self._total_batches += 1
+                self._total_items += len(batch)
+
+    def stats(self):
+        """Return the batching configuration and achieved batch sizes."""
+        with self._lock:
+            return {
+                "window_ms": self.window_ms,
+                "max_batch_size": self.max_batch_size,
+                "queued": self._queue.qsize(),
+                "total_batches": self._total_batches,
+                "total_requests": self._total_items,
+                "average_batch_size": round(self._total_items / self._total_batches, 2)
+                if self._total_batches else 0.0,
+                "max_batch_size_seen": max(self._batch_sizes) if self._batch_sizes else 0,
+                "batch_size_histogram": {str(k): v for k, v in sorted(self._batch_sizes.items())}
+            }
@@ -0,0 +1,329 @@
+# ------------------------------------------------------------
+# benchmark.py — Offline load test with tiny stand-in models
+# ------------------------------------------------------------
+# Drives the FastAPI app with a concurrent load generator and reports
+# throughput and p50/p95/p99 latency per endpoint. By default every
+# MODEL_REGISTRY entry is replaced by a tiny randomly-initialised seq2seq model
+# and word-level tokenizer built locally, so the suite runs fully offline and
+# measures the serving path (queueing, batching, tokenization, scoring) rather
+# than network or checkpoint downloads.
+#
+# Usage:
+#   python benchmark.py [--requests file.jsonl] [--concurrency 16] [--rounds 5]
+#                       [--output result.json] [--compare previous.json]
+#                       [--real-models] [--url http://localhost:8000]
+#
+# Request files are JSONL, one request per line:
+#   {"path": "/translate", "params": {"model": "nllb"}, "json": {"text": "Hello"}}
+# A line with only "text" (or "english") becomes a POST /translate for --model.
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+# Keep every request doing real work and nothing touching the network or disk
+os.environ.setdefault("TRANSLATION_CACHE_ENABLED", "0")
+os.environ.setdefault("TRANSLATION_CACHE_DB", "")
+os.environ.setdefault("HISTORY_DB", "")
+os.environ.setdefault("TM_ENABLED", "0")
+os.environ.setdefault("TM_DB", "")
+os.environ.setdefault("QUANTIZED_MODELS", "")
+os.environ.setdefault("MODEL_BACKENDS", "")
+os.environ.setdefault("PRELOAD_MODELS", "")
+
+STANDIN_SEED = 0
+
+
+# ------------------------------------------------------------
+# 🧪 Tiny Stand-in Model, Tokenizer and Sentence Encoder
+# ------------------------------------------------------------
+def build_standin_tokenizer(texts, extra_tokens=()):
+    """Word-level fast tokenizer over the whitespace tokens of `texts` plus `extra_tokens`."""
+    from tokenizers import Tokenizer, models, pre_tokenizers, processors
+    from transformers import PreTrainedTokenizerFast
+
+    specials = ["<pad>", "</s>", "<unk>"]
+    words = sorted({word for text in texts for word in text.split()} | set(extra_tokens))
+    vocab = {token: i for i, token in enumerate(specials + [w for w in words if w not in specials])}
+
+    backend = Tokenizer(models.WordLevel(vocab=vocab, unk_token="<unk>"))
+    backend.pre_tokenizer = pre_tokenizers.WhitespaceSplit()
+    backend.post_processor = processors.TemplateProcessing(
+        single="$A </s>", special_tokens=[("</s>", vocab["</s>"])]
+    )
+    return PreTrainedTokenizerFast(
+        tokenizer_object=backend, pad_token="<pad>", eos_token="</s>", unk_token="<unk>"
+    )
+
+
+def build_standin_model(tokenizer, seed=STANDIN_SEED):
+    """A 1-layer Marian-architecture seq2seq model with random weights, sized to `tokenizer`."""
+    import torch
+    from transformers import MarianConfig, MarianMTModel
+
+    torch.manual_seed(seed)
+    config = MarianConfig(
+        vocab_size=len(tokenizer),
+        d_model=64,
+        encoder_layers=1,
+        decoder_layers=1,
+        encoder_attention_heads=2,
+        decoder_attention_heads=2,
+        encoder_ffn_dim=128,
+        decoder_ffn_dim=128,
+        max_position_embeddings=512,
+        pad_token_id=tokenizer.pad_token_id,
+        eos_token_id=tokenizer.eos_token_id,
+        decoder_start_token_id=tokenizer.pad_token_id,
+        forced_eos_token_id=tokenizer.eos_token_id
+    )
+    model = MarianMTModel(config)
+    model.eval()
+    model.requires_grad_(False)
+    return model
+
+
+class HashingEncoder:
+    """Stand-in for the sentence-transformer: hashed character trigrams, L2-normalised."""
+
+    def __init__(self, dim=256):
+        self.dim = dim
+
+    def _embed(self, text):
+        import numpy as np
+        vector = np.zeros(self.dim, dtype=np.float32)
+        padded = f"  {text.lower()} "
+        for i in range(len(padded) - 2):
+            digest = hashlib.md5(padded[i:i + 3].encode("utf-8")).digest()
+            vector[int.from_bytes(digest[:4], "little") % self.dim] += 1.0
+        return vector
+
+    def encode(self, texts, convert_to_numpy=True, normalize_embeddings=True):
+        import numpy as np
+        single = isinstance(texts, str)
+        matrix = np.stack([self._embed(t) for t in ([texts] if single else texts)])
+        if normalize_embeddings:
+            matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        return matrix[0] if single else matrix
+
+
+def install_standin_models(texts):
+    """Registers a stand-in (tokenizer, model) as resident for every MODEL_REGISTRY entry."""
+    import model_manager
+
+    lang_tokens = set()
+    for key, codes in model_manager.LANGUAGE_CODES.items():
+        for code in codes.values():
+            if code:
+                lang_tokens.update((code, f"__{code}__"))
+    tokenizer = build_standin_tokenizer(texts, extra_tokens=lang_tokens)
+
+    for i, model_key in enumerate(model_manager.MODEL_REGISTRY):
+        if model_key == "gru":
+            continue
+        model = build_standin_model(tokenizer, seed=STANDIN_SEED + i)
+        model_manager.residency.pinned.add(model_key)
+        model_manager.residency.register(
+            model_key, (tokenizer, model), model_manager.model_footprint_bytes(model)
+        )
+    print(f"[OK] Stand-in models installed (vocab={len(tokenizer)})")
+
+
+def install_standin_reference_index(app_module):
+    from reference_index import ReferenceIndex
+    index = ReferenceIndex(HashingEncoder(), "benchmark-hashing")
+    index.build(app_module.EVALUATION_DATASET)
+    app_module.reference_index = index
+
+
+# ------------------------------------------------------------
+# 📋 Workload
+# ------------------------------------------------------------
+def load_requests(path, default_model="nllb"):
+    requests = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if "path" not in record:
+                text = record.get("text") or record.get("english") or record.get("body", "")
+                record = {"path": "/translate", "params": {"model": default_model}, "json": {"text": text}}
+            record.setdefault("method", "POST")
+            record.setdefault("params", {})
+            requests.append(record)
+    return requests
+
+
+def default_requests(sentences, model="nllb"):
+    """A mixed workload over the built-in dataset: single, inline-scored and bulk translations."""
+    requests = []
+    for text in sentences:
+        requests.append({"method": "POST", "path": "/translate", "params": {"model": model}, "json": {"text": text}})
+    for text in sentences[::4]:
+        requests.append({"method": "POST", "path": "/translate",
+                         "params": {"model": model, "inline_scores": "true"}, "json": {"text": text}})
+    for start in range(0, len(sentences), 8):
+        requests.append({"method": "POST", "path": "/translate/batch", "params": {"model": model},
+                         "json": {"texts": sentences[start:start + 8]}})
+    return requests
+
+
+def request_texts(requests):
+    texts = []
+    for record in requests:
+        body = record.get("json") or {}
+        if body.get("text"):
+            texts.append(body["text"])
+        texts.extend(body.get("texts", []))
+    return texts
+
+
+# ------------------------------------------------------------
+# 🚦 Load Generator & Report
+# ------------------------------------------------------------
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    rank = q * (len(sorted_values) - 1)
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def make_sender(url=None):
+    """Returns send(record) -> status code, over HTTP (`url`) or in-process via TestClient."""
+    if url:
+        import urllib.error
+        import urllib.parse
+        import urllib.request
+
+        def send(record):
+            query = urllib.parse.urlencode(record["params"])
+            data = json.dumps(record.get("json")).encode("utf-8") if record.get("json") is not None else None
+            req = urllib.request.Request(
+                f"{url.rstrip('/')}{record['path']}?{query}", data=data, method=record["method"],
+                headers={"Content-Type": "application/json"}
+            )
+            try:
+                with urllib.request.urlopen(req, timeout=300) as response:
+                    response.read()
+                    return response.status
+            except urllib.error.HTTPError as e:
+                return e.code
+        return send
+
+    from fastapi.testclient import TestClient
+    import main
+    client = TestClient(main.app)
+
+    def send(record):
+        response = client.request(record["method"], record["path"], params=record["params"], json=record.get("json"))
+        return response.status_code
+    return send
+
+
+def run_load(send, requests, concurrency=16, rounds=5, warmup=True):
+    if warmup:
+        for record in requests[:min(len(requests), concurrency)]:
+            send(record)
+
+    workload = requests * rounds
+    samples = defaultdict(list)
+    errors = defaultdict(int)
+
+    def timed(record):
+        start = time.perf_counter()
+        status = send(record)
+        return record["path"], status, time.perf_counter() - start
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for path, status, seconds in pool.map(timed, workload):
+            samples[path].append(seconds)
+            if status >= 400:
+                errors[path] += 1
+    wall = time.perf_counter() - started
+
+    report = {"concurrency": concurrency, "requests": len(workload), "wall_seconds": round(wall, 3),
+              "throughput_rps": round(len(workload) / wall, 2) if wall else 0.0, "endpoints": {}}
+    for path, latencies in sorted(samples.items()):
+        latencies.sort()
+        report["endpoints"][path] = {
+            "requests": len(latencies),
+            "errors": errors[path],
+            "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+            "max_ms": round(latencies[-1] * 1000, 2)
+        }
+    return report
+
+
+def print_report(report, previous=None):
+    print(f"\n{report['requests']} requests, concurrency {report['concurrency']}: "
+          f"{report['throughput_rps']} req/s over {report['wall_seconds']}s")
+    header = f"{'endpoint':<20}{'reqs':>7}{'errs':>6}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for path, row in report["endpoints"].items():
+        print(f"{path:<20}{row['requests']:>7}{row['errors']:>6}{row['throughput_rps']:>9}"
+              f"{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}")
+        old = (previous or {}).get("endpoints", {}).get(path)
+        if old:
+            deltas = []
+            for field in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+                if old[field]:
+                    deltas.append(f"{field} {100 * (row[field] - old[field]) / old[field]:+.1f}%")
+            print(f"{'':<20}vs previous: " + ", ".join(deltas))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline throughput/latency benchmark for the translation API")
+    parser.add_argument("--requests", help="JSONL request file to replay (default: built-in dataset mix)")
+    parser.add_argument("--model", default="nllb", help="Model for text-only request lines and the default mix")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=5, help="Times the request list is replayed")
+    parser.add_argument("--output", help="Write the report as JSON (for later --compare)")
+    parser.add_argument("--compare", help="Previous JSON report to diff against")
+    parser.add_argument("--real-models", action="store_true", help="Use the real MODEL_REGISTRY checkpoints")
+    parser.add_argument("--url", help="Benchmark a running server instead of the in-process app")
+    args = parser.parse_args(argv)
+
+    if args.requests:
+        requests = load_requests(args.requests, args.model)
+    else:
+        from evaluation import EVALUATION_DATASET
+        requests = default_requests([pair["english"] for pair in EVALUATION_DATASET], args.model)
+
+    if not args.url and not args.real_models:
+        os.environ.setdefault("HF_HUB_OFFLINE", "1")
+        import main as app_module
+        install_standin_models(request_texts(requests))
+        install_standin_reference_index(app_module)
+
+    report = run_load(make_sender(args.url), requests, args.concurrency, args.rounds)
+    report["standin_models"] = not (args.url or args.real_models)
+
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+    print_report(report, previous)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n[OK] Report written to {args.output}")
+    return report
+
+
+if __name__ == "__main__":
+    report = main()
+    sys.exit(1 if any(row["errors"] for row in report["endpoints"].values()) else 0)
@@ -0,0 +1,106 @@
+# ------------------------------------------------------------
+# decoding.py — Named decoding profiles (fast / balanced / quality / auto)
+# ------------------------------------------------------------
+# Kept free of model imports so the standalone scripts (model_loader.py, the
+# Gradio app.py) can share the same profiles.
+#
+# Usage (latency/BLEU tradeoff per profile on the evaluation set):
+#   python decoding.py nllb
+import math
+import os
+import sys
+import time
+
+# fast:     greedy, output capped relative to the input length
+# balanced: small beam (the old GRU-fallback setting)
+# quality:  the original 5-beam default; beams stop at EOS, so the 256-token cap
+#           (as in the standalone scripts) only matters for long inputs
+DECODING_PROFILES = {
+    "fast": {"num_beams": 1, "max_length": 256, "length_ratio": 1.5, "length_slack": 10},
+    "balanced": {"num_beams": 3, "max_length": 256},
+    "quality": {"num_beams": 5, "max_length": 256},
+}
+PROFILE_NAMES = sorted(DECODING_PROFILES) + ["auto"]
+
+# auto: inputs longer than this (in words) drop to `balanced`; queues fuller than
+# AUTO_FAST_QUEUE_LOAD (fraction of the wait queue) drop to `fast`
+AUTO_LONG_INPUT_WORDS = int(os.getenv("AUTO_LONG_INPUT_WORDS", "40"))
+AUTO_FAST_QUEUE_LOAD = float(os.getenv("AUTO_FAST_QUEUE_LOAD", "0.5"))
+
+
+def validate_profile(profile):
+    if profile not in DECODING_PROFILES and profile != "auto":
+        raise ValueError(f"Unknown decoding profile '{profile}' (choose from {', '.join(PROFILE_NAMES)})")
+    return profile
+
+
+# Validated at import so a typo in DECODING_PROFILE fails at startup, not on the first request
+DEFAULT_PROFILE = validate_profile(os.getenv("DECODING_PROFILE", "quality"))
+
+
+def auto_profile(texts, queue_depth=0, max_queue=1):
+    """Pick a profile from the longest input and how full the model's wait queue is."""
+    if isinstance(texts, str):
+        texts = [texts]
+    longest = max((len(text.split()) for text in texts), default=0)
+    load = queue_depth / max_queue if max_queue else 0.0
+    if load >= AUTO_FAST_QUEUE_LOAD:
+        return "fast"
+    if longest > AUTO_LONG_INPUT_WORDS or queue_depth > 0:
+        return "balanced"
+    return "quality"
+
+
+def profile_generation(profile, input_tokens):
+    """
+    `model.generate` kwargs for a concrete profile, given the (padded) input length in tokens.
+    Resolve "auto" with `auto_profile` first.
+    """
+    settings = DECODING_PROFILES[profile]
+    max_length = settings["max_length"]
+    if "length_ratio" in settings:
+        max_length = min(max_length, math.ceil(input_tokens * settings["length_ratio"]) + settings["length_slack"])
+    return {"num_beams": settings["num_beams"], "max_length": max_length}
+
+
+def compare_profiles(model_key, dataset=None, profiles=None):
+    """
+    Evaluate every decoding profile of a model on the same dataset and report
+    latency (mean/p95) next to corpus BLEU, mean BLEU and METEOR.
+    """
+    # Imported here so the profile definitions above stay importable without torch
+    from model_manager import MODEL_REGISTRY, _generate_translations
+    from evaluation import evaluate_model_on_dataset, EVALUATION_DATASET
+
+    if model_key not in MODEL_REGISTRY or model_key == "gru":
+        raise ValueError(f"Profile comparison needs a seq2seq model, got '{model_key}'")
+    dataset = dataset or EVALUATION_DATASET
+
+    report = {"model": model_key, "samples": len(dataset), "profiles": {}}
+    for profile in profiles or sorted(DECODING_PROFILES):
+        latencies = []
+
+        def model_func(text):
+            start = time.perf_counter()
+            translation = _generate_translations([text], model_key, profile=profile)[0]
+            latencies.append(time.perf_counter() - start)
+            return {"translation": translation}
+
+        # Untimed warm-up so the first profile doesn't pay for model loading
+        _generate_translations([dataset[0]["english"]], model_key, profile=profile)
+        scores = evaluate_model_on_dataset(model_func, dataset)
+        latencies.sort()
+        report["profiles"][profile] = {
+            "corpus_bleu": scores.get("corpus_bleu"),
+            "avg_bleu": scores["avg_bleu"],
+            "avg_meteor": scores["avg_meteor"],
+            "avg_latency": round(sum(latencies) / len(latencies), 4) if latencies else 0.0,
+            "p95_latency": round(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))], 4)
+            if latencies else 0.0
+        }
+    return report
+
+
+if __name__ == "__main__":
+    import json
+    print(json.dumps(compare_profiles(sys.argv[1] if len(sys.argv) > 1 else "nllb"), indent=2))
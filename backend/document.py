@@ -0,0 +1,95 @@
+# ------------------------------------------------------------
+# document.py — Sentence-segmented long-document translation
+# ------------------------------------------------------------
+import json
+import os
+import re
+import time
+from model_manager import translate_batch_with_model
+
+# Segments longer than this are split on word boundaries so nothing is truncated
+MAX_SEGMENT_WORDS = int(os.getenv("DOCUMENT_MAX_SEGMENT_WORDS", "60"))
+DOCUMENT_BATCH_SIZE = int(os.getenv("DOCUMENT_BATCH_SIZE", "8"))
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?:(?<=[.!?।])|(?<=[.!?।][\"')\]]))\s+")
+
+
+# ------------------------------------------------------------
+# Segmentation
+# ------------------------------------------------------------
+def split_sentences(paragraph):
+    """Split a paragraph into sentences, breaking over-long ones into word chunks."""
+    paragraph = re.sub(r"\s+", " ", paragraph).strip()
+    if not paragraph:
+        return []
+
+    segments = []
+    for sentence in _SENTENCE_END.split(paragraph):
+        words = sentence.split()
+        for i in range(0, len(words), MAX_SEGMENT_WORDS):
+            segments.append(" ".join(words[i:i + MAX_SEGMENT_WORDS]))
+    return segments
+
+
+def segment_document(text):
+    """Return a list of (paragraph_index, sentence) tuples for the whole document."""
+    segments = []
+    paragraphs = [p for p in _PARAGRAPH_BREAK.split(text or "") if p.strip()]
+    for p_idx, paragraph in enumerate(paragraphs):
+        for sentence in split_sentences(paragraph):
+            segments.append((p_idx, sentence))
+    return segments
+
+
+def reassemble(segments, translations):
+    """Join translated sentences with spaces and paragraphs with blank lines."""
+    paragraphs = {}
+    for (p_idx, _), translation in zip(segments, translations):
+        paragraphs.setdefault(p_idx, []).append(translation.strip())
+    return "\n\n".join(" ".join(parts) for _, parts in sorted(paragraphs.items()))
+
+
+# ------------------------------------------------------------
+# Streaming Translation
+# ------------------------------------------------------------
+def iter_document_translation(text, model_key, batch_size=None, src_lang="en", tgt_lang="hi"):
+    """
+    Translate a document segment by segment, yielding one event per translated
+    segment as soon as its batch finishes, then a final event with the
+    reassembled document.
+    """
+    batch_size = batch_size or DOCUMENT_BATCH_SIZE
+    start_time = time.perf_counter()
+    segments = segment_document(text)
+    translations = []
+
+    for start in range(0, len(segments), batch_size):
+        chunk = segments[start:start + batch_size]
+        result = translate_batch_with_model(
+            [sentence for _, sentence in chunk], model_key, src_lang=src_lang, tgt_lang=tgt_lang
+        )
+        for offset, ((p_idx, sentence), translation) in enumerate(zip(chunk, result["translations"])):
+            translations.append(translation)
+            yield {
+                "segment": start + offset,
+                "paragraph": p_idx,
+                "source": sentence,
+                "translation": translation
+            }
+
+    yield {
+        "done": True,
+        "model_used": model_key,
+        "segments": len(segments),
+        "translation": reassemble(segments, translations),
+        "time_taken": round(time.perf_counter() - start_time, 2)
+    }
+
+
+def format_event(event, fmt):
+    """Serialise an event as an NDJSON line or a Server-Sent Events frame."""
+    payload = json.dumps(event, ensure_ascii=False)
+    if fmt == "sse":
+        return f"data: {payload}\n\n"
+    return payload + "\n"
@@ -2,7 +2,19 @@
 # evaluation.py — BLEU & METEOR computation for live updates
 # ------------------------------------------------------------
 import re
-from collections import Counter
+import os
+import csv
+import json
+import math
+from collections import Counter, deque
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+import tracing
+
+_PUNCT_RE = re.compile(r'[^\w\s]', flags=re.UNICODE)
+_SPACE_RE = re.compile(r'\s+')
 
 
 # ------------------------------------------------------------
@@ -14,14 +26,15 @@ def normalize_text(text):
         return ""
     text = text.strip()
     # Remove punctuation but keep Hindi (Devanagari) and Latin characters
-    text = re.sub(r'[^\w\s]', '', text, flags=re.UNICODE)
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = _PUNCT_RE.sub('', text)
+    text = _SPACE_RE.sub(' ', text).strip()
     return text.lower()
 
 
 # ------------------------------------------------------------
 # BLEU Calculation (smoothed sentence-level)
 # ------------------------------------------------------------
+@tracing.stage("bleu")
 def compute_bleu_score(references, hypotheses):
     """Compute smoothed BLEU score (0-1 scale) for a single sentence."""
     try:
@@ -73,6 +86,7 @@ def compute_bleu_score(references, hypotheses):
 # ------------------------------------------------------------
 # METEOR Calculation (unigram-based F-score with fragmentation penalty)
 # ------------------------------------------------------------
+@tracing.stage("meteor")
 def compute_meteor_score(references, hypotheses):
     """
     Compute METEOR-like score (0-1 scale) using unigram precision/recall
@@ -136,6 +150,161 @@ def compute_meteor_score(references, hypotheses):
         return 0.0
 
 
+# ------------------------------------------------------------
+# Corpus Scoring Engine (bulk BLEU & METEOR)
+# ------------------------------------------------------------
+MAX_ORDER = 4
+
+
+class CorpusScorer:
+    """
+    Accumulates BLEU/METEOR sufficient statistics for many sentence pairs.
+
+    Each text is normalized and tokenized once; per-sentence n-gram match and
+    total counts are stored in arrays, from which true corpus BLEU and every
+    sentence-level score are computed in one vectorized pass. Scorers built on
+    separate chunks (e.g. in worker processes) can be merged.
+    """
+
+    def __init__(self):
+        self._matches = []      # per sentence: clipped n-gram matches, n = 1..4
+        self._totals = []       # per sentence: hypothesis n-gram counts, n = 1..4
+        self._hyp_lens = []
+        self._ref_lens = []
+        self._chunks = []       # METEOR fragmentation chunks
+
+    def __len__(self):
+        return len(self._hyp_lens)
+
+    def add(self, reference, hypothesis):
+        ref_tokens = normalize_text(reference).split()
+        hyp_tokens = normalize_text(hypothesis).split()
+
+        matches = [0] * MAX_ORDER
+        totals = [0] * MAX_ORDER
+        for n in range(1, MAX_ORDER + 1):
+            hyp_ngrams = Counter(zip(*[hyp_tokens[k:] for k in range(n)]))
+            if not hyp_ngrams:
+                break
+            ref_ngrams = Counter(zip(*[ref_tokens[k:] for k in range(n)]))
+            totals[n - 1] = len(hyp_tokens) - n + 1
+            matches[n - 1] = sum(min(c, ref_ngrams[ng]) for ng, c in hyp_ngrams.items() if ng in ref_ngrams)
+
+        chunks, in_chunk = 0, False
+        ref_set = set(ref_tokens)
+        for token in hyp_tokens:
+            if token in ref_set:
+                if not in_chunk:
+                    chunks += 1
+                    in_chunk = True
+            else:
+                in_chunk = False
+
+        self._matches.append(matches)
+        self._totals.append(totals)
+        self._hyp_lens.append(len(hyp_tokens))
+        self._ref_lens.append(len(ref_tokens))
+        self._chunks.append(chunks)
+
+    def add_many(self, references, hypotheses):
+        for reference, hypothesis in zip(references, hypotheses):
+            self.add(reference, hypothesis)
+        return self
+
+    def merge(self, other):
+        """Append another scorer's statistics (order is preserved)."""
+        self._matches.extend(other._matches)
+        self._totals.extend(other._totals)
+        self._hyp_lens.extend(other._hyp_lens)
+        self._ref_lens.extend(other._ref_lens)
+        self._chunks.extend(other._chunks)
+        return self
+
+    def _arrays(self):
+        return (
+            np.asarray(self._matches, dtype=np.float64).reshape(-1, MAX_ORDER),
+            np.asarray(self._totals, dtype=np.float64).reshape(-1, MAX_ORDER),
+            np.asarray(self._hyp_lens, dtype=np.float64),
+            np.asarray(self._ref_lens, dtype=np.float64),
+            np.asarray(self._chunks, dtype=np.float64),
+        )
+
+    def sentence_bleu(self):
+        """Smoothed sentence BLEU per pair, identical to compute_bleu_score (unrounded)."""
+        matches, totals, hyp_lens, ref_lens, _ = self._arrays()
+        if not len(hyp_lens):
+            return np.zeros(0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            precisions = np.where(totals == 0, 1.0 / (hyp_lens[:, None] + 1), (matches + 1) / (totals + 1))
+            log_avg = np.log(precisions).mean(axis=1)
+            bp = np.where(hyp_lens < ref_lens, np.exp(1 - ref_lens / np.maximum(hyp_lens, 1)), 1.0)
+            scores = np.minimum(1.0, bp * np.exp(log_avg))
+        return np.where((hyp_lens == 0) | (ref_lens == 0), 0.0, scores)
+
+    def sentence_meteor(self):
+        """METEOR-like score per pair, identical to compute_meteor_score (unrounded)."""
+        matches, _, hyp_lens, ref_lens, chunks = self._arrays()
+        if not len(hyp_lens):
+            return np.zeros(0)
+        m = matches[:, 0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            precision = m / hyp_lens
+            recall = m / ref_lens
+            alpha = 0.9
+            denom = alpha * precision + (1.0 - alpha) * recall
+            f_mean = np.where(denom > 0, precision * recall / denom, 0.0)
+            penalty = np.where((chunks > 0) & (m > 0), 0.5 * (chunks / m) ** 3, 0.0)
+            scores = np.clip(f_mean * (1.0 - penalty), 0.0, 1.0)
+        return np.where((m == 0) | (hyp_lens == 0) | (ref_lens == 0), 0.0, scores)
+
+    def corpus_bleu(self):
+        """True corpus BLEU (0-1): n-gram statistics summed over all sentences before combining."""
+        matches, totals, hyp_lens, ref_lens, _ = self._arrays()
+        match_sums, total_sums = matches.sum(axis=0), totals.sum(axis=0)
+        hyp_len, ref_len = hyp_lens.sum(), ref_lens.sum()
+        if hyp_len == 0 or np.any(match_sums == 0):
+            return 0.0
+        log_avg = np.log(match_sums / total_sums).mean()
+        bp = 1.0 if hyp_len >= ref_len else math.exp(1 - ref_len / hyp_len)
+        return float(bp * math.exp(log_avg))
+
+    def result(self, include_sentences=True):
+        bleu = self.sentence_bleu()
+        meteor = self.sentence_meteor()
+        scores = {
+            "corpus_bleu": round(self.corpus_bleu(), 4),
+            "avg_bleu": round(float(bleu.mean()), 4) if len(bleu) else 0.0,
+            "avg_meteor": round(float(meteor.mean()), 4) if len(meteor) else 0.0,
+            "total_samples": len(self)
+        }
+        if include_sentences:
+            scores["sentence_bleu"] = [round(float(x), 4) for x in bleu]
+            scores["sentence_meteor"] = [round(float(x), 4) for x in meteor]
+        return scores
+
+
+def sacrebleu_cross_check(references, hypotheses):
+    """Corpus BLEU from sacrebleu on the same normalized tokens (0-1), or None if unavailable."""
+    try:
+        import sacrebleu
+    except ImportError:
+        return None
+    refs = [normalize_text(r) for r in references]
+    hyps = [normalize_text(h) for h in hypotheses]
+    return round(sacrebleu.corpus_bleu(hyps, [refs], tokenize="none", smooth_method="none").score / 100.0, 4)
+
+
+def compute_corpus_scores(references, hypotheses, cross_check=False):
+    """
+    Score many pairs at once: true corpus BLEU plus per-sentence BLEU/METEOR.
+    With `cross_check`, also report sacrebleu's corpus BLEU for comparison.
+    """
+    scores = CorpusScorer().add_many(references, hypotheses).result()
+    if cross_check:
+        scores["sacrebleu_corpus_bleu"] = sacrebleu_cross_check(references, hypotheses)
+    return scores
+
+
 # ------------------------------------------------------------
 # Evaluation Dataset (used for similarity matching)
 # ------------------------------------------------------------
@@ -149,14 +318,32 @@ EVALUATION_DATASET = [
     {"english": "We are going to school.", "hindi": "हम स्कूल जा रहे हैं।"}
 ]
 
+# Bumped on every change so derived state (the reference index) can check it in O(1)
+_dataset_version = 0
+
+
+def evaluation_dataset_version():
+    return _dataset_version
+
+
+def replace_evaluation_dataset(pairs):
+    """Replace EVALUATION_DATASET in place (importers keep the same list) and bump its version."""
+    global _dataset_version
+    EVALUATION_DATASET[:] = [{"english": pair["english"], "hindi": pair["hindi"]} for pair in pairs]
+    _dataset_version += 1
+    return _dataset_version
+
 
 # ------------------------------------------------------------
 # Full Model Evaluation (for /evaluate endpoint)
 # ------------------------------------------------------------
-def evaluate_model_on_dataset(model_func, dataset):
-    """Evaluate BLEU and METEOR across entire dataset."""
+def evaluate_model_on_dataset(model_func, dataset, cross_check=False):
+    """
+    Evaluate BLEU and METEOR across entire dataset.
+    With `cross_check`, the result also has `sacrebleu_corpus_bleu` (None if sacrebleu is not installed).
+    """
     try:
-        total_bleu, total_meteor = 0, 0
+        references, predictions = [], []
         for pair in dataset:
             src, ref = pair["english"], pair["hindi"]
             pred = model_func(src)
@@ -164,17 +351,100 @@ def evaluate_model_on_dataset(model_func, dataset):
                 pred_text = pred.get("translation", "")
             else:
                 pred_text = str(pred)
-            total_bleu += compute_bleu_score([ref], [pred_text])
-            total_meteor += compute_meteor_score([ref], [pred_text])
+            references.append(ref)
+            predictions.append(pred_text)
 
-        avg_bleu = total_bleu / len(dataset)
-        avg_meteor = total_meteor / len(dataset)
+        scores = compute_corpus_scores(references, predictions, cross_check=cross_check)
 
-        return {
-            "avg_bleu": round(avg_bleu, 4),
-            "avg_meteor": round(avg_meteor, 4),
-            "total_samples": len(dataset)
+        results = {
+            "avg_bleu": scores["avg_bleu"],
+            "avg_meteor": scores["avg_meteor"],
+            "corpus_bleu": scores["corpus_bleu"],
+            "total_samples": scores["total_samples"]
         }
+        if cross_check:
+            results["sacrebleu_corpus_bleu"] = scores["sacrebleu_corpus_bleu"]
+        return results
     except Exception as e:
         print("Error evaluating model:", e)
         return {"avg_bleu": 0, "avg_meteor": 0, "total_samples": 0}
+
+
+# ------------------------------------------------------------
+# Large External Test Sets (streamed, batched, parallel scoring)
+# ------------------------------------------------------------
+def iter_dataset_file(path):
+    """
+    Stream English→Hindi pairs from disk without loading the whole file.
+    JSONL lines need "english" and "hindi" keys; TSV rows are english<TAB>hindi.
+    """
+    is_tsv = path.endswith((".tsv", ".txt"))
+    with open(path, encoding="utf-8", newline="") as f:
+        if is_tsv:
+            for row in csv.reader(f, delimiter="\t", quoting=csv.QUOTE_NONE):
+                if len(row) >= 2 and row[0].strip():
+                    yield {"english": row[0], "hindi": row[1]}
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    pair = json.loads(line)
+                    yield {"english": pair["english"], "hindi": pair["hindi"]}
+
+
+def count_dataset_file(path):
+    """Number of non-empty lines (for progress reporting)."""
+    with open(path, encoding="utf-8") as f:
+        return sum(1 for line in f if line.strip())
+
+
+def _score_chunk(references, hypotheses):
+    """Worker-process entry point: statistics for one chunk of pairs."""
+    return CorpusScorer().add_many(references, hypotheses)
+
+
+def evaluate_pairs_stream(pairs, translate_batch, chunk_size=64, processes=None, progress=None):
+    """
+    Evaluate an iterable of pairs of any size.
+
+    Pairs are read `chunk_size` at a time and translated with one batched call
+    (`translate_batch(list_of_english) -> list_of_hindi`). Scoring runs in a
+    process pool while the next chunk is being translated; at most a few
+    chunks are in flight, so memory stays bounded. `progress(done)` is called
+    after each chunk is scored.
+    """
+    processes = processes or max(1, min(4, os.cpu_count() or 1))
+    scorer = CorpusScorer()
+    pending = deque()
+    done = 0
+
+    def _collect():
+        nonlocal done
+        future, size = pending.popleft()
+        scorer.merge(future.result())
+        done += size
+        if progress:
+            progress(done)
+
+    def _chunks():
+        chunk = []
+        for pair in pairs:
+            chunk.append(pair)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    # spawn: the server process is multi-threaded (and holds model weights), so never fork it
+    with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn")) as pool:
+        for chunk in _chunks():
+            hypotheses = translate_batch([pair["english"] for pair in chunk])
+            references = [pair["hindi"] for pair in chunk]
+            pending.append((pool.submit(_score_chunk, references, hypotheses), len(chunk)))
+            while len(pending) > processes * 2:
+                _collect()
+        while pending:
+            _collect()
+
+    return scorer.result(include_sentences=False)
@@ -0,0 +1,84 @@
+# ------------------------------------------------------------
+# evaluation_jobs.py — Background evaluation jobs with status tracking
+# ------------------------------------------------------------
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+class EvaluationJobs:
+    """
+    Runs long evaluations off the request path. Each job gets an id whose
+    status, progress and final scores can be polled; at most `max_workers`
+    jobs run at once and the rest wait in order.
+    """
+
+    def __init__(self, max_workers=1, max_jobs=100):
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="eval-job")
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    def submit(self, run, **info):
+        """
+        Queue `run(progress)` where `progress(done)` reports processed pairs.
+        Extra keyword arguments (model, dataset, total, ...) are stored on the job.
+        """
+        job_id = uuid.uuid4().hex[:12]
+        job = {
+            "id": job_id,
+            "status": "queued",
+            "processed": 0,
+            "created": time.time(),
+            "started": None,
+            "finished": None,
+            "result": None,
+            "error": None,
+            **info
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+            self._prune()
+
+        def _progress(done):
+            with self._lock:
+                job["processed"] = done
+
+        def _run():
+            with self._lock:
+                job["status"] = "running"
+                job["started"] = time.time()
+            try:
+                result = run(_progress)
+            except Exception as e:
+                print(f"[ERROR] Evaluation job {job_id} failed: {e}")
+                with self._lock:
+                    job.update(status="failed", error=str(e), finished=time.time())
+            else:
+                with self._lock:
+                    job.update(status="completed", result=result, finished=time.time())
+
+        self._executor.submit(_run)
+        return self.get(job_id)
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond `max_jobs`. Caller holds the lock."""
+        finished = [j for j in self._jobs.values() if j["status"] in ("completed", "failed")]
+        for job in sorted(finished, key=lambda j: j["created"])[:max(0, len(self._jobs) - self.max_jobs)]:
+            del self._jobs[job["id"]]
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job = dict(job)
+        total = job.get("total")
+        job["progress"] = round(job["processed"] / total, 4) if total else None
+        return job
+
+    def list(self):
+        with self._lock:
+            job_ids = list(self._jobs)
+        return [self.get(job_id) for job_id in job_ids]
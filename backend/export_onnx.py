@@ -0,0 +1,17 @@
+# ------------------------------------------------------------
+# export_onnx.py — Build and cache ONNX graphs offline
+# ------------------------------------------------------------
+# Usage:
+#   python export_onnx.py nllb mt5
+# then serve with MODEL_BACKENDS=nllb:onnx,mt5:onnx
+import sys
+from model_manager import MODEL_REGISTRY, HF_TOKEN
+from onnx_backend import export_onnx_model
+
+if __name__ == "__main__":
+    model_keys = sys.argv[1:] or [k for k in MODEL_REGISTRY if k != "gru"]
+    for model_key in model_keys:
+        if model_key not in MODEL_REGISTRY or model_key == "gru":
+            print(f"[WARN] Skipping unknown or non-seq2seq model: {model_key}")
+            continue
+        export_onnx_model(MODEL_REGISTRY[model_key], token=HF_TOKEN)
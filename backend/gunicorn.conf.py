@@ -0,0 +1,31 @@
+# ------------------------------------------------------------
+# gunicorn.conf.py — Multi-worker serving with shared (preloaded) model weights
+# ------------------------------------------------------------
+# Usage:
+#   PRELOAD_MODELS=nllb,mt5 gunicorn -c gunicorn.conf.py main:app
+#
+# With preload_app the master imports main.py (which loads PRELOAD_MODELS)
+# before forking, so every worker shares the same weight pages copy-on-write.
+import gc
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '7860')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "300"))
+
+
+def when_ready(server):
+    # Move everything allocated so far into the permanent GC generation so the
+    # collector in each worker does not touch (and un-share) those pages.
+    gc.freeze()
+    server.log.info("Models preloaded; objects frozen before forking workers")
+
+
+def post_fork(server, worker):
+    # Split CPU threads between workers instead of each grabbing every core
+    threads = os.getenv("TORCH_THREADS_PER_WORKER")
+    if threads:
+        import torch
+        torch.set_num_threads(int(threads))
@@ -0,0 +1,339 @@
+# ------------------------------------------------------------
+# history_store.py — Bounded in-memory history backed by SQLite (WAL)
+# ------------------------------------------------------------
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+# Queued by flush() so the writer commits its current batch without waiting for it to
+# fill, then refreshes the ring
+_FLUSH = object()
+
+_COLUMNS = ("english", "hindi", "reference", "bleu", "meteor", "model",
+            "src_lang", "tgt_lang", "time_taken", "timestamp", "profile")
+
+
+class HistoryStore:
+    """
+    Translation history in an append-only SQLite table fronted by a fixed-size
+    ring buffer of the newest rows, or just the ring when no `db_path` is given
+    (memory-only).
+
+    `append()` never touches the database: entries go to a queue that a writer
+    thread flushes in batched transactions. The same thread mirrors the table's
+    tail into the ring after every commit and every `flush_interval` while idle,
+    so rows written by other worker processes show up too. Recent pages are
+    answered from the ring without waiting for the writer; only cursors older
+    than the ring go to SQLite (indexed by model and timestamp). Reads are
+    therefore at most about `flush_interval` behind; `flush()` waits until the
+    entries appended before it are visible.
+    """
+
+    def __init__(self, db_path=None, ring_size=1000, batch_size=200, flush_interval=0.5):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._ring = deque(maxlen=ring_size)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._flush_requested = 0           # flush markers queued in this process
+        self._flush_done = 0                # ... of which the writer has handled (FIFO)
+        self._flushed = threading.Condition(self._lock)
+        self._next_local_id = 1
+        # Ring mirror of the table tail (maintained by the writer thread)
+        self._ring_ready = False            # the ring has been loaded from the table
+        self._ring_complete = True          # ... and holds every row
+        self._tail_id = None                # newest id mirrored; None forces a full reload
+        self._row_count = 0
+        self._generation = None             # changes whenever any process clears the table
+        # Distinguishes this history from any other (ids restart in a new memory-only store)
+        self.identity = uuid.uuid4().hex
+        if db_path:
+            with self._session() as db:
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS history ("
+                    "id INTEGER PRIMARY KEY AUTOINCREMENT, english TEXT, hindi TEXT, reference TEXT, "
+                    "bleu REAL, meteor REAL, model TEXT, src_lang TEXT, tgt_lang TEXT, "
+                    "time_taken REAL, timestamp TEXT, profile TEXT)"
+                )
+                columns = {row["name"] for row in db.execute("PRAGMA table_info(history)")}
+                if "profile" not in columns:
+                    # Tables from before decoding profiles were recorded
+                    db.execute("ALTER TABLE history ADD COLUMN profile TEXT")
+                db.execute("CREATE INDEX IF NOT EXISTS idx_history_model ON history (model, id)")
+                db.execute("CREATE INDEX IF NOT EXISTS idx_history_timestamp ON history (timestamp)")
+                db.execute("CREATE TABLE IF NOT EXISTS history_meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+                db.execute("INSERT OR IGNORE INTO history_meta (name, value) VALUES ('identity', ?)", (self.identity,))
+                self.identity = db.execute("SELECT value FROM history_meta WHERE name = 'identity'").fetchone()[0]
+
+    def _connect(self):
+        db = sqlite3.connect(self.db_path, timeout=30)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.row_factory = sqlite3.Row
+        return db
+
+    @contextmanager
+    def _session(self):
+        db = self._connect()
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    # --------------------------------------------------------
+    # Writes (batched, off the request path)
+    # --------------------------------------------------------
+    def _ensure_writer(self):
+        # Started lazily (and again after fork) so each worker process owns its writer thread
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            self._flush_requested = self._flush_done = 0
+            self._tail_id = None
+            threading.Thread(target=self._writer_loop, name="history-writer", daemon=True).start()
+            self._pid = os.getpid()
+
+    def _writer_loop(self):
+        db = self._connect()
+        q = self._queue
+        self._sync_ring(db)
+        while True:
+            try:
+                item = q.get(timeout=self.flush_interval)
+            except queue.Empty:
+                # Idle: pick up rows written by other processes
+                self._sync_ring(db)
+                continue
+            if item is _FLUSH:
+                self._sync_ring(db)
+                self._flush_handled(1)
+                continue
+            batch = [item]
+            flushes = 0
+            deadline = time.monotonic() + self.flush_interval
+            try:
+                while len(batch) < self.batch_size:
+                    item = q.get(timeout=max(0.0, deadline - time.monotonic()))
+                    if item is _FLUSH:
+                        flushes = 1
+                        break
+                    batch.append(item)
+            except queue.Empty:
+                pass
+            try:
+                with db:
+                    for entry in batch:
+                        cursor = db.execute(
+                            f"INSERT INTO history ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                            [entry.get(col) for col in _COLUMNS]
+                        )
+                        entry["id"] = cursor.lastrowid
+            except Exception as e:
+                print(f"[ERROR] Failed to persist {len(batch)} history entries: {e}")
+            finally:
+                # Failed batches still release flush(), which never waits on entries that will not be written
+                self._sync_ring(db)
+                self._flush_handled(flushes)
+
+    def _flush_handled(self, count):
+        if count:
+            with self._flushed:
+                self._flush_done += count
+                self._flushed.notify_all()
+
+    def _sync_ring(self, db):
+        """Mirror rows added since the last sync into the ring (a full reload after a clear)."""
+        try:
+            generation = db.execute("SELECT value FROM history_meta WHERE name = 'cleared'").fetchone()
+            generation = generation[0] if generation else None
+            with self._lock:
+                full = self._tail_id is None or generation != self._generation
+                tail_id = self._tail_id
+            if full:
+                rows = db.execute(
+                    "SELECT * FROM history ORDER BY id DESC LIMIT ?", (self._ring.maxlen,)
+                ).fetchall()[::-1]
+                total = db.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+            else:
+                rows = db.execute(
+                    "SELECT * FROM history WHERE id > ? ORDER BY id ASC", (tail_id,)
+                ).fetchall()
+            with self._lock:
+                if full:
+                    self._ring.clear()
+                    self._ring_complete = total <= len(rows)
+                    self._row_count = total
+                    self._generation = generation
+                elif generation != self._generation or tail_id != self._tail_id:
+                    return  # cleared or reloaded meanwhile; the next sync starts over
+                else:
+                    self._row_count += len(rows)
+                for row in rows:
+                    if len(self._ring) == self._ring.maxlen:
+                        self._ring_complete = False
+                    self._ring.append(dict(row))
+                if rows:
+                    self._tail_id = rows[-1]["id"]
+                elif full:
+                    self._tail_id = 0
+                self._ring_ready = True
+        except Exception as e:
+            print(f"[WARN] Could not refresh the history ring: {e}")
+
+    def append(self, entry):
+        entry = {col: entry.get(col) for col in _COLUMNS}
+        if not self.db_path:
+            with self._lock:
+                entry["id"] = self._next_local_id
+                self._next_local_id += 1
+                self._ring.append(entry)
+            return
+        self._ensure_writer()
+        self._queue.put(entry)
+
+    def flush(self, timeout=None):
+        """
+        Block until the entries appended (in this process) before the call have
+        been written and the ring reflects the table, including rows from other
+        processes. Entries appended meanwhile are not waited for.
+        Returns False if `timeout` seconds passed first.
+        """
+        if not self.db_path:
+            return True
+        self._ensure_writer()
+        with self._flushed:
+            # Queued under the lock so markers are handled in ticket order
+            self._flush_requested += 1
+            ticket = self._flush_requested
+            self._queue.put(_FLUSH)
+            return self._flushed.wait_for(lambda: self._flush_done >= ticket, timeout)
+
+    # --------------------------------------------------------
+    # Reads
+    # --------------------------------------------------------
+    @staticmethod
+    def _where(cursor=None, model=None, since=None, until=None):
+        clauses, params = [], []
+        if cursor is not None:
+            clauses.append("id < ?")
+            params.append(cursor)
+        if model:
+            clauses.append("model = ?")
+            params.append(model)
+        if since:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until:
+            clauses.append("timestamp < ?")
+            params.append(until)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    @staticmethod
+    def _matches(entry, cursor=None, model=None, since=None, until=None):
+        return ((cursor is None or entry["id"] < cursor)
+                and (not model or entry["model"] == model)
+                and (not since or entry["timestamp"] >= since)
+                and (not until or entry["timestamp"] < until))
+
+    def _query_ring(self, limit, cursor, model, since, until):
+        """A page from the ring, or None if it reaches past the rows the ring holds. Caller holds the lock."""
+        if self.db_path and not self._ring_ready:
+            return None
+        rows = []
+        for entry in reversed(self._ring):
+            if self._matches(entry, cursor, model, since, until):
+                rows.append(entry)
+                if len(rows) > limit:
+                    break
+        if len(rows) <= limit and self.db_path and not self._ring_complete:
+            return None
+        page = [dict(e) for e in rows[:limit]]
+        next_cursor = page[-1]["id"] if len(rows) > limit else None
+        return list(reversed(page)), next_cursor
+
+    def query(self, limit=50, cursor=None, model=None, since=None, until=None):
+        """
+        Return up to `limit` entries older than `cursor` (an entry id), oldest
+        first, plus the cursor for the next (older) page or None.
+        """
+        if self.db_path:
+            self._ensure_writer()
+        with self._lock:
+            result = self._query_ring(limit, cursor, model, since, until)
+        if result is not None:
+            return result
+
+        where, params = self._where(cursor, model, since, until)
+        with self._session() as db:
+            rows = db.execute(
+                f"SELECT * FROM history{where} ORDER BY id DESC LIMIT ?", params + [limit + 1]
+            ).fetchall()
+        page = [dict(row) for row in rows[:limit]]
+        next_cursor = page[-1]["id"] if len(rows) > limit else None
+        return list(reversed(page)), next_cursor
+
+    def count(self, model=None, since=None, until=None):
+        if self.db_path:
+            self._ensure_writer()
+        with self._lock:
+            if not self.db_path or (self._ring_ready and self._ring_complete):
+                return sum(1 for e in self._ring if self._matches(e, None, model, since, until))
+            if self._ring_ready and not (model or since or until):
+                return self._row_count
+        where, params = self._where(None, model, since, until)
+        with self._session() as db:
+            return db.execute(f"SELECT COUNT(*) FROM history{where}", params).fetchone()[0]
+
+    def iter_all(self, model=None, since=None, until=None, page_size=1000):
+        """Yield matching entries oldest first, reading the table page by page."""
+        if not self.db_path:
+            with self._lock:
+                rows = [e for e in self._ring if self._matches(e, None, model, since, until)]
+            yield from rows
+            return
+
+        self.flush()
+        last_id = 0
+        where, params = self._where(None, model, since, until)
+        where = (where + " AND id > ?") if where else " WHERE id > ?"
+        db = self._connect()
+        try:
+            while True:
+                rows = db.execute(
+                    f"SELECT * FROM history{where} ORDER BY id ASC LIMIT ?", params + [last_id, page_size]
+                ).fetchall()
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
+                last_id = rows[-1]["id"]
+        finally:
+            db.close()
+
+    def clear(self):
+        self.flush()
+        if not self.db_path:
+            with self._lock:
+                self._ring.clear()
+            return
+        generation = uuid.uuid4().hex
+        with self._session() as db:
+            db.execute("DELETE FROM history")
+            # Tells every process's ring to reload
+            db.execute("INSERT OR REPLACE INTO history_meta (name, value) VALUES ('cleared', ?)", (generation,))
+        with self._lock:
+            self._ring.clear()
+            self._ring_complete = True
+            self._row_count = 0
+            self._generation = generation
@@ -0,0 +1,108 @@
+# ------------------------------------------------------------
+# inference_pool.py — Bounded per-model inference executors
+# ------------------------------------------------------------
+import contextvars
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import tracing
+
+
+class QueueFullError(Exception):
+    """Raised when an executor's wait queue is full; carries a Retry-After hint in seconds."""
+
+    def __init__(self, name, retry_after):
+        super().__init__(f"Inference queue for '{name}' is full, retry in {retry_after}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class InferenceExecutor:
+    """
+    Runs inference jobs for one model with at most `max_concurrency` running at
+    once and at most `max_queue` waiting. Submissions beyond that are rejected
+    immediately with QueueFullError instead of piling up.
+    """
+
+    def __init__(self, name, max_concurrency=4, max_queue=16, on_queue_time=None):
+        self.name = name
+        self._on_queue_time = on_queue_time
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix=f"infer-{name}")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._started = 0
+        self.completed = 0
+        self.rejected = 0
+        self._total_queue_time = 0.0
+        self._max_queue_time = 0.0
+        self._total_service_time = 0.0
+
+    def _retry_after(self):
+        avg_service = self._total_service_time / self.completed if self.completed else 1.0
+        waves = (self._pending + 1) / self.max_concurrency
+        return max(1, math.ceil(avg_service * waves))
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue `fn(*args, **kwargs)`; raises QueueFullError if the wait queue is full."""
+        with self._lock:
+            if self._pending >= self.max_concurrency + self.max_queue:
+                self.rejected += 1
+                raise QueueFullError(self.name, self._retry_after())
+            self._pending += 1
+
+        enqueued = time.monotonic()
+        # Run in the caller's context so request traces follow the job into the worker thread
+        context = contextvars.copy_context()
+
+        def _task():
+            started = time.monotonic()
+            with self._lock:
+                self._running += 1
+                self._started += 1
+                queue_time = started - enqueued
+                self._total_queue_time += queue_time
+                self._max_queue_time = max(self._max_queue_time, queue_time)
+            if self._on_queue_time:
+                self._on_queue_time(queue_time)
+            try:
+                return tracing.call(fn, *args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._pending -= 1
+                    self.completed += 1
+                    self._total_service_time += time.monotonic() - started
+
+        try:
+            return self._executor.submit(context.run, _task)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+
+    def run(self, fn, *args, **kwargs):
+        """Submit and block until the job finishes, returning its result."""
+        return self.submit(fn, *args, **kwargs).result()
+
+    @property
+    def queue_depth(self):
+        return max(0, self._pending - self._running)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": max(0, self._pending - self._running),
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "average_queue_time": round(self._total_queue_time / self._started, 4)
+                if self._started else 0.0,
+                "max_queue_time": round(self._max_queue_time, 4)
+            }
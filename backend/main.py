@@ -1,17 +1,38 @@
-from fastapi import FastAPI, Query, UploadFile, File, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, Query, UploadFile, File, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse, JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
-from model_manager import translate_text_with_model, MODEL_REGISTRY
-from evaluation import evaluate_model_on_dataset, EVALUATION_DATASET, compute_bleu_score, compute_meteor_score
+from model_manager import (
+    MODEL_REGISTRY, preload_models, model_backend, is_quantized, resolve_language_pair, supported_languages,
+    translate_text_with_model, translate_batch_with_model, stream_translation,
+    get_batching_stats, configure_batching, translation_cache, get_inference_stats, residency,
+    PSEUDO_MODELS, get_cascade_stats, configure_cascade, translation_memory, TM_ENABLED, learned_memory_key
+)
+from inference_pool import InferenceExecutor, QueueFullError
+from memory_stats import process_memory
+from quantization import compare_quantization
+from decoding import DECODING_PROFILES, PROFILE_NAMES, DEFAULT_PROFILE, validate_profile, compare_profiles
+from readiness import ComponentRegistry
+from post_processing import PostProcessor
+from history_store import HistoryStore
+from metrics import metrics, SCORE_BUCKETS
+import tracing
+from evaluation import (
+    evaluate_model_on_dataset, evaluate_pairs_stream, iter_dataset_file, count_dataset_file,
+    EVALUATION_DATASET, evaluation_dataset_version, compute_bleu_score, compute_meteor_score
+)
+from evaluation_jobs import EvaluationJobs
 from dotenv import load_dotenv
 import os
 import sys
-import tempfile
+import time
+import asyncio
 from datetime import datetime
-from gtts import gTTS
-import speech_recognition as sr
-from sentence_transformers import SentenceTransformer, util
+from typing import List
+from reference_index import ReferenceIndex
+from document import iter_document_translation, format_event
+from tts_cache import TTSCache, load_synthesizer, iter_file
+from speech import load_recognizer, spool_upload, SpeechNotUnderstood, SpeechServiceError, UploadTooLarge
 import nltk
 
 # Fix Windows console encoding for Unicode output
@@ -22,18 +43,49 @@ if sys.platform == 'win32':
 # ✅ Load .env file (for Hugging Face token and other secrets)
 load_dotenv()
 
-# Download NLTK data required for METEOR score computation
-try:
-    nltk.download('punkt', quiet=True)
-    nltk.download('punkt_tab', quiet=True)
-    nltk.download('wordnet', quiet=True)
-    nltk.download('omw-1.4', quiet=True)
-    print("[OK] NLTK data downloaded successfully.")
-except Exception as e:
-    print(f"[WARN] NLTK download warning: {e}")
+# ------------------------------------------------------------
+# 🚀 Startup Components (loaded in the background)
+# ------------------------------------------------------------
+SIMILARITY_MODEL_NAME = 'all-MiniLM-L6-v2'
+similarity_model = None
+reference_index = None
+
+# Models to load (and warm up with one generation) right after the server binds
+WARMUP_MODELS = [m.strip() for m in os.getenv("WARMUP_MODELS", "nllb").split(",") if m.strip()]
+STARTUP_PARALLEL = os.getenv("STARTUP_PARALLEL", "0") == "1"
+
+components = ComponentRegistry()
+
+
+def load_nltk_data():
+    """Download NLTK data required for METEOR score computation."""
+    for package in ('punkt', 'punkt_tab', 'wordnet', 'omw-1.4'):
+        nltk.download(package, quiet=True)
 
-# Load a lightweight sentence similarity model
-similarity_model = SentenceTransformer('all-MiniLM-L6-v2')
+
+def load_similarity_model():
+    """Load the sentence similarity model and embed the reference sentences once."""
+    global similarity_model, reference_index
+    from sentence_transformers import SentenceTransformer
+    similarity_model = SentenceTransformer(SIMILARITY_MODEL_NAME)
+    # Persisted to REFERENCE_INDEX_DIR if set
+    index = ReferenceIndex(similarity_model, SIMILARITY_MODEL_NAME, cache_dir=os.getenv("REFERENCE_INDEX_DIR"))
+    index.build(EVALUATION_DATASET, evaluation_dataset_version())
+    reference_index = index
+
+
+def warm_up_model(model_key):
+    """Load a model and run one generation so the first real request is fast."""
+    def _warm():
+        translate_batch_with_model(["Hello, how are you?"], model_key, use_memory=False)
+    return _warm
+
+
+# Load models up front (in the gunicorn master when preload_app is on, so
+# forked workers share the weights copy-on-write — see gunicorn.conf.py)
+PRELOAD_MODELS = [m for m in os.getenv("PRELOAD_MODELS", "").split(",") if m.strip()]
+if PRELOAD_MODELS:
+    preload_models(PRELOAD_MODELS)
 
 # ------------------------------------------------------------
 # ⚙️ FastAPI Configuration
@@ -53,6 +105,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+def start_background_loading():
+    """Bind immediately; load NLTK data, the similarity model and warmup models in the background."""
+    tasks = [
+        ("nltk", load_nltk_data, False),
+        ("similarity_model", load_similarity_model, False),
+    ]
+    if TM_ENABLED:
+        tasks.append(("translation_memory", load_translation_memory, False))
+    tasks += [(f"model:{key}", warm_up_model(key), True) for key in WARMUP_MODELS if key in MODEL_REGISTRY]
+    components.start_background(tasks, parallel=STARTUP_PARALLEL)
+
+
 # ------------------------------------------------------------
 # 🧾 Request Body Schemas
 # ------------------------------------------------------------
@@ -60,12 +125,111 @@ class TranslationRequest(BaseModel):
     text: str
 
 
+class ScoreRequest(BaseModel):
+    text: str
+    translation: str
+
+
+class BatchTranslationRequest(BaseModel):
+    texts: List[str]
+
+
+class TMPair(BaseModel):
+    source: str
+    target: str
+
+
+class TMImportRequest(BaseModel):
+    pairs: List[TMPair] = []
+
+
 class TTSRequest(BaseModel):
     text: str
+    lang: str = "hi"
+    slow: bool = False
+
+
+# Translation history: recent entries in memory, persisted to SQLite (HISTORY_DB; empty = memory only)
+history_store = HistoryStore(
+    db_path=os.getenv("HISTORY_DB", "translation_history.db") or None,
+    ring_size=int(os.getenv("HISTORY_RING_SIZE", "1000"))
+)
+
+# Translations by these models are added to the translation memory as they enter the
+# history, keyed by model and decoding profile (entries without a profile are not learned).
+# Memory hits are recorded under the model name "tm" and are never re-learned.
+TM_LEARN_MODELS = {m.strip() for m in os.getenv("TM_LEARN_MODELS", "nllb,cascade").split(",") if m.strip()}
+
+
+def learned_pair(entry):
+    """The translation-memory pair to learn from a history entry, or None."""
+    if entry.get("model") not in TM_LEARN_MODELS or not entry.get("english") or not entry.get("hindi"):
+        return None
+    key = learned_memory_key(entry["model"], entry.get("profile"))
+    if key is None or entry["hindi"] == "Could not translate text.":
+        return None
+    return {"english": entry["english"], "hindi": entry["hindi"], "src_lang": entry.get("src_lang"),
+            "tgt_lang": entry.get("tgt_lang"), "model": key}
 
 
-# In-memory storage
-translation_history = []
+def load_translation_memory():
+    """Index the stored translation memory, then learn what the history recorded since the last seed."""
+    translation_memory.load()
+    seed_translation_memory()
+
+
+def seed_translation_memory():
+    """
+    Import learnable history entries recorded since the last seed into the translation memory.
+    The watermark is only trusted for the same history (ids restart in a new memory-only store).
+    """
+    identity, _, seen = translation_memory.get_meta("history_watermark", "").partition(":")
+    last_id = int(seen) if identity == history_store.identity else 0
+    newest = [last_id]
+
+    def entries():
+        for entry in history_store.iter_all():
+            if (entry.get("id") or 0) <= last_id:
+                continue
+            newest[0] = max(newest[0], entry["id"])
+            pair = learned_pair(entry)
+            if pair is not None:
+                yield pair
+
+    result = translation_memory.import_pairs(entries(), origin="history", overwrite=False)
+    translation_memory.set_meta("history_watermark", f"{history_store.identity}:{newest[0]}")
+    print(f"[OK] Translation memory: {result['added']} pairs learned from history, "
+          f"{translation_memory.size()} entries in total")
+
+
+def validate_model_and_languages(model, src_lang="en", tgt_lang="hi"):
+    """Rejects unknown models and unsupported language pairs with a 400."""
+    if model not in MODEL_REGISTRY and model not in PSEUDO_MODELS:
+        available = list(MODEL_REGISTRY.keys()) + list(PSEUDO_MODELS.keys())
+        raise HTTPException(status_code=400, detail=f"Invalid model. Available: {available}")
+    try:
+        resolve_language_pair(model, src_lang, tgt_lang)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def validate_decoding_profile(profile):
+    """Rejects unknown decoding profiles with a 400 (None means the DECODING_PROFILE default)."""
+    if profile is None:
+        return
+    try:
+        validate_profile(profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def overloaded(error):
+    """Maps a full inference queue to a fast 503 with a Retry-After hint."""
+    return HTTPException(
+        status_code=503,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)}
+    )
 
 # ------------------------------------------------------------
 # 🌐 Root Endpoint
@@ -74,32 +238,122 @@ translation_history = []
 def home():
     return {
         "message": "Welcome to AutoLingo: AI-Powered English→Hindi Translation API 🌍",
-        "available_models": list(MODEL_REGISTRY.keys()),
+        "available_models": list(MODEL_REGISTRY.keys()) + list(PSEUDO_MODELS.keys()),
         "endpoints": {
-            "translate": "POST /translate?model=<model_name>",
+            "translate": "POST /translate?model=<model_name>&profile=fast|balanced|quality|auto",
+            "translate_score": "POST /translate/score",
+            "translate_batch": "POST /translate/batch?model=<model_name>",
+            "translate_stream": "POST /translate/stream?model=<model_name>",
+            "translate_document": "POST /translate/document?model=<model_name>&format=ndjson|sse",
             "tts": "POST /tts",
-            "speech": "POST /speech",
-            "evaluate": "GET /evaluate?model=<model_name>",
+            "tts_cache": "GET /tts/cache",
+            "speech": "POST /speech?language=en-US",
+            "speech_stats": "GET /speech/stats",
+            "evaluate": "GET /evaluate?model=<model_name>&cross_check=<bool>",
+            "evaluate_jobs": "POST /evaluate/jobs?model=<model_name>&dataset=<file>",
+            "evaluate_profiles": "GET /evaluate/profiles?model=<model_name>",
             "compare": "GET /compare",
+            "cascade": "GET /cascade",
             "models": "GET /models",
-            "history": "GET /history",
-            "dataset": "GET /dataset"
+            "residency": "GET /models/residency",
+            "history": "GET /history?limit=&cursor=&model=&since=&until=",
+            "history_export": "GET /history/export",
+            "dataset": "GET /dataset",
+            "batching": "GET /batching",
+            "cache": "GET /cache",
+            "translation_memory": "GET /tm",
+            "translation_memory_lookup": "GET /tm/lookup?text=<text>",
+            "translation_memory_import": "POST /tm/import",
+            "scoring": "GET /scoring",
+            "inference": "GET /inference",
+            "memory": "GET /memory",
+            "healthz": "GET /healthz",
+            "readyz": "GET /readyz",
+            "metrics": "GET /metrics"
         }
     }
 
 # ------------------------------------------------------------
-# 📊 Global Model Statistics Tracker
+# 🧮 Live Scoring (closest reference, BLEU, METEOR) & Bookkeeping
 # ------------------------------------------------------------
-model_statistics = {
-    model_key: {
-        "total_translations": 0,
-        "correct_translations": 0,
-        "average_bleu": 0.0,
-        "average_meteor": 0.0,
-        "average_latency": 0.0
+scoring_queue = PostProcessor(
+    "scoring",
+    max_queue=int(os.getenv("SCORING_QUEUE_SIZE", "1000")),
+    workers=int(os.getenv("SCORING_WORKERS", "1"))
+)
+
+
+def score_translation(text, translated, src_lang, tgt_lang):
+    """
+    Live BLEU/METEOR of a translation against the closest reference: (reference, bleu, meteor).
+    All three are None when there is no reference to score against: other language pairs,
+    or the similarity model has not finished loading.
+    """
+    # 1️⃣ Find Closest Reference Sentence (semantic match)
+    if (src_lang, tgt_lang) != ("en", "hi") or reference_index is None:
+        return None, None, None
+    try:
+        reference_index.ensure_current(EVALUATION_DATASET, evaluation_dataset_version())
+        with tracing.stage("similarity"):
+            closest_ref, _ = reference_index.closest_reference(text)
+    except Exception as e:
+        print("[WARN] Reference lookup failed, leaving translation unscored:", e)
+        return None, None, None
+
+    # 2️⃣ Compute BLEU and METEOR
+    if closest_ref and translated:
+        bleu_live = compute_bleu_score([closest_ref], [translated])
+        meteor_live = compute_meteor_score([closest_ref], [translated])
+    else:
+        bleu_live, meteor_live = 0.0, 0.0
+    return closest_ref, bleu_live, meteor_live
+
+
+def score_and_record(text, translated, model, src_lang, tgt_lang, time_taken, timestamp, profile=None):
+    """
+    Score a translation against the closest reference sentence, update the
+    model's metrics and append it to the history. Returns (bleu, meteor),
+    both None if it could not be scored (then only latency is recorded).
+    """
+    scoring_start = time.perf_counter()
+    closest_ref, bleu_live, meteor_live = score_translation(text, translated, src_lang, tgt_lang)
+
+    # 3️⃣ Update Metrics for Model
+    labels = {"model": model}
+    metrics.inc("translations_total", labels)
+    metrics.observe("translation_latency_seconds", time_taken, labels)
+    if bleu_live is not None:
+        metrics.inc("translations_scored_total", labels)
+        metrics.observe("translation_bleu", bleu_live, labels, buckets=SCORE_BUCKETS)
+        metrics.observe("translation_meteor", meteor_live, labels, buckets=SCORE_BUCKETS)
+
+        # ✅ Accuracy — count only if translation seems “good”
+        if bleu_live > 0.5 or meteor_live > 0.5:
+            metrics.inc("translations_correct_total", labels)
+    metrics.observe("stage_duration_seconds", time.perf_counter() - scoring_start,
+                    {"model": model, "stage": "scoring"})
+
+    # 4️⃣ Save to History (and learn it into the translation memory)
+    entry = {
+        "english": text,
+        "hindi": translated,
+        "reference": closest_ref,
+        "bleu": bleu_live,
+        "meteor": meteor_live,
+        "model": model,
+        "src_lang": src_lang,
+        "tgt_lang": tgt_lang,
+        "time_taken": time_taken,
+        "timestamp": timestamp,
+        "profile": profile
     }
-    for model_key in MODEL_REGISTRY.keys()
-}
+    history_store.append(entry)
+    pair = learned_pair(entry) if TM_ENABLED else None
+    if pair is not None:
+        translation_memory.import_pairs([pair], origin="history", overwrite=False)
+
+    return bleu_live, meteor_live
+
 
 # ------------------------------------------------------------
 # 🧠 Translation Endpoint
@@ -107,187 +361,467 @@ model_statistics = {
 @app.post("/translate")
 def translate_text(
     req: TranslationRequest,
-    model: str = Query(default="nllb", description="Choose model: nllb, mt5, marian, or gru")
+    response: Response,
+    model: str = Query(default="nllb", description="Choose model: nllb, mt5, marian, or gru"),
+    src_lang: str = Query(default="en", description="Source language (ISO 639-1)"),
+    tgt_lang: str = Query(default="hi", description="Target language (ISO 639-1)"),
+    inline_scores: bool = Query(default=False, description="Wait for live BLEU/METEOR and include them"),
+    profile: str = Query(default=None, description="Decoding profile: fast, balanced, quality, or auto"),
+    tm: bool = Query(default=True, description="Serve translation-memory hits without running the model")
 ):
     """
-    Translate English text to Hindi using selected model and dynamically update metrics.
+    Translate text (English → Hindi by default) using selected model and dynamically update metrics.
+    Scoring runs in the background; pass inline_scores=true to get `bleu`/`meteor` in the response.
+    Live BLEU/METEOR are only computed for en→hi, the language pair of the reference dataset.
+    With TRACE_STAGES=1 the response carries a Server-Timing header with per-stage durations.
+    `profile` trades quality for latency (auto picks one from input length and queue depth).
+    `tm_hit`/`tm_score` report whether the translation came from the translation memory.
     """
+    with tracing.trace_request("/translate") as trace:
+        result = _translate_text(req, model, src_lang, tgt_lang, inline_scores, profile, tm)
+        if trace is not None and tracing.TRACE_STAGES:
+            response.headers["Server-Timing"] = trace.server_timing()
+        return result
+
+
+def _translate_text(req, model, src_lang, tgt_lang, inline_scores, profile, use_memory=True):
+    labels = {"endpoint": "/translate", "model": model}
     try:
-        if model not in MODEL_REGISTRY:
-            raise HTTPException(status_code=400, detail=f"Invalid model. Available: {list(MODEL_REGISTRY.keys())}")
+        validate_model_and_languages(model, src_lang, tgt_lang)
+        validate_decoding_profile(profile)
+        metrics.inc("requests_total", labels)
 
         # ------------------------------------------------------------
         # 1️⃣ Perform Translation
         # ------------------------------------------------------------
-        result = translate_text_with_model(req.text, model)
+        result = translate_text_with_model(
+            req.text, model, src_lang=src_lang, tgt_lang=tgt_lang, profile=profile, use_memory=use_memory
+        )
+        if "error" in result:
+            metrics.inc("errors_total", dict(labels, kind="error"))
         translated = result.get("translation", "").strip()
+        timestamp = datetime.now().isoformat()
 
         # ------------------------------------------------------------
-        # 2️⃣ Find Closest Reference Sentence (semantic match)
+        # 2️⃣ Score, update statistics and save history
+        #    (in the background unless the client asks for inline scores)
         # ------------------------------------------------------------
-        english_sentences = [pair["english"] for pair in EVALUATION_DATASET]
-        hindi_sentences = [pair["hindi"] for pair in EVALUATION_DATASET]
+        recorded_model = "tm" if result.get("tm_hit") else model
+        record_args = (req.text, translated, recorded_model, src_lang, tgt_lang, result.get("time_taken", 0), timestamp,
+                       result.get("profile"))
+        if inline_scores:
+            bleu_live, meteor_live = score_and_record(*record_args)
+            result["bleu"] = round(bleu_live, 4) if bleu_live is not None else None
+            result["meteor"] = round(meteor_live, 4) if meteor_live is not None else None
+        else:
+            scoring_queue.submit(score_and_record, *record_args)
 
-        try:
-            query_emb = similarity_model.encode(req.text, convert_to_tensor=True)
-            dataset_embs = similarity_model.encode(english_sentences, convert_to_tensor=True)
-            cos_scores = util.cos_sim(query_emb, dataset_embs)[0]
-            best_match_idx = int(cos_scores.argmax())
-            closest_ref = hindi_sentences[best_match_idx]
-        except Exception as e:
-            print("[WARN] Similarity model fallback:", e)
-            closest_ref = hindi_sentences[0] if len(hindi_sentences) > 0 else ""
+        return result
 
-        # ------------------------------------------------------------
-        # 3️⃣ Compute BLEU and METEOR
-        # ------------------------------------------------------------
-        if closest_ref and translated:
-            bleu_live = compute_bleu_score([closest_ref], [translated])
-            meteor_live = compute_meteor_score([closest_ref], [translated])
-            print(f"[DEBUG] ref='{closest_ref[:50]}', hyp='{translated[:50]}', bleu={bleu_live}, meteor={meteor_live}")
-        else:
-            bleu_live, meteor_live = 0.0, 0.0
+    except HTTPException:
+        raise
+    except QueueFullError as e:
+        metrics.inc("errors_total", dict(labels, kind="rejected"))
+        raise overloaded(e)
+    except Exception as e:
+        metrics.inc("errors_total", dict(labels, kind="error"))
+        print("[ERROR] Error in /translate:", e)
+        raise HTTPException(status_code=500, detail=str(e))
 
-        result["bleu"] = round(bleu_live, 4)
-        result["meteor"] = round(meteor_live, 4)
 
-        # ------------------------------------------------------------
-        # 4️⃣ Update Statistics for Model
-        # ------------------------------------------------------------
-        stats = model_statistics[model]
-        stats["total_translations"] += 1
+@app.post("/translate/score")
+def score_translation_endpoint(
+    req: ScoreRequest,
+    src_lang: str = Query(default="en", description="Source language (ISO 639-1)"),
+    tgt_lang: str = Query(default="hi", description="Target language (ISO 639-1)")
+):
+    """
+    Live BLEU/METEOR for a translation returned by /translate, so clients can show
+    the translation first and fetch its scores afterwards. Nothing is recorded:
+    /translate already queued the metrics and history update.
+    """
+    closest_ref, bleu_live, meteor_live = score_translation(req.text, req.translation, src_lang, tgt_lang)
+    if bleu_live is None:
+        return {"bleu": None, "meteor": None, "reference": None}
+    return {"bleu": round(bleu_live, 4), "meteor": round(meteor_live, 4), "reference": closest_ref}
 
-        # ✅ Latency
-        stats["average_latency"] = (
-            (stats["average_latency"] * (stats["total_translations"] - 1)) + result.get("time_taken", 0)
-        ) / stats["total_translations"]
 
-        # ✅ BLEU
-        stats["average_bleu"] = (
-            (stats["average_bleu"] * (stats["total_translations"] - 1)) + bleu_live
-        ) / stats["total_translations"]
+# ------------------------------------------------------------
+# 📦 Bulk Translation Endpoint
+# ------------------------------------------------------------
+MAX_BATCH_TEXTS = int(os.getenv("MAX_BATCH_TEXTS", "5000"))
 
-        # ✅ METEOR
-        stats["average_meteor"] = (
-            (stats["average_meteor"] * (stats["total_translations"] - 1)) + meteor_live
-        ) / stats["total_translations"]
 
-        # ✅ Accuracy — count only if translation seems “good”
-        if bleu_live > 0.5 or meteor_live > 0.5:
-            stats["correct_translations"] += 1
+@app.post("/translate/batch")
+def translate_batch(
+    req: BatchTranslationRequest,
+    response: Response,
+    model: str = Query(default="nllb", description="Choose model: nllb, mt5, marian, or gru"),
+    src_lang: str = Query(default="en", description="Source language (ISO 639-1)"),
+    tgt_lang: str = Query(default="hi", description="Target language (ISO 639-1)"),
+    profile: str = Query(default=None, description="Decoding profile: fast, balanced, quality, or auto"),
+    tm: bool = Query(default=True, description="Serve translation-memory hits without running the model")
+):
+    """
+    Translate many English sentences in one call (no live metrics).
+    Results are returned in the same order as the input.
+    """
+    validate_model_and_languages(model, src_lang, tgt_lang)
+    validate_decoding_profile(profile)
+    if not req.texts:
+        raise HTTPException(status_code=400, detail="At least one text is required")
+    if len(req.texts) > MAX_BATCH_TEXTS:
+        raise HTTPException(status_code=413, detail=f"Too many texts (max {MAX_BATCH_TEXTS})")
 
-        # ------------------------------------------------------------
-        # 5️⃣ Save to History
-        # ------------------------------------------------------------
-        translation_history.append({
-            "english": req.text,
-            "hindi": translated,
-            "reference": closest_ref,
-            "bleu": bleu_live,
-            "meteor": meteor_live,
-            "model": model,
-            "time_taken": result.get("time_taken", 0),
-            "timestamp": datetime.now().isoformat()
-        })
+    labels = {"endpoint": "/translate/batch", "model": model}
+    metrics.inc("requests_total", labels)
+    try:
+        with tracing.trace_request("/translate/batch") as trace:
+            result = translate_batch_with_model(
+                req.texts, model, src_lang=src_lang, tgt_lang=tgt_lang, profile=profile, use_memory=tm
+            )
+            if trace is not None and tracing.TRACE_STAGES:
+                response.headers["Server-Timing"] = trace.server_timing()
+            return result
+    except QueueFullError as e:
+        metrics.inc("errors_total", dict(labels, kind="rejected"))
+        raise overloaded(e)
+    except Exception as e:
+        metrics.inc("errors_total", dict(labels, kind="error"))
+        print("[ERROR] Error in /translate/batch:", e)
+        raise HTTPException(status_code=500, detail=str(e))
 
-        return result
 
+# ------------------------------------------------------------
+# ⚡ Token-Level Streaming Translation (SSE)
+# ------------------------------------------------------------
+@app.post("/translate/stream")
+def translate_stream(
+    req: TranslationRequest,
+    model: str = Query(default="nllb", description="Choose model: nllb, mt5, marian, or gru"),
+    src_lang: str = Query(default="en", description="Source language (ISO 639-1)"),
+    tgt_lang: str = Query(default="hi", description="Target language (ISO 639-1)")
+):
+    """
+    Stream partial Hindi output as Server-Sent Events while the model decodes (greedy).
+    Each event carries the new `delta` and the accumulated `text`; the last one has `done: true`.
+    A full inference queue is a 503 with Retry-After, returned before the stream starts.
+    """
+    validate_model_and_languages(model, src_lang, tgt_lang)
+    if model in PSEUDO_MODELS:
+        raise HTTPException(status_code=400, detail=f"Streaming needs a concrete model, not '{model}'")
+    if not req.text.strip():
+        raise HTTPException(status_code=400, detail="Text is required")
+
+    labels = {"endpoint": "/translate/stream", "model": model}
+    try:
+        # Loads the model and takes the executor slot now, while errors can still set the status
+        events = stream_translation(req.text, model, src_lang=src_lang, tgt_lang=tgt_lang)
+    except QueueFullError as e:
+        metrics.inc("errors_total", dict(labels, kind="rejected"))
+        raise overloaded(e)
     except Exception as e:
-        print("[ERROR] Error in /translate:", e)
+        metrics.inc("errors_total", dict(labels, kind="error"))
+        print("[ERROR] Error in /translate/stream:", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+    def event_stream():
+        try:
+            for event in events:
+                yield format_event(event, "sse")
+        except Exception as e:
+            metrics.inc("errors_total", dict(labels, kind="error"))
+            print("[ERROR] Error in /translate/stream:", e)
+            yield format_event({"error": str(e)}, "sse")
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+# ------------------------------------------------------------
+# 📄 Long-Document Translation (streamed)
+# ------------------------------------------------------------
+@app.post("/translate/document")
+def translate_document(
+    req: TranslationRequest,
+    model: str = Query(default="nllb", description="Choose model: nllb, mt5, marian, or gru"),
+    src_lang: str = Query(default="en", description="Source language (ISO 639-1)"),
+    tgt_lang: str = Query(default="hi", description="Target language (ISO 639-1)"),
+    format: str = Query(default="ndjson", description="Stream format: ndjson or sse")
+):
+    """
+    Translate a long document sentence by sentence, streaming each translated
+    segment as soon as it is ready. The final event carries the reassembled text.
+    """
+    validate_model_and_languages(model, src_lang, tgt_lang)
+    if format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'sse'")
+    if not req.text.strip():
+        raise HTTPException(status_code=400, detail="Text is required")
+
+    def event_stream():
+        try:
+            for event in iter_document_translation(req.text, model, src_lang=src_lang, tgt_lang=tgt_lang):
+                yield format_event(event, format)
+        except Exception as e:
+            print("[ERROR] Error in /translate/document:", e)
+            yield format_event({"error": str(e)}, format)
 
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(event_stream(), media_type=media_type)
 
 
 # ------------------------------------------------------------
 # 🔊 Text-to-Speech Endpoint
 # ------------------------------------------------------------
+# Blocking audio work (synthesis, upload spooling, recognition) runs on its own bounded
+# executor so a slow speech call never stalls the event loop or the translation workers
+speech_executor = InferenceExecutor(
+    "speech",
+    max_concurrency=int(os.getenv("SPEECH_MAX_CONCURRENCY", "4")),
+    max_queue=int(os.getenv("SPEECH_MAX_QUEUE", "16"))
+)
+
+
+async def run_speech_job(fn, *args, **kwargs):
+    """Run blocking audio work on the speech executor and await it without blocking the loop."""
+    return await asyncio.wrap_future(speech_executor.submit(fn, *args, **kwargs))
+
+
+# Synthesized audio is cached on disk by hash of engine, text, language and speed
+tts_cache = TTSCache(
+    os.getenv("TTS_CACHE_DIR", "tts_cache"),
+    max_bytes=int(float(os.getenv("TTS_CACHE_MAX_MB", "200")) * 2**20),
+    synthesizer=load_synthesizer(os.getenv("TTS_ENGINE", "gtts"))
+)
+
+
 @app.post("/tts")
 async def text_to_speech(req: TTSRequest):
+    """Speak the text (Hindi by default), streamed from the audio cache; each text is synthesized once."""
+    if not req.text.strip():
+        raise HTTPException(status_code=400, detail="Text is required")
     try:
-        if not req.text.strip():
-            raise HTTPException(status_code=400, detail="Text is required")
-
-        tts = gTTS(text=req.text, lang='hi', slow=False)
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp3')
-        tts.save(temp_file.name)
-        temp_file.close()
-
-        return FileResponse(
-            temp_file.name,
-            media_type='audio/mpeg',
-            filename='translation.mp3'
-        )
+        key, handle = await run_speech_job(tts_cache.open, req.text, lang=req.lang, slow=req.slow)
+    except QueueFullError as e:
+        raise overloaded(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    suffix = tts_cache.synthesizer.suffix
+    return StreamingResponse(
+        iter_file(handle),
+        media_type=tts_cache.media_type,
+        headers={
+            "Content-Length": str(os.fstat(handle.fileno()).st_size),
+            "Content-Disposition": f'attachment; filename="translation{suffix}"',
+            "ETag": f'"{key}"',
+            "Cache-Control": "public, max-age=86400"
+        }
+    )
+
+
+@app.get("/tts/cache")
+def get_tts_cache():
+    return tts_cache.stats()
+
+
+@app.delete("/tts/cache")
+def clear_tts_cache():
+    tts_cache.clear()
+    return tts_cache.stats()
+
 
 # ------------------------------------------------------------
 # 🎙️ Speech-to-Text Endpoint
 # ------------------------------------------------------------
-@app.post("/speech")
-async def speech_to_text(file: UploadFile = File(...)):
-    try:
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-        content = await file.read()
-        temp_file.write(content)
-        temp_file.close()
+SPEECH_MAX_UPLOAD_BYTES = int(float(os.getenv("SPEECH_MAX_UPLOAD_MB", "10")) * 2**20)
+# Allowance for multipart boundaries and headers on top of the audio itself
+SPEECH_MULTIPART_OVERHEAD = 64 * 1024
+recognizer = load_recognizer(os.getenv("SPEECH_ENGINE", "google"))
 
-        recognizer = sr.Recognizer()
-        with sr.AudioFile(temp_file.name) as source:
-            audio_data = recognizer.record(source)
 
+@app.middleware("http")
+async def reject_oversized_speech(request: Request, call_next):
+    """
+    Refuse /speech uploads whose declared Content-Length is over the cap before the
+    multipart body is parsed. Bodies without a Content-Length are still received in
+    full and only capped while spooling.
+    """
+    if request.method == "POST" and request.url.path == "/speech":
         try:
-            text = recognizer.recognize_google(audio_data)
-            os.unlink(temp_file.name)
-            return {"text": text}
-        except sr.UnknownValueError:
-            os.unlink(temp_file.name)
-            raise HTTPException(status_code=400, detail="Could not understand audio")
-        except sr.RequestError as e:
-            os.unlink(temp_file.name)
-            raise HTTPException(status_code=500, detail=f"Speech recognition error: {str(e)}")
+            declared = int(request.headers.get("content-length", "0"))
+        except ValueError:
+            declared = 0
+        if declared > SPEECH_MAX_UPLOAD_BYTES + SPEECH_MULTIPART_OVERHEAD:
+            return JSONResponse(
+                status_code=413, content={"detail": str(UploadTooLarge(SPEECH_MAX_UPLOAD_BYTES))},
+                headers={"Connection": "close"}
+            )
+    return await call_next(request)
+
+
+def transcribe_upload(upload, language):
+    """Spool the upload to disk in chunks (size-capped), transcribe it, and always remove the temp file."""
+    path = spool_upload(upload, SPEECH_MAX_UPLOAD_BYTES)
+    try:
+        return recognizer.transcribe(path, language=language)
+    finally:
+        os.unlink(path)
 
+
+@app.post("/speech")
+async def speech_to_text(
+    file: UploadFile = File(...),
+    language: str = Query(default="en-US", description="Spoken language (BCP-47, e.g. en-US)")
+):
+    if (getattr(file, "size", None) or 0) > SPEECH_MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=str(UploadTooLarge(SPEECH_MAX_UPLOAD_BYTES)))
+    try:
+        text = await run_speech_job(transcribe_upload, file.file, language)
+        return {"text": text}
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except SpeechNotUnderstood as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except SpeechServiceError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except QueueFullError as e:
+        raise overloaded(e)
     except Exception as e:
-        if os.path.exists(temp_file.name):
-            os.unlink(temp_file.name)
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        await file.close()
+
+
+@app.get("/speech/stats")
+def get_speech_stats():
+    return {
+        "engine": getattr(recognizer, "name", type(recognizer).__name__),
+        "max_upload_mb": SPEECH_MAX_UPLOAD_BYTES / 2**20,
+        "executor": speech_executor.stats()
+    }
 
 
 # ------------------------------------------------------------
 # 📈 Evaluation & Comparison
 # ------------------------------------------------------------
 @app.get("/evaluate")
-def evaluate_model(model: str = Query(..., description="Model to evaluate: nllb, mt5, marian, or gru")):
+def evaluate_model(
+    model: str = Query(..., description="Model to evaluate: nllb, mt5, marian, gru, or cascade"),
+    cross_check: bool = Query(default=False, description="Also report sacrebleu's corpus BLEU for comparison")
+):
     try:
-        if model not in MODEL_REGISTRY:
+        if model not in MODEL_REGISTRY and model not in PSEUDO_MODELS:
             raise HTTPException(status_code=400, detail="Invalid model")
 
         def model_func(text):
-            return translate_text_with_model(text, model)
+            return translate_text_with_model(text, model, use_memory=False)
 
-        results = evaluate_model_on_dataset(model_func, EVALUATION_DATASET)
+        results = evaluate_model_on_dataset(model_func, EVALUATION_DATASET, cross_check=cross_check)
         return results
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Large test sets live under EVAL_DATA_DIR and are evaluated as background jobs
+EVAL_DATA_DIR = os.path.realpath(os.getenv("EVAL_DATA_DIR", "eval_data"))
+EVAL_PROCESSES = int(os.getenv("EVAL_PROCESSES", "0")) or None
+evaluation_jobs = EvaluationJobs(max_workers=int(os.getenv("EVAL_JOB_WORKERS", "1")))
+
+
+def resolve_dataset_path(dataset):
+    """Resolves a dataset file name inside EVAL_DATA_DIR, refusing paths that escape it."""
+    path = os.path.realpath(os.path.join(EVAL_DATA_DIR, dataset))
+    if not path.startswith(EVAL_DATA_DIR + os.sep) or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail=f"Dataset not found in {EVAL_DATA_DIR}: {dataset}")
+    return path
+
+
+@app.post("/evaluate/jobs")
+def create_evaluation_job(
+    model: str = Query(..., description="Model to evaluate: nllb, mt5, marian, gru, or cascade"),
+    dataset: str = Query(default=None, description="JSONL/TSV file in EVAL_DATA_DIR (default: built-in dataset)"),
+    chunk_size: int = Query(default=64, ge=1, le=1024, description="Pairs translated per batch")
+):
+    """Start a background evaluation; poll GET /evaluate/jobs/{job_id} for progress and scores."""
+    if model not in MODEL_REGISTRY and model not in PSEUDO_MODELS:
+        raise HTTPException(status_code=400, detail="Invalid model")
+
+    if dataset:
+        path = resolve_dataset_path(dataset)
+        total = count_dataset_file(path)
+        pairs = lambda: iter_dataset_file(path)
+    else:
+        total = len(EVALUATION_DATASET)
+        pairs = lambda: iter(EVALUATION_DATASET)
+
+    def translate_batch(texts):
+        return translate_batch_with_model(texts, model, use_memory=False)["translations"]
+
+    def run(progress):
+        return evaluate_pairs_stream(
+            pairs(), translate_batch, chunk_size=chunk_size, processes=EVAL_PROCESSES, progress=progress
+        )
+
+    return evaluation_jobs.submit(run, model=model, dataset=dataset or "builtin", total=total)
+
+
+@app.get("/evaluate/jobs")
+def list_evaluation_jobs():
+    return {"jobs": evaluation_jobs.list()}
+
+
+@app.get("/evaluate/jobs/{job_id}")
+def get_evaluation_job(job_id: str):
+    job = evaluation_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.get("/evaluate/quantization")
+def evaluate_quantization(model: str = Query(..., description="Model to compare in fp32 vs int8: nllb, mt5, or marian")):
+    """Compare fp32 and int8 variants of a model on the evaluation dataset (quality gate included)."""
+    if model not in MODEL_REGISTRY or model == "gru":
+        raise HTTPException(status_code=400, detail="Invalid model")
+    try:
+        return compare_quantization(model)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/evaluate/profiles")
+def evaluate_profiles(model: str = Query(..., description="Model to benchmark per decoding profile: nllb, mt5, or marian")):
+    """Latency vs BLEU/METEOR of every decoding profile on the evaluation dataset."""
+    if model not in MODEL_REGISTRY or model == "gru":
+        raise HTTPException(status_code=400, detail="Invalid model")
+    try:
+        return compare_profiles(model)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/compare")
 def compare_models():
     try:
-        if not model_statistics:
-            raise HTTPException(status_code=404, detail="No statistics yet.")
-
         comparison_results = {}
-        for model_key, stats in model_statistics.items():
+        for model_key in list(MODEL_REGISTRY.keys()) + list(PSEUDO_MODELS.keys()):
+            labels = {"model": model_key}
+            total = metrics.counter_value("translations_total", labels)
+            scored = metrics.counter_value("translations_scored_total", labels)
+            correct = metrics.counter_value("translations_correct_total", labels)
+            bleu = metrics.histogram_snapshot("translation_bleu", labels)
+            meteor = metrics.histogram_snapshot("translation_meteor", labels)
+            latency = metrics.histogram_snapshot("translation_latency_seconds", labels)
             comparison_results[model_key] = {
-                "accuracy": round((stats["correct_translations"] / stats["total_translations"]) * 100, 2)
-                if stats["total_translations"] > 0 else 0.0,
-                "bleu": round(stats["average_bleu"], 3),
-                "meteor": round(stats["average_meteor"], 3),
-                "latency": round(stats["average_latency"], 2),
-                "total_samples": stats["total_translations"]
+                "accuracy": round((correct / scored) * 100, 2) if scored > 0 else 0.0,
+                "bleu": round(bleu["sum"] / bleu["count"], 3) if bleu["count"] else 0.0,
+                "meteor": round(meteor["sum"] / meteor["count"], 3) if meteor["count"] else 0.0,
+                "latency": round(latency["sum"] / latency["count"], 2) if latency["count"] else 0.0,
+                "latency_p95": metrics.quantile("translation_latency_seconds", 0.95, labels),
+                "total_samples": total,
+                "scored_samples": scored
             }
 
         best_model = max(comparison_results.items(), key=lambda x: x[1]["bleu"], default=("nllb", {}))
@@ -309,12 +843,160 @@ def compare_models():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/metrics")
+def prometheus_metrics():
+    """Latency histograms, counters and runtime gauges in Prometheus text format."""
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+# ------------------------------------------------------------
+# ❤️ Liveness & Readiness Probes
+# ------------------------------------------------------------
+@app.get("/healthz")
+def healthz():
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+def readyz():
+    ready = components.is_ready()
+    body = {"ready": ready, "components": components.report()}
+    return JSONResponse(status_code=200 if ready else 503, content=body)
+
+
 # ------------------------------------------------------------
 # 📋 Models, Dataset, History
 # ------------------------------------------------------------
 @app.get("/models")
 def get_models():
-    return {"models": MODEL_REGISTRY, "count": len(MODEL_REGISTRY)}
+    return {
+        "models": MODEL_REGISTRY,
+        "pseudo_models": PSEUDO_MODELS,
+        "count": len(MODEL_REGISTRY),
+        "backends": {key: model_backend(key) for key in MODEL_REGISTRY},
+        "languages": {key: supported_languages(key) for key in list(MODEL_REGISTRY) + list(PSEUDO_MODELS)},
+        "quantized": {key: is_quantized(key) for key in MODEL_REGISTRY},
+        "decoding_profiles": {"available": PROFILE_NAMES, "default": DEFAULT_PROFILE, "settings": DECODING_PROFILES}
+    }
+
+
+@app.get("/batching")
+def get_batching():
+    return get_batching_stats()
+
+
+@app.post("/batching")
+def update_batching(
+    window_ms: float = Query(default=None, description="Batch collection window in milliseconds"),
+    max_batch_size: int = Query(default=None, description="Maximum requests per batch")
+):
+    return configure_batching(window_ms=window_ms, max_batch_size=max_batch_size)
+
+
+@app.get("/cascade")
+def get_cascade():
+    """Cascade order, confidence threshold, escalation rate and which model served the traffic."""
+    return get_cascade_stats()
+
+
+@app.post("/cascade")
+def update_cascade(
+    min_confidence: float = Query(default=None, ge=0.0, le=1.0, description="Escalate below this confidence"),
+    models: str = Query(default=None, description="Comma-separated model order, cheapest first")
+):
+    try:
+        return configure_cascade(min_confidence=min_confidence, models=models.split(",") if models else None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/inference")
+def get_inference():
+    return get_inference_stats()
+
+
+@app.get("/memory")
+def get_memory():
+    return process_memory()
+
+
+@app.get("/scoring")
+def get_scoring_queue():
+    return scoring_queue.stats()
+
+
+@app.get("/cache")
+def get_cache_stats():
+    return translation_cache.stats()
+
+
+@app.delete("/cache")
+def clear_cache():
+    translation_cache.clear()
+    return {"message": "Translation cache cleared successfully"}
+
+
+# ------------------------------------------------------------
+# 🧠 Translation Memory
+# ------------------------------------------------------------
+@app.get("/tm")
+def get_translation_memory():
+    return dict(translation_memory.stats(), enabled=TM_ENABLED, learn_models=sorted(TM_LEARN_MODELS))
+
+
+@app.get("/tm/lookup")
+def lookup_translation_memory(
+    text: str = Query(..., description="Source sentence"),
+    src_lang: str = Query(default="en"),
+    tgt_lang: str = Query(default="hi"),
+    model: str = Query(default=None, description="Also include an exact pair learned from this model"),
+    profile: str = Query(default=None, description="Decoding profile of the learned pair (default: DECODING_PROFILE)"),
+    min_score: float = Query(default=None, ge=0.0, le=1.0, description="Default: TM_MIN_SCORE"),
+    limit: int = Query(default=5, ge=1, le=50)
+):
+    """
+    Stored pairs most similar to `text`, best first (does not count as a hit or miss).
+    Lists fuzzy curated candidates even when TM_FUZZY is off, when requests would only get exact hits.
+    """
+    validate_decoding_profile(profile)
+    key = learned_memory_key(model, profile or DEFAULT_PROFILE) if model else None
+    matches = translation_memory.search(text, src_lang, tgt_lang, model=key, min_score=min_score, limit=limit)
+    return {"matches": [match._asdict() for match in matches]}
+
+
+@app.post("/tm/import")
+def import_translation_memory(
+    req: TMImportRequest = None,
+    dataset: str = Query(default=None, description="JSONL/TSV file in EVAL_DATA_DIR to import instead of the body"),
+    src_lang: str = Query(default="en"),
+    tgt_lang: str = Query(default="hi")
+):
+    """
+    Bulk-import curated source → target pairs. They serve requests for every model
+    and replace curated entries for the same source.
+    """
+    if dataset:
+        pairs = iter_dataset_file(resolve_dataset_path(dataset))
+    elif req is not None and req.pairs:
+        pairs = ((pair.source, pair.target) for pair in req.pairs)
+    else:
+        raise HTTPException(status_code=400, detail="Provide pairs in the body or a dataset file")
+    try:
+        result = translation_memory.import_pairs(pairs, src_lang, tgt_lang)
+    except (KeyError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid dataset: {e}")
+    return dict(result, entries=translation_memory.size())
+
+
+@app.delete("/tm")
+def clear_translation_memory():
+    translation_memory.clear()
+    return {"message": "Translation memory cleared successfully"}
+
+
+@app.get("/models/residency")
+def get_model_residency():
+    return residency.stats()
 
 
 @app.get("/dataset")
@@ -323,14 +1005,42 @@ def get_dataset():
 
 
 @app.get("/history")
-def get_history(limit: int = Query(default=50)):
-    return {"history": translation_history[-limit:], "total": len(translation_history)}
+def get_history(
+    limit: int = Query(default=50, ge=1, le=1000),
+    cursor: int = Query(default=None, description="Return entries older than this id (from next_cursor)"),
+    model: str = Query(default=None, description="Only entries from this model"),
+    since: str = Query(default=None, description="ISO timestamp lower bound (inclusive)"),
+    until: str = Query(default=None, description="ISO timestamp upper bound (exclusive)")
+):
+    entries, next_cursor = history_store.query(limit=limit, cursor=cursor, model=model, since=since, until=until)
+    return {
+        "history": entries,
+        "total": history_store.count(model=model, since=since, until=until),
+        "next_cursor": next_cursor
+    }
+
+
+@app.get("/history/export")
+def export_history(
+    model: str = Query(default=None),
+    since: str = Query(default=None),
+    until: str = Query(default=None)
+):
+    """Stream the full (filtered) history as NDJSON, oldest first."""
+    def rows():
+        for entry in history_store.iter_all(model=model, since=since, until=until):
+            yield format_event(entry, "ndjson")
+
+    return StreamingResponse(
+        rows(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": "attachment; filename=translation_history.ndjson"}
+    )
 
 
 @app.delete("/history")
 def clear_history():
-    global translation_history
-    translation_history = []
+    history_store.clear()
     return {"message": "History cleared successfully"}
 
 
@@ -0,0 +1,32 @@
+# ------------------------------------------------------------
+# memory_stats.py — Per-process memory breakdown (Linux)
+# ------------------------------------------------------------
+import os
+
+_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def process_memory():
+    """
+    Return this process's memory in MB from /proc/self/smaps_rollup.
+    With preloaded models, `shared` should hold the weights and `private` stay small;
+    `pss` is the fair per-worker share of the shared pages.
+    """
+    values = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in _FIELDS:
+                    values[key] = int(rest.split()[0]) / 1024.0
+    except OSError:
+        return {"pid": os.getpid(), "available": False}
+
+    return {
+        "pid": os.getpid(),
+        "available": True,
+        "rss_mb": round(values.get("Rss", 0.0), 1),
+        "pss_mb": round(values.get("Pss", 0.0), 1),
+        "shared_mb": round(values.get("Shared_Clean", 0.0) + values.get("Shared_Dirty", 0.0), 1),
+        "private_mb": round(values.get("Private_Clean", 0.0) + values.get("Private_Dirty", 0.0), 1)
+    }
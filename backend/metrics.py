@@ -0,0 +1,170 @@
+# ------------------------------------------------------------
+# metrics.py — Thread-safe counters/histograms with Prometheus export
+# ------------------------------------------------------------
+import threading
+
+PREFIX = "autolingo_"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SCORE_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+
+def _label_key(labels):
+    return tuple(sorted((labels or {}).items()))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(label_key, extra=None):
+    pairs = list(label_key) + (extra or [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """
+    Process-wide counters, gauges and histograms guarded by one lock.
+
+    Values are keyed by metric name plus a label dict. Collectors registered
+    with `register_collector` are called at scrape time to export state owned
+    by other components (cache, batching, inference queues) as gauges.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._meta = {}            # name -> (type, help)
+        self._counters = {}        # (name, labels) -> value
+        self._gauges = {}          # (name, labels) -> value
+        self._histograms = {}      # (name, labels) -> [bucket_counts, sum, count, buckets]
+        self._collectors = []
+
+    def describe(self, name, metric_type, help_text):
+        with self._lock:
+            self._meta[name] = (metric_type, help_text)
+
+    def inc(self, name, labels=None, value=1):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, labels=None):
+        with self._lock:
+            self._gauges[(name, _label_key(labels))] = value
+
+    def observe(self, name, value, labels=None, buckets=LATENCY_BUCKETS):
+        key = (name, _label_key(labels))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = [[0] * len(buckets), 0.0, 0, buckets]
+            for i, bound in enumerate(hist[3]):
+                if value <= bound:
+                    hist[0][i] += 1
+            hist[1] += value
+            hist[2] += 1
+
+    def counter_value(self, name, labels=None):
+        with self._lock:
+            return self._counters.get((name, _label_key(labels)), 0)
+
+    def histogram_snapshot(self, name, labels=None):
+        """Returns {"count", "sum", "buckets": {le: cumulative_count}} (zeros if never observed)."""
+        with self._lock:
+            hist = self._histograms.get((name, _label_key(labels)))
+            if hist is None:
+                return {"count": 0, "sum": 0.0, "buckets": {}}
+            return {
+                "count": hist[2],
+                "sum": hist[1],
+                "buckets": dict(zip(hist[3], hist[0]))
+            }
+
+    def quantile(self, name, q, labels=None):
+        """Estimate a quantile from histogram buckets (upper bound of the bucket holding it)."""
+        snap = self.histogram_snapshot(name, labels)
+        if not snap["count"]:
+            return 0.0
+        target = q * snap["count"]
+        for bound, cumulative in snap["buckets"].items():
+            if cumulative >= target:
+                return bound
+        return float("inf")
+
+    def register_collector(self, fn):
+        """`fn()` returns [(name, labels, value), ...] exported as gauges at scrape time."""
+        with self._lock:
+            self._collectors.append(fn)
+
+    def render_prometheus(self):
+        """Render every metric in the Prometheus text exposition format (0.0.4)."""
+        with self._lock:
+            meta = dict(self._meta)
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            histograms = {k: (list(v[0]), v[1], v[2], v[3]) for k, v in self._histograms.items()}
+            collectors = list(self._collectors)
+
+        for collect in collectors:
+            try:
+                for name, labels, value in collect():
+                    gauges[(name, _label_key(labels))] = value
+            except Exception as e:
+                print(f"[WARN] Metrics collector failed: {e}")
+
+        lines = []
+        families = {}
+        for (name, label_key), value in counters.items():
+            families.setdefault((name, "counter"), []).append((label_key, value))
+        for (name, label_key), value in gauges.items():
+            families.setdefault((name, "gauge"), []).append((label_key, value))
+        for (name, label_key), value in histograms.items():
+            families.setdefault((name, "histogram"), []).append((label_key, value))
+
+        for (name, default_type), samples in sorted(families.items()):
+            metric_type, help_text = meta.get(name, (default_type, name.replace("_", " ")))
+            full = PREFIX + name
+            lines.append(f"# HELP {full} {help_text}")
+            lines.append(f"# TYPE {full} {metric_type}")
+            for label_key, value in sorted(samples):
+                if default_type == "histogram":
+                    bucket_counts, total, count, buckets = value
+                    for bound, bucket_count in zip(buckets, bucket_counts):
+                        lines.append(f"{full}_bucket{_format_labels(label_key, [('le', bound)])} {bucket_count}")
+                    lines.append(f"{full}_bucket{_format_labels(label_key, [('le', '+Inf')])} {count}")
+                    lines.append(f"{full}_sum{_format_labels(label_key)} {_format_value(total)}")
+                    lines.append(f"{full}_count{_format_labels(label_key)} {count}")
+                else:
+                    lines.append(f"{full}{_format_labels(label_key)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Shared registry for the whole process
+metrics = MetricsRegistry()
+metrics.describe("stage_duration_seconds", "histogram",
+                 "Time spent per pipeline stage (queue, tokenize, generate, decode, scoring)")
+metrics.describe("translation_latency_seconds", "histogram", "End-to-end translation time reported as time_taken")
+metrics.describe("translations_total", "counter", "Translations scored per model")
+metrics.describe("translations_scored_total", "counter", "Translations that had a reference to be scored against")
+metrics.describe("translations_correct_total", "counter", "Translations with live BLEU or METEOR above 0.5")
+metrics.describe("translation_bleu", "histogram", "Live BLEU of scored translations")
+metrics.describe("translation_meteor", "histogram", "Live METEOR of scored translations")
+metrics.describe("requests_total", "counter", "Translation requests per endpoint and model")
+metrics.describe("errors_total", "counter", "Failed translation requests per endpoint, model and kind")
+metrics.describe("batch_size", "histogram", "Requests per micro-batch generate call")
+metrics.describe("cascade_requests_total", "counter", "Translations routed through the cascade pseudo-model")
+metrics.describe("cascade_escalated_total", "counter", "Cascade translations re-run on a larger model")
+metrics.describe("cascade_escalations_total", "counter", "Cascade escalations per model transition")
+metrics.describe("cascade_served_total", "counter", "Cascade translations per model that produced the answer")
+metrics.describe("cascade_confidence", "histogram", "Generation confidence (geometric-mean token probability) per cascade model")
+metrics.describe("tm_lookups_total", "counter", "Translation-memory lookups by result (exact, fuzzy, miss)")
+metrics.describe("tm_match_score", "histogram", "Similarity score of translation-memory hits")
@@ -1,5 +1,6 @@
 # backend/model_loader.py
 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+from decoding import DEFAULT_PROFILE, validate_profile, auto_profile, profile_generation
 
 MODEL_NAME = "facebook/nllb-200-distilled-600M"
 
@@ -11,16 +12,18 @@ print("✅ Model loaded successfully!")
 src_lang = "eng_Latn"
 tgt_lang = "hin_Deva"
 
-def translate_text(text: str) -> str:
+def translate_text(text: str, profile: str = DEFAULT_PROFILE) -> str:
     text = text.strip()
     if not text:
         return "Please provide English text."
+    profile = validate_profile(profile)
+    if profile == "auto":
+        profile = auto_profile(text)
     tokenizer.src_lang = src_lang
     inputs = tokenizer(text, return_tensors="pt")
     outputs = model.generate(
         **inputs,
         forced_bos_token_id=tokenizer.convert_tokens_to_ids(tgt_lang),
-        max_length=256,
-        num_beams=5
+        **profile_generation(profile, inputs["input_ids"].shape[1])
     )
     return tokenizer.batch_decode(outputs, skip_special_tokens=True)[0]
@@ -1,7 +1,18 @@
 # backend/model_manager.py
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
-import torch, time, os, sys
+from transformers import AutoConfig, AutoTokenizer, AutoModelForSeq2SeqLM
+import torch, time, os, sys, threading, copy, weakref
 from dotenv import load_dotenv
+from batching import BatchScheduler
+from translation_cache import TranslationCache, make_cache_key
+from translation_memory import TranslationMemory
+from inference_pool import InferenceExecutor, QueueFullError
+from onnx_backend import load_onnx_model, onnx_footprint_bytes
+from residency import ModelResidency
+from metrics import metrics, SIZE_BUCKETS, SCORE_BUCKETS
+import tracing
+from decoding import (
+    DECODING_PROFILES, DEFAULT_PROFILE, validate_profile, auto_profile, profile_generation
+)
 
 # Fix Windows console encoding
 if sys.platform == 'win32':
@@ -23,10 +34,35 @@ MODEL_REGISTRY = {
     "gru": "gru_baseline"
 }
 
+# ✅ Supported languages per model (ISO 639-1 → model-specific code)
+_NLLB_CODES = {
+    "en": "eng_Latn", "hi": "hin_Deva", "bn": "ben_Beng", "mr": "mar_Deva", "gu": "guj_Gujr",
+    "pa": "pan_Guru", "ta": "tam_Taml", "te": "tel_Telu", "ur": "urd_Arab", "ne": "npi_Deva",
+    "fr": "fra_Latn", "de": "deu_Latn", "es": "spa_Latn"
+}
+LANGUAGE_CODES = {
+    "nllb": _NLLB_CODES,
+    "marian": {code: code for code in _NLLB_CODES if code != "te"},  # M2M100 uses ISO codes
+    "mt5": {"en": None, "hi": None},   # opus-mt-en-hi: fixed English → Hindi
+    "gru": {"en": None, "hi": None}
+}
+FIXED_PAIR_MODELS = {"mt5", "gru"}
+
+# Routing models built from the registry entries rather than loaded themselves
+PSEUDO_MODELS = {
+    "cascade": "Fastest model first, escalating low-confidence translations (CASCADE_MODELS)"
+}
 
 
-# Cache to store loaded models
-_loaded = {}
+
+# Loaded models, kept within MODEL_MEMORY_BUDGET_MB (unset = unlimited) with LRU eviction;
+# PINNED_MODELS are never evicted
+_budget_mb = os.getenv("MODEL_MEMORY_BUDGET_MB")
+residency = ModelResidency(
+    budget_bytes=int(float(_budget_mb) * 1024 * 1024) if _budget_mb else None,
+    pinned=[m.strip() for m in os.getenv("PINNED_MODELS", "").split(",") if m.strip()],
+    on_evict=lambda key, value: _drop_lang_tokenizers(key, value)
+)
 
 # Device & accelerate check
 device = "cuda" if torch.cuda.is_available() else "cpu"
@@ -40,29 +76,165 @@ except Exception:
 OFFLOAD_FOLDER = os.getenv("HF_OFFLOAD_DIR", None)
 
 
+# CPU int8 dynamic quantization (opt-in per registry key, e.g. QUANTIZED_MODELS=nllb,marian)
+QUANTIZED_MODELS = {m.strip() for m in os.getenv("QUANTIZED_MODELS", "").split(",") if m.strip()}
+QUANTIZED_CACHE_DIR = os.getenv("QUANTIZED_CACHE_DIR", None)
+
+# Inference backend per registry key, e.g. MODEL_BACKENDS=nllb:onnx,mt5:pytorch (default: pytorch)
+MODEL_BACKENDS = dict(
+    entry.strip().split(":", 1)
+    for entry in os.getenv("MODEL_BACKENDS", "").split(",")
+    if ":" in entry
+)
+
+
 # =======================
 # 🔹 Model Loading Logic
 # =======================
-def load_model(model_key):
-    """Loads the selected model (cached for performance)."""
-    if model_key in _loaded:
-        return _loaded[model_key]
+def model_backend(model_key):
+    """Returns the configured inference backend for a model: 'pytorch' or 'onnx'."""
+    return MODEL_BACKENDS.get(model_key, "pytorch")
+
+
+def is_quantized(model_key):
+    """Whether the served variant of this model is int8-quantized."""
+    return model_key in QUANTIZED_MODELS and device == "cpu" and model_backend(model_key) == "pytorch"
+
+
+def _model_device(model):
+    """Device that inputs must be moved to (PyTorch module or ONNX Runtime model)."""
+    if isinstance(model, torch.nn.Module):
+        try:
+            return next(model.parameters()).device
+        except StopIteration:
+            return torch.device(device)
+    return getattr(model, "device", torch.device("cpu"))
+
+
+def model_footprint_bytes(model):
+    """Approximate in-memory size of a model's weights, including packed int8 Linear weights."""
+    total = sum(t.numel() * t.element_size() for t in model.parameters())
+    total += sum(t.numel() * t.element_size() for t in model.buffers())
+    for module in model.modules():
+        if isinstance(module, torch.ao.nn.quantized.dynamic.Linear):
+            weight, bias = module.weight(), module.bias()
+            total += weight.numel() * weight.element_size()
+            if bias is not None:
+                total += bias.numel() * bias.element_size()
+    return total
+
+
+def _quantized_cache_path(model_name):
+    if not QUANTIZED_CACHE_DIR:
+        return None
+    return os.path.join(QUANTIZED_CACHE_DIR, f"{model_name.replace('/', '__')}-int8.pt")
+
+
+def _load_quantized(model_key, model_name):
+    """
+    Returns the int8 dynamically quantized model. A cached artifact is loaded directly,
+    without materializing the fp32 weights first; otherwise the model is quantized and cached.
+    """
+    cache_path = _quantized_cache_path(model_name)
+    if cache_path and os.path.exists(cache_path):
+        try:
+            model = torch.load(cache_path, weights_only=False)
+            print(f"[OK] Loaded pre-quantized model from {cache_path}")
+            return model
+        except Exception as e:
+            print(f"[WARN] Could not load quantized model from {cache_path}, re-quantizing: {e}")
+
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name, token=HF_TOKEN)
+    model.eval()
+    quantized = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    del model
+    print(f"[OK] Applied int8 dynamic quantization to {model_key}.")
+
+    if cache_path:
+        try:
+            os.makedirs(QUANTIZED_CACHE_DIR, exist_ok=True)
+            torch.save(quantized, cache_path)
+        except Exception as e:
+            print(f"[WARN] Could not cache quantized model: {e}")
+    return quantized
+
+
+def estimate_footprint_bytes(model_key, model_name, backend, quantize):
+    """
+    Expected memory of a model before it is loaded, so residency can evict first.
+    ONNX and cached int8 models are sized by their files. PyTorch models are sized by
+    their parameters, built from the config on the meta device (no weights are read).
+    A fresh int8 load counts as fp32, because the fp32 weights are loaded before quantizing.
+    """
+    if model_key == "gru":
+        return 0
+    if backend == "onnx":
+        try:
+            return onnx_footprint_bytes(model_name)
+        except OSError:
+            pass  # not exported yet: size it like the PyTorch weights it is exported from
+    if quantize:
+        cache_path = _quantized_cache_path(model_name)
+        if cache_path and os.path.exists(cache_path):
+            return os.path.getsize(cache_path)
+    config = AutoConfig.from_pretrained(model_name, token=HF_TOKEN)
+    with torch.device("meta"):
+        skeleton = AutoModelForSeq2SeqLM.from_config(config)
+    return model_footprint_bytes(skeleton)
+
+
+def load_model(model_key, quantize=None):
+    """
+    Loads the selected model (cached for performance, within the memory budget).
+    `quantize` overrides the QUANTIZED_MODELS setting (used for fp32/int8 comparisons) and
+    always loads the PyTorch variant, so both sides of a comparison share one backend.
+    """
+    if quantize is None:
+        quantize = is_quantized(model_key)
+        backend = model_backend(model_key)
+    else:
+        backend = "pytorch"
+    cache_key = f"{model_key}:int8" if quantize else model_key
+    if backend != "pytorch":
+        cache_key = f"{model_key}:{backend}"
 
     model_name = MODEL_REGISTRY.get(model_key)
     if not model_name:
         raise ValueError(f"❌ Unknown model key: {model_key}")
 
+    def _footprint(loaded):
+        _, model = loaded
+        if model_key == "gru":
+            return 0
+        if backend == "onnx":
+            return onnx_footprint_bytes(model_name)
+        return model_footprint_bytes(model)
+
+    return residency.get_or_load(
+        cache_key, lambda: _load_model_uncached(model_key, model_name, backend, quantize), _footprint,
+        estimate_fn=lambda: estimate_footprint_bytes(model_key, model_name, backend, quantize)
+    )
+
+
+def _load_model_uncached(model_key, model_name, backend, quantize):
     if model_key == "gru":
-        _loaded[model_key] = ("gru_tokenizer", "gru_model")
         print("[OK] GRU baseline ready (simple dictionary).")
-        return _loaded[model_key]
+        return ("gru_tokenizer", "gru_model")
 
-    print(f"[LOADING] Loading model: {model_name} (device={device}, accelerate={_have_accelerate})")
+    print(f"[LOADING] Loading model: {model_name} (backend={backend}, device={device}, "
+          f"accelerate={_have_accelerate}, int8={quantize})")
 
     try:
         tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True, token=HF_TOKEN)
 
-        if _have_accelerate and torch.cuda.is_available():
+        if backend == "onnx":
+            return (tokenizer, load_onnx_model(model_name, token=HF_TOKEN))
+        elif backend != "pytorch":
+            raise ValueError(f"❌ Unknown backend '{backend}' for model {model_key}")
+        elif quantize:
+            # Dynamic quantization is a CPU-only inference path
+            model = _load_quantized(model_key, model_name)
+        elif _have_accelerate and torch.cuda.is_available():
             # Load model with accelerate offload if available
             load_kwargs = {"device_map": "auto"}
             if OFFLOAD_FOLDER:
@@ -78,89 +250,482 @@ def load_model(model_key):
         print(f"[ERROR] Error loading model {model_name}: {e}")
         raise
 
-    _loaded[model_key] = (tokenizer, model)
-    return _loaded[model_key]
+    # Inference only: eval mode and no autograd bookkeeping, so forked workers
+    # never write to (and copy) the shared weight pages.
+    model.eval()
+    for param in model.parameters():
+        param.requires_grad_(False)
+
+    return (tokenizer, model)
+
+
+def preload_models(model_keys):
+    """
+    Loads models eagerly, e.g. in the gunicorn master before workers fork so
+    their weights are shared copy-on-write instead of loaded once per worker.
+    """
+    for model_key in model_keys:
+        model_key = model_key.strip()
+        if model_key:
+            load_model(model_key)
 
 
 # =======================
-# 🔹 Translation Logic
+# 🔹 Language Pairs
 # =======================
-def translate_text_with_model(text, model_key):
-    """Translates English → Hindi using selected model."""
-    try:
-        if model_key == "gru":
-            return translate_with_gru_baseline(text)
+def resolve_language_pair(model_key, src_lang="en", tgt_lang="hi"):
+    """Maps ISO source/target languages to the model's codes; raises ValueError if unsupported."""
+    if model_key == "cascade":
+        if not cascade_stages(src_lang, tgt_lang):
+            raise ValueError(f"Unsupported language pair {src_lang}→{tgt_lang} for model 'cascade'")
+        return None, None
+    codes = LANGUAGE_CODES.get(model_key, {})
+    if src_lang == tgt_lang or src_lang not in codes or tgt_lang not in codes:
+        raise ValueError(f"Unsupported language pair {src_lang}→{tgt_lang} for model '{model_key}'")
+    if model_key in FIXED_PAIR_MODELS and (src_lang, tgt_lang) != ("en", "hi"):
+        raise ValueError(f"Model '{model_key}' only supports en→hi")
+    return codes[src_lang], codes[tgt_lang]
 
-        tokenizer, model = load_model(model_key)
-        if not text or not text.strip():
-            return {"error": "Empty text provided."}
 
-        start_time = time.time()
+def supported_languages(model_key):
+    if model_key == "cascade":
+        return sorted({lang for key in CASCADE_MODELS for lang in LANGUAGE_CODES.get(key, {})})
+    return sorted(LANGUAGE_CODES.get(model_key, {}))
+
+
+class _LangTokenizer:
+    """
+    A private tokenizer copy bound to one source language.
+
+    Setting `src_lang` rewrites the tokenizer's special-token template, and fast
+    tokenizers also rewrite their truncation/padding state on every call, so a
+    shared tokenizer is never mutated per request. Each (tokenizer, src_lang)
+    gets its own copy, and its cheap encode/decode calls take a small lock;
+    `model.generate` itself runs fully in parallel.
+    """
+
+    def __init__(self, tokenizer, src_code):
+        if src_code is not None:
+            tokenizer = copy.deepcopy(tokenizer)
+            tokenizer.src_lang = src_code
+        self.tokenizer = tokenizer
+        self._lock = threading.Lock()
+
+    def __call__(self, texts, **kwargs):
+        with self._lock:
+            return self.tokenizer(texts, **kwargs)
+
+    def decode(self, token_ids, **kwargs):
+        with self._lock:
+            return self.tokenizer.decode(token_ids, **kwargs)
 
-        # ── Set source language BEFORE tokenization (critical for NLLB & M2M100) ──
-        if model_key == "nllb":
-            tokenizer.src_lang = "eng_Latn"
-        elif model_key == "marian":
-            tokenizer.src_lang = "en"
+    def batch_decode(self, sequences, **kwargs):
+        with self._lock:
+            return self.tokenizer.batch_decode(sequences, **kwargs)
 
-        # Tokenize input text
-        inputs = tokenizer(text, return_tensors="pt", padding=True, truncation=True, max_length=512)
 
-        # Move inputs to same device as model
+# Per-language tokenizer copies keyed by base tokenizer. A fixed-pair wrapper holds its
+# base tokenizer strongly, so entries are dropped explicitly when residency evicts a model
+# (requests still using a wrapper keep their own reference).
+_lang_tokenizers = weakref.WeakKeyDictionary()
+_lang_tokenizers_lock = threading.Lock()
+
+
+def _drop_lang_tokenizers(key, value):
+    tokenizer = value[0] if isinstance(value, tuple) else None
+    with _lang_tokenizers_lock:
         try:
-            model_device = next(model.parameters()).device
-        except StopIteration:
-            model_device = torch.device(device)
-        inputs = {k: v.to(model_device) for k, v in inputs.items()}
+            _lang_tokenizers.pop(tokenizer, None)
+        except TypeError:
+            pass  # not weak-referenceable (e.g. the GRU placeholder string): never stored
+
+
+def _lang_tokenizer(tokenizer, src_code):
+    with _lang_tokenizers_lock:
+        per_lang = _lang_tokenizers.setdefault(tokenizer, {})
+        if src_code not in per_lang:
+            per_lang[src_code] = _LangTokenizer(tokenizer, src_code)
+        return per_lang[src_code]
+
 
-        # Generation configuration
-        gen_kwargs = {"max_length": 128, "num_beams": 5}
+# =======================
+# 🔹 Translation Logic
+# =======================
+DEFAULT_GENERATION = dict(DECODING_PROFILES["quality"])
+
+def _generation_kwargs(tokenizer, model_key, tgt_code="hin_Deva"):
+    """Returns model-specific generation settings (read-only use of the tokenizer)."""
+    # Generation configuration
+    gen_kwargs = dict(DEFAULT_GENERATION)
 
-        # Handle NLLB-specific target language forcing
-        if model_key == "nllb":
+    # Handle NLLB-specific target language forcing
+    if model_key == "nllb":
+        tgt_id = None
+        try:
+            tid = tokenizer.convert_tokens_to_ids(tgt_code)
+            if tid != tokenizer.unk_token_id:
+                tgt_id = tid
+        except Exception:
             tgt_id = None
-            try:
-                if hasattr(tokenizer, "lang_code_to_id"):
-                    tgt_id = tokenizer.lang_code_to_id.get("hin_Deva", None)
-                else:
-                    tid = tokenizer.convert_tokens_to_ids("hin_Deva")
-                    if tid != tokenizer.unk_token_id:
-                        tgt_id = tid
-            except Exception:
-                tgt_id = None
-            if tgt_id is not None:
-                gen_kwargs["forced_bos_token_id"] = tgt_id
+        if tgt_id is not None:
+            gen_kwargs["forced_bos_token_id"] = tgt_id
 
-        # Handle M2M100-specific target language forcing
-        elif model_key == "marian":
+    # Handle M2M100-specific target language forcing
+    elif model_key == "marian":
+        try:
+            tgt_id = tokenizer.get_lang_id(tgt_code)
+            gen_kwargs["forced_bos_token_id"] = tgt_id
+        except Exception:
             try:
-                tgt_id = tokenizer.get_lang_id("hi")
-                gen_kwargs["forced_bos_token_id"] = tgt_id
+                tgt_id = tokenizer.convert_tokens_to_ids(f"__{tgt_code}__")
+                if tgt_id != tokenizer.unk_token_id:
+                    gen_kwargs["forced_bos_token_id"] = tgt_id
             except Exception:
-                try:
-                    tgt_id = tokenizer.convert_tokens_to_ids("__hi__")
-                    if tgt_id != tokenizer.unk_token_id:
-                        gen_kwargs["forced_bos_token_id"] = tgt_id
-                except Exception:
-                    pass
+                pass
+
+    return gen_kwargs
+
+
+def _prepare(model_key, src_lang="en", tgt_lang="hi", quantize=None):
+    """Resolves the language pair and returns (language-bound tokenizer, model, generation kwargs)."""
+    src_code, tgt_code = resolve_language_pair(model_key, src_lang, tgt_lang)
+    tokenizer, model = load_model(model_key, quantize=quantize)
+    gen_kwargs = _generation_kwargs(tokenizer, model_key, tgt_code)
+    return _lang_tokenizer(tokenizer, src_code), model, gen_kwargs
+
 
-        # Generate translation
-        with torch.no_grad():
-            outputs = model.generate(**inputs, **gen_kwargs)
+def _observe_stage(model_key, stage, seconds):
+    """Records a pipeline stage in the metrics histogram and on any active request trace."""
+    metrics.observe("stage_duration_seconds", seconds, {"model": model_key, "stage": stage})
+    tracing.record(stage, seconds)
 
-        # Decode & cleanup
-        translation = tokenizer.decode(outputs[0], skip_special_tokens=True)
-        time_taken = round(time.time() - start_time, 2)
+
+def resolve_profile(profile, model_key, texts):
+    """Validates a decoding profile and turns `auto` into a concrete one for this input and load."""
+    validate_profile(profile)
+    if profile != "auto":
+        return profile
+    with _executors_lock:
+        executor = _executors.get(model_key)
+    return auto_profile(texts, executor.queue_depth if executor else 0, INFERENCE_MAX_QUEUE)
+
+
+def _sequence_confidences(model, outputs):
+    """Geometric-mean token probability (0-1) of each generated sequence."""
+    if getattr(outputs, "sequences_scores", None) is not None:
+        # Beam search already reports the length-normalised log-probability of the kept beam
+        return torch.exp(outputs.sequences_scores).tolist()
+    log_probs = model.compute_transition_scores(outputs.sequences, outputs.scores, normalize_logits=True)
+    generated = outputs.sequences[:, -log_probs.shape[1]:]
+    mask = (generated != model.config.pad_token_id) & torch.isfinite(log_probs)
+    mean_log_probs = (log_probs.masked_fill(~mask, 0.0).sum(dim=1) / mask.sum(dim=1).clamp(min=1))
+    return torch.exp(mean_log_probs).tolist()
+
+
+def _generate_translations(texts, model_key, quantize=None, src_lang="en", tgt_lang="hi", profile="quality",
+                           with_scores=False):
+    """
+    Runs one padded `model.generate` over a list of texts and decodes every output.
+    With `with_scores`, returns (translation, confidence) pairs instead.
+    """
+    with tracing.stage("load"):
+        tokenizer, model, gen_kwargs = _prepare(model_key, src_lang, tgt_lang, quantize=quantize)
+
+    # Tokenize input texts (padded to the longest in the batch)
+    t0 = time.perf_counter()
+    inputs = tokenizer(texts, return_tensors="pt", padding=True, truncation=True, max_length=512)
+
+    # Move inputs to same device as model
+    model_device = _model_device(model)
+    inputs = {k: v.to(model_device) for k, v in inputs.items()}
+    gen_kwargs.update(profile_generation(profile, inputs["input_ids"].shape[1]))
+
+    # Generate translations
+    t1 = time.perf_counter()
+    if with_scores:
+        gen_kwargs.update(output_scores=True, return_dict_in_generate=True)
+    with torch.no_grad():
+        outputs = model.generate(**inputs, **gen_kwargs)
+
+    t2 = time.perf_counter()
+    translations = tokenizer.batch_decode(outputs.sequences if with_scores else outputs, skip_special_tokens=True)
+    t3 = time.perf_counter()
+
+    for stage, seconds in (("tokenize", t1 - t0), ("generate", t2 - t1), ("decode", t3 - t2)):
+        _observe_stage(model_key, stage, seconds)
+    if with_scores:
+        return list(zip(translations, _sequence_confidences(model, outputs)))
+    return translations
+
+
+# =======================
+# 🔹 Inference Executors
+# =======================
+INFERENCE_MAX_CONCURRENCY = int(os.getenv("INFERENCE_MAX_CONCURRENCY", "8"))
+INFERENCE_MAX_QUEUE = int(os.getenv("INFERENCE_MAX_QUEUE", "32"))
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_inference_executor(model_key):
+    """Returns the bounded inference executor for a model (created on first use)."""
+    with _executors_lock:
+        executor = _executors.get(model_key)
+        if executor is None:
+            executor = InferenceExecutor(
+                model_key,
+                max_concurrency=INFERENCE_MAX_CONCURRENCY,
+                max_queue=INFERENCE_MAX_QUEUE,
+                on_queue_time=lambda seconds: _observe_stage(model_key, "queue", seconds)
+            )
+            _executors[model_key] = executor
+        return executor
+
+
+def get_inference_stats():
+    """Reports concurrency limits, queue depth, queue times and rejections per model."""
+    with _executors_lock:
+        executors = dict(_executors)
+    return {key: executor.stats() for key, executor in executors.items()}
+
+
+# =======================
+# 🔹 Micro-batching
+# =======================
+BATCHING_ENABLED = os.getenv("BATCHING_ENABLED", "1") == "1"
+BATCH_WINDOW_MS = float(os.getenv("BATCH_WINDOW_MS", "10"))
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "8"))
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_batch_scheduler(model_key, src_lang="en", tgt_lang="hi", profile="quality", with_scores=False):
+    """Returns the (lazily created) micro-batching scheduler for a model, language pair and profile."""
+    name = f"{model_key}:{src_lang}-{tgt_lang}:{profile}" + (":scored" if with_scores else "")
+    with _schedulers_lock:
+        scheduler = _schedulers.get(name)
+        if scheduler is None:
+
+            def run_batch(texts):
+                metrics.observe("batch_size", len(texts), {"model": model_key}, buckets=SIZE_BUCKETS)
+                return _generate_translations(
+                    texts, model_key, src_lang=src_lang, tgt_lang=tgt_lang, profile=profile, with_scores=with_scores
+                )
+
+            scheduler = BatchScheduler(
+                name, run_batch, window_ms=BATCH_WINDOW_MS, max_batch_size=BATCH_MAX_SIZE
+            )
+            _schedulers[name] = scheduler
+        return scheduler
+
+
+def get_batching_stats():
+    """Reports batching knobs and achieved batch sizes for every active model."""
+    with _schedulers_lock:
+        schedulers = dict(_schedulers)
+    return {
+        "enabled": BATCHING_ENABLED,
+        "window_ms": BATCH_WINDOW_MS,
+        "max_batch_size": BATCH_MAX_SIZE,
+        "models": {key: scheduler.stats() for key, scheduler in schedulers.items()}
+    }
+
+
+def configure_batching(window_ms=None, max_batch_size=None):
+    """Updates the batching window / max batch size for current and future schedulers."""
+    global BATCH_WINDOW_MS, BATCH_MAX_SIZE
+    if window_ms is not None:
+        BATCH_WINDOW_MS = max(0.0, float(window_ms))
+    if max_batch_size is not None:
+        BATCH_MAX_SIZE = max(1, int(max_batch_size))
+    with _schedulers_lock:
+        for scheduler in _schedulers.values():
+            scheduler.configure(BATCH_WINDOW_MS, BATCH_MAX_SIZE)
+    return get_batching_stats()
+
+
+# =======================
+# 🔹 Translation Cache
+# =======================
+_cache_ttl = os.getenv("TRANSLATION_CACHE_TTL")
+translation_cache = TranslationCache(
+    max_size=int(os.getenv("TRANSLATION_CACHE_SIZE", "10000")),
+    ttl_seconds=float(_cache_ttl) if _cache_ttl else None,
+    db_path=os.getenv("TRANSLATION_CACHE_DB")
+)
+CACHE_ENABLED = os.getenv("TRANSLATION_CACHE_ENABLED", "1") == "1"
+
+
+# =======================
+# 🔹 Translation Memory
+# =======================
+# Curated and previously translated sentences, checked before the model runs.
+# Learned pairs are keyed by model and concrete decoding profile and only match
+# exactly, so a hit is what the same model and settings produced for the same text.
+# A fuzzy hit returns the stored translation of a *similar* sentence: it is opt-in
+# (TM_FUZZY=1), curated pairs only, and never crosses a number or negation change.
+# Constructed empty; the stored pairs are indexed by a background startup component.
+TM_ENABLED = os.getenv("TM_ENABLED", "1") == "1"
+translation_memory = TranslationMemory(
+    db_path=os.getenv("TM_DB", "translation_memory.db") or None,
+    min_score=float(os.getenv("TM_MIN_SCORE", "0.9")),
+    ngram=int(os.getenv("TM_NGRAM", "3")),
+    refresh_seconds=float(os.getenv("TM_REFRESH_SECONDS", "5")),
+    fuzzy=os.getenv("TM_FUZZY", "0") == "1"
+)
+
+
+def learned_memory_key(model_key, profile):
+    """Key of pairs learned from a model under a concrete decoding profile (None for auto/unknown)."""
+    if profile not in DECODING_PROFILES:
+        return None
+    return f"{model_key}:{profile}"
+
+
+def _memory_lookup(text, model_key, src_lang, tgt_lang, profile=None):
+    """
+    The translation-memory match for `text`, or None (also when the memory is disabled).
+    Learned pairs are only consulted for a concrete profile; `auto` requests see curated pairs.
+    """
+    if not TM_ENABLED or not text or not text.strip():
+        return None
+    learned_key = learned_memory_key(model_key, profile or DEFAULT_PROFILE)
+    with tracing.stage("memory"):
+        match = translation_memory.lookup(text, src_lang, tgt_lang, model=learned_key)
+    metrics.inc("tm_lookups_total", {"result": match.match if match else "miss"})
+    if match is not None:
+        metrics.observe("tm_match_score", match.score, buckets=SCORE_BUCKETS)
+    return match
+
+
+def _memory_fields(match):
+    """
+    Response fields saying whether (and how closely) the translation came from the memory.
+    A hit is `served_by: "tm"`, with `tm_model`/`tm_profile` naming the model and decoding
+    profile that produced a learned pair (None for curated pairs).
+    """
+    if match is None:
+        return {"tm_hit": False, "tm_score": None}
+    tm_model, _, tm_profile = (match.model or "").partition(":")
+    return {
+        "served_by": "tm",
+        "tm_hit": True,
+        "tm_score": match.score,
+        "tm_match": match.match,
+        "tm_source": match.source,
+        "tm_model": tm_model or None,
+        "tm_profile": tm_profile or None
+    }
+
+
+def _collect_runtime_metrics():
+    """Exports cache, inference-queue, residency and translation-memory state as gauges at scrape time."""
+    samples = []
+    cache = translation_cache.stats()
+    for field in ("hits", "misses", "evictions", "size"):
+        samples.append((f"cache_{field}", None, cache[field]))
+    for model_key, stats in get_inference_stats().items():
+        for field in ("running", "queued", "rejected", "completed"):
+            samples.append((f"inference_{field}", {"model": model_key}, stats[field]))
+    resident = residency.stats()
+    samples.append(("models_resident_mb", None, resident["used_mb"]))
+    samples.append(("model_loads", None, resident["loads"]))
+    samples.append(("model_evictions", None, resident["evictions"]))
+    samples.append(("tm_entries", None, translation_memory.size()))
+    return samples
+
+
+metrics.register_collector(_collect_runtime_metrics)
+
+
+def _run_inference(text, model_key, src_lang, tgt_lang, profile, with_scores=False):
+    """
+    Admission control: at most INFERENCE_MAX_CONCURRENCY requests in flight per model,
+    INFERENCE_MAX_QUEUE waiting, the rest rejected with QueueFullError.
+    Concurrent in-flight requests for the same model share one padded generate call.
+    """
+    executor = get_inference_executor(model_key)
+    if BATCHING_ENABLED:
+        scheduler = get_batch_scheduler(model_key, src_lang, tgt_lang, profile, with_scores)
+        return executor.run(lambda: scheduler.submit(text).result())
+    return executor.run(
+        _generate_translations, [text], model_key, src_lang=src_lang, tgt_lang=tgt_lang,
+        profile=profile, with_scores=with_scores
+    )[0]
+
+
+def translate_text_with_model(text, model_key, src_lang="en", tgt_lang="hi", profile=None, use_memory=True):
+    """
+    Translates text (English → Hindi by default) using selected model.
+    `profile` picks the decoding profile (fast, balanced, quality or auto; default DECODING_PROFILE).
+    A translation-memory hit is returned without running the model (`use_memory=False` skips it).
+    """
+    start_time = time.perf_counter()
+    match = _memory_lookup(text, model_key, src_lang, tgt_lang, profile) if use_memory else None
+    if match is not None:
+        return {
+            "model_used": model_key,
+            "translation": match.translation,
+            "time_taken": round(time.perf_counter() - start_time, 2),
+            "cached": False,
+            **_memory_fields(match)
+        }
+    result = _translate_with_model(text, model_key, src_lang, tgt_lang, profile)
+    if "error" not in result:
+        result.update(_memory_fields(None))
+    return result
+
+
+def _translate_with_model(text, model_key, src_lang, tgt_lang, profile):
+    try:
+        if model_key == "gru":
+            return translate_with_gru_baseline(text, profile=_gru_profile(profile, text))
+        if model_key == "cascade":
+            return translate_with_cascade(text, src_lang, tgt_lang, profile)
+
+        if not text or not text.strip():
+            return {"error": "Empty text provided."}
+
+        start_time = time.perf_counter()
+        profile = resolve_profile(profile or DEFAULT_PROFILE, model_key, text)
+
+        # Cache hits skip tokenization and generation entirely
+        cache_key = make_cache_key(model_key, text, dict(
+            DECODING_PROFILES[profile], int8=is_quantized(model_key), backend=model_backend(model_key),
+            src_lang=src_lang, tgt_lang=tgt_lang
+        ))
+        with tracing.stage("cache"):
+            cached = translation_cache.get(cache_key) if CACHE_ENABLED else None
+        if cached is not None:
+            return {
+                "model_used": model_key,
+                "translation": cached,
+                "time_taken": round(time.perf_counter() - start_time, 2),
+                "profile": profile,
+                "cached": True
+            }
+
+        translation = _run_inference(text, model_key, src_lang, tgt_lang, profile)
+
+        time_taken = round(time.perf_counter() - start_time, 2)
 
         if not translation.strip():
             translation = "Could not translate text."
+        elif CACHE_ENABLED:
+            translation_cache.put(cache_key, translation)
 
         return {
             "model_used": model_key,
             "translation": translation,
-            "time_taken": time_taken
+            "time_taken": time_taken,
+            "profile": profile,
+            "cached": False
         }
 
+    except QueueFullError:
+        raise
     except Exception as e:
         import traceback
         print("[ERROR] Translation error:", e)
@@ -168,12 +733,356 @@ def translate_text_with_model(text, model_key):
         return {"error": str(e)}
 
 
+# =======================
+# 🔹 Streaming Translation
+# =======================
+def stream_translation(text, model_key, src_lang="en", tgt_lang="hi"):
+    """
+    Starts decoding and returns an iterator of partial translated output.
+    Uses greedy decoding, since beam search cannot stream its final hypothesis faithfully.
+    The model is loaded and the inference slot reserved before this returns, so
+    QueueFullError and load failures reach the caller before any event is sent.
+    """
+    from transformers import TextIteratorStreamer
+
+    start_time = time.perf_counter()
+    if model_key == "gru":
+        result = translate_with_gru_baseline(text)
+        return iter([{"delta": result["translation"], "text": result["translation"]}, {"done": True, **result}])
+
+    tokenizer, model, gen_kwargs = _prepare(model_key, src_lang, tgt_lang)
+    gen_kwargs["num_beams"] = 1
+
+    inputs = tokenizer(text, return_tensors="pt", truncation=True, max_length=512)
+    model_device = _model_device(model)
+    inputs = {k: v.to(model_device) for k, v in inputs.items()}
+
+    streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True)
+    errors = []
+
+    def _run():
+        try:
+            with torch.no_grad():
+                model.generate(**inputs, **gen_kwargs, streamer=streamer)
+        except Exception as e:
+            errors.append(e)
+            streamer.end()
+
+    worker = get_inference_executor(model_key).submit(_run)
+
+    def _events():
+        partial = ""
+        for delta in streamer:
+            if not delta:
+                continue
+            partial += delta
+            yield {"delta": delta, "text": partial}
+        worker.result()
+
+        if errors:
+            raise errors[0]
+
+        yield {
+            "done": True,
+            "model_used": model_key,
+            "translation": partial.strip(),
+            "time_taken": round(time.perf_counter() - start_time, 2)
+        }
+
+    return _events()
+
+
+# =======================
+# 🔹 Bulk Translation
+# =======================
+BULK_MAX_BATCH_SIZE = int(os.getenv("BULK_MAX_BATCH_SIZE", "32"))
+BULK_MAX_BATCH_TOKENS = int(os.getenv("BULK_MAX_BATCH_TOKENS", "4096"))
+
+
+def _length_buckets(lengths, max_batch_size, max_batch_tokens):
+    """Groups indices sorted by token length so each padded batch stays within the token budget."""
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    buckets, current, longest = [], [], 0
+    for idx in order:
+        longest_if_added = max(longest, lengths[idx])
+        if current and (len(current) >= max_batch_size
+                        or longest_if_added * (len(current) + 1) > max_batch_tokens):
+            buckets.append(current)
+            current, longest_if_added = [], lengths[idx]
+        current.append(idx)
+        longest = longest_if_added
+    if current:
+        buckets.append(current)
+    return buckets
+
+
+def _bulk_generate(texts, model_key, src_lang, tgt_lang, profile, max_batch_size, max_batch_tokens,
+                   with_scores=False):
+    """Translates non-empty `texts` in length-sorted buckets; outputs follow the input order."""
+    if not texts:
+        return []
+    tokenizer, _, _ = _prepare(model_key, src_lang, tgt_lang)
+    encoded = tokenizer(texts, truncation=True, max_length=512)
+    lengths = [len(ids) for ids in encoded["input_ids"]]
+    outputs = [None] * len(texts)
+    for bucket in _length_buckets(lengths, max_batch_size, max_batch_tokens):
+        results = get_inference_executor(model_key).run(
+            _generate_translations, [texts[i] for i in bucket], model_key,
+            src_lang=src_lang, tgt_lang=tgt_lang, profile=profile, with_scores=with_scores
+        )
+        for i, result in zip(bucket, results):
+            outputs[i] = result
+    return outputs
+
+
+def translate_batch_with_model(texts, model_key, max_batch_size=None, max_batch_tokens=None,
+                               src_lang="en", tgt_lang="hi", profile=None, use_memory=True):
+    """
+    Translates many sentences at once.
+    Inputs are sorted by token length and grouped into buckets to minimise padding;
+    results are returned in the original order. Sentences found in the translation
+    memory are not sent to the model (`served_by` marks them "tm" and `tm_scores`
+    holds each one's match score).
+    """
+    start_time = time.perf_counter()
+    matches = [_memory_lookup(text, model_key, src_lang, tgt_lang, profile) if use_memory else None
+               for text in texts]
+    misses = [i for i, match in enumerate(matches) if match is None]
+    if len(misses) == len(texts):
+        result = _translate_batch_with_model(texts, model_key, max_batch_size, max_batch_tokens,
+                                             src_lang, tgt_lang, profile)
+    else:
+        result = _translate_batch_with_model([texts[i] for i in misses], model_key, max_batch_size,
+                                             max_batch_tokens, src_lang, tgt_lang, profile)
+        translations = [match.translation if match else "" for match in matches]
+        for i, translation in zip(misses, result["translations"]):
+            translations[i] = translation
+        result["translations"] = translations
+        served_by = ["tm" if match else None for match in matches]
+        for i, model in zip(misses, result.get("served_by", [model_key] * len(misses))):
+            served_by[i] = model
+        result["served_by"] = served_by
+        result["count"] = len(texts)
+        result["time_taken"] = round(time.perf_counter() - start_time, 2)
+    result["tm_hits"] = len(texts) - len(misses)
+    result["tm_scores"] = [match.score if match else None for match in matches]
+    return result
+
+
+def _translate_batch_with_model(texts, model_key, max_batch_size, max_batch_tokens, src_lang, tgt_lang, profile):
+    if model_key == "cascade":
+        return _translate_batch_with_cascade(texts, max_batch_size, max_batch_tokens, src_lang, tgt_lang, profile)
+    if model_key == "gru":
+        profile = _gru_profile(profile, [t for t in texts if t])
+    else:
+        profile = resolve_profile(profile or DEFAULT_PROFILE, model_key, [t for t in texts if t])
+    max_batch_size = max_batch_size or BULK_MAX_BATCH_SIZE
+    max_batch_tokens = max_batch_tokens or BULK_MAX_BATCH_TOKENS
+    start_time = time.perf_counter()
+    translations = [""] * len(texts)
+
+    if model_key == "gru":
+        for i, text in enumerate(texts):
+            if text and text.strip():
+                translations[i] = translate_with_gru_baseline(text, profile=profile)["translation"]
+    else:
+        indices = [i for i, text in enumerate(texts) if text and text.strip()]
+        outputs = _bulk_generate([texts[i] for i in indices], model_key, src_lang, tgt_lang, profile,
+                                 max_batch_size, max_batch_tokens)
+        for i, translation in zip(indices, outputs):
+            translations[i] = translation
+
+    return {
+        "model_used": model_key,
+        "translations": translations,
+        "count": len(texts),
+        "time_taken": round(time.perf_counter() - start_time, 2),
+        "profile": profile
+    }
+
+
+# =======================
+# 🔹 Confidence Cascade
+# =======================
+# Models tried in order (cheapest first). A translation whose confidence (geometric-mean
+# token probability from the generation scores) is below CASCADE_MIN_CONFIDENCE is re-run
+# on the next model; the last model's output is always accepted.
+CASCADE_MODELS = [m.strip() for m in os.getenv("CASCADE_MODELS", "mt5,nllb").split(",")
+                  if m.strip() in MODEL_REGISTRY and m.strip() != "gru"]
+CASCADE_MIN_CONFIDENCE = float(os.getenv("CASCADE_MIN_CONFIDENCE", "0.5"))
+
+
+def cascade_stages(src_lang="en", tgt_lang="hi"):
+    """The cascade models that support this language pair, in escalation order."""
+    stages = []
+    for model_key in CASCADE_MODELS:
+        try:
+            resolve_language_pair(model_key, src_lang, tgt_lang)
+        except ValueError:
+            continue
+        stages.append(model_key)
+    return stages
+
+
+def _record_cascade(attempts):
+    metrics.inc("cascade_requests_total")
+    for attempt in attempts:
+        metrics.observe("cascade_confidence", attempt["confidence"], {"model": attempt["model"]},
+                        buckets=SCORE_BUCKETS)
+    for previous, current in zip(attempts, attempts[1:]):
+        metrics.inc("cascade_escalations_total", {"from": previous["model"], "to": current["model"]})
+    if len(attempts) > 1:
+        metrics.inc("cascade_escalated_total")
+    metrics.inc("cascade_served_total", {"model": attempts[-1]["model"]})
+
+
+def translate_with_cascade(text, src_lang="en", tgt_lang="hi", profile=None):
+    """Translates with the cheapest cascade model, escalating while confidence is too low."""
+    if not text or not text.strip():
+        return {"error": "Empty text provided."}
+    stages = cascade_stages(src_lang, tgt_lang)
+    if not stages:
+        return {"error": f"No cascade model supports {src_lang}→{tgt_lang}"}
+
+    start_time = time.perf_counter()
+    cache_key = make_cache_key("cascade", text, dict(
+        models=stages, min_confidence=CASCADE_MIN_CONFIDENCE, profile=profile or DEFAULT_PROFILE,
+        src_lang=src_lang, tgt_lang=tgt_lang
+    ))
+    with tracing.stage("cache"):
+        cached = translation_cache.get(cache_key) if CACHE_ENABLED else None
+    if cached is not None:
+        return {
+            "model_used": "cascade",
+            "translation": cached,
+            "time_taken": round(time.perf_counter() - start_time, 2),
+            "cached": True
+        }
+
+    attempts = []
+    for model_key in stages:
+        stage_start = time.perf_counter()
+        stage_profile = resolve_profile(profile or DEFAULT_PROFILE, model_key, text)
+        translation, confidence = _run_inference(text, model_key, src_lang, tgt_lang, stage_profile, with_scores=True)
+        attempts.append({
+            "model": model_key,
+            "confidence": round(confidence, 4),
+            "profile": stage_profile,
+            "time_taken": round(time.perf_counter() - stage_start, 2)
+        })
+        if confidence >= CASCADE_MIN_CONFIDENCE and translation.strip():
+            break
+    _record_cascade(attempts)
+
+    if not translation.strip():
+        translation = "Could not translate text."
+    elif CACHE_ENABLED:
+        translation_cache.put(cache_key, translation)
+
+    return {
+        "model_used": "cascade",
+        "served_by": attempts[-1]["model"],
+        "translation": translation,
+        "confidence": attempts[-1]["confidence"],
+        "escalated": len(attempts) > 1,
+        "cascade": attempts,
+        "time_taken": round(time.perf_counter() - start_time, 2),
+        "profile": attempts[-1]["profile"],
+        "cached": False
+    }
+
+
+def _translate_batch_with_cascade(texts, max_batch_size=None, max_batch_tokens=None,
+                                  src_lang="en", tgt_lang="hi", profile=None):
+    """Bulk cascade: every text goes through the first model; only low-confidence ones move on."""
+    max_batch_size = max_batch_size or BULK_MAX_BATCH_SIZE
+    max_batch_tokens = max_batch_tokens or BULK_MAX_BATCH_TOKENS
+    start_time = time.perf_counter()
+    stages = cascade_stages(src_lang, tgt_lang)
+    translations = [""] * len(texts)
+    served_by = [None] * len(texts)
+    attempts = {i: [] for i, text in enumerate(texts) if text and text.strip()}
+    pending = list(attempts)
+
+    for position, model_key in enumerate(stages):
+        if not pending:
+            break
+        stage_profile = resolve_profile(profile or DEFAULT_PROFILE, model_key, [texts[i] for i in pending])
+        results = _bulk_generate([texts[i] for i in pending], model_key, src_lang, tgt_lang, stage_profile,
+                                 max_batch_size, max_batch_tokens, with_scores=True)
+        last = position == len(stages) - 1
+        escalate = []
+        for i, (translation, confidence) in zip(pending, results):
+            attempts[i].append({"model": model_key, "confidence": round(confidence, 4)})
+            translations[i], served_by[i] = translation, model_key
+            if not last and (confidence < CASCADE_MIN_CONFIDENCE or not translation.strip()):
+                escalate.append(i)
+        pending = escalate
+
+    for item_attempts in attempts.values():
+        _record_cascade(item_attempts)
+
+    return {
+        "model_used": "cascade",
+        "translations": translations,
+        "served_by": served_by,
+        "escalated": sum(1 for a in attempts.values() if len(a) > 1),
+        "count": len(texts),
+        "time_taken": round(time.perf_counter() - start_time, 2),
+        "profile": profile or DEFAULT_PROFILE
+    }
+
+
+def configure_cascade(min_confidence=None, models=None):
+    """Updates the escalation threshold and/or model order at runtime."""
+    global CASCADE_MIN_CONFIDENCE, CASCADE_MODELS
+    if min_confidence is not None:
+        CASCADE_MIN_CONFIDENCE = min(1.0, max(0.0, float(min_confidence)))
+    if models is not None:
+        keys = [m.strip() for m in models if m.strip()]
+        invalid = [m for m in keys if m not in MODEL_REGISTRY or m == "gru"]
+        if invalid or not keys:
+            raise ValueError(f"Invalid cascade models: {invalid or models}")
+        CASCADE_MODELS = keys
+    return get_cascade_stats()
+
+
+def get_cascade_stats():
+    """Reports the cascade configuration, escalation rate and which model served the traffic."""
+    total = metrics.counter_value("cascade_requests_total")
+    served = {key: metrics.counter_value("cascade_served_total", {"model": key}) for key in CASCADE_MODELS}
+    escalations = {
+        f"{a}->{b}": metrics.counter_value("cascade_escalations_total", {"from": a, "to": b})
+        for a, b in zip(CASCADE_MODELS, CASCADE_MODELS[1:])
+    }
+    escalated = metrics.counter_value("cascade_escalated_total")
+    mean_confidence = {}
+    for key in CASCADE_MODELS:
+        snap = metrics.histogram_snapshot("cascade_confidence", {"model": key})
+        mean_confidence[key] = round(snap["sum"] / snap["count"], 4) if snap["count"] else 0.0
+    return {
+        "models": CASCADE_MODELS,
+        "min_confidence": CASCADE_MIN_CONFIDENCE,
+        "requests": total,
+        "escalated": escalated,
+        "escalation_rate": round(escalated / total, 4) if total else 0.0,
+        "served_by": served,
+        "escalations": escalations,
+        "mean_confidence": mean_confidence
+    }
+
+
 # =======================
 # 🔹 GRU Baseline Logic
 # =======================
-def translate_with_gru_baseline(text):
-    """Simple rule-based GRU baseline fallback."""
-    start_time = time.time()
+def _gru_profile(profile, texts):
+    # The GRU fallback has always decoded with a small beam unless a profile is asked for
+    return resolve_profile(profile, "nllb", texts) if profile else "balanced"
+
+
+def translate_with_gru_baseline(text, profile="balanced"):
+    """Simple rule-based GRU baseline fallback (NLLB with `profile` decoding for unknown phrases)."""
+    start_time = time.perf_counter()
     simple_dict = {
         "hello": "नमस्ते",
         "how are you": "तुम कैसे हो",
@@ -187,19 +1096,17 @@ def translate_with_gru_baseline(text):
         translation = simple_dict[text_lower]
     else:
         try:
-            tokenizer, model = load_model("nllb")
-            tokenizer.src_lang = "eng_Latn"
-            inputs = tokenizer(text, return_tensors="pt", truncation=True)
-            model_device = next(model.parameters()).device
-            inputs = {k: v.to(model_device) for k, v in inputs.items()}
-            with torch.no_grad():
-                outputs = model.generate(**inputs, max_length=128, num_beams=3)
-            translation = tokenizer.decode(outputs[0], skip_special_tokens=True)
+            translation = get_inference_executor("nllb").run(
+                _generate_translations, [text], "nllb", profile=profile
+            )[0]
+        except QueueFullError:
+            raise
         except Exception:
             translation = f"[GRU Baseline] {text} (Translation not available)"
 
     return {
         "model_used": "gru",
         "translation": translation,
-        "time_taken": round(time.time() - start_time, 2)
+        "time_taken": round(time.perf_counter() - start_time, 2),
+        "profile": profile
     }
@@ -0,0 +1,71 @@
+# ------------------------------------------------------------
+# onnx_backend.py — ONNX Runtime backend for the seq2seq models
+# ------------------------------------------------------------
+import os
+
+# optimum[onnxruntime] is optional; only needed when a model is configured for ONNX
+_have_optimum = False
+try:
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    _have_optimum = True
+except Exception:
+    _have_optimum = False
+
+ONNX_CACHE_DIR = os.getenv("ONNX_CACHE_DIR", "onnx_models")
+ONNX_EXPORT_ON_LOAD = os.getenv("ONNX_EXPORT_ON_LOAD", "0") == "1"
+
+
+def _require_optimum():
+    if not _have_optimum:
+        raise RuntimeError("ONNX backend requires optimum: pip install 'optimum[onnxruntime]'")
+
+
+def onnx_model_dir(model_name):
+    """Directory holding the exported encoder/decoder graphs for a Hugging Face model."""
+    return os.path.join(ONNX_CACHE_DIR, model_name.replace("/", "__"))
+
+
+def is_exported(model_name):
+    return os.path.isdir(onnx_model_dir(model_name)) and any(
+        f.endswith(".onnx") for f in os.listdir(onnx_model_dir(model_name))
+    )
+
+
+def export_onnx_model(model_name, token=None):
+    """Export a seq2seq model to ONNX encoder/decoder graphs and cache them on disk."""
+    _require_optimum()
+    from transformers import AutoTokenizer
+
+    target = onnx_model_dir(model_name)
+    print(f"[LOADING] Exporting {model_name} to ONNX ({target})")
+    model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True, token=token)
+    tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True, token=token)
+    os.makedirs(target, exist_ok=True)
+    model.save_pretrained(target)
+    tokenizer.save_pretrained(target)
+    print(f"[OK] Exported {model_name} to {target}")
+    return target
+
+
+def load_onnx_model(model_name, token=None):
+    """Load cached ONNX graphs under ONNX Runtime (CPU); returns a model exposing `.generate`."""
+    _require_optimum()
+    if not is_exported(model_name):
+        if not ONNX_EXPORT_ON_LOAD:
+            raise RuntimeError(
+                f"No ONNX export for {model_name} in {ONNX_CACHE_DIR}; run `python export_onnx.py <model_key>` first"
+            )
+        export_onnx_model(model_name, token=token)
+    model = ORTModelForSeq2SeqLM.from_pretrained(onnx_model_dir(model_name), provider="CPUExecutionProvider")
+    print(f"[OK] ONNX Runtime model loaded from {onnx_model_dir(model_name)}.")
+    return model
+
+
+def onnx_footprint_bytes(model_name):
+    """Approximate memory of an ONNX model as the size of its graph/weight files."""
+    target = onnx_model_dir(model_name)
+    return sum(
+        os.path.getsize(os.path.join(target, f))
+        for f in os.listdir(target)
+        if f.endswith((".onnx", ".onnx_data"))
+    )
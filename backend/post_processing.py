@@ -0,0 +1,75 @@
+# ------------------------------------------------------------
+# post_processing.py — Background queue for off-critical-path work
+# ------------------------------------------------------------
+import os
+import queue
+import threading
+
+
+class PostProcessor:
+    """
+    Runs non-essential per-request work (live scoring, statistics, history)
+    on background worker threads so responses return as soon as the
+    translation is ready. The queue is bounded; when it is full new work is
+    dropped and counted rather than slowing requests down.
+    """
+
+    def __init__(self, name, max_queue=1000, workers=1):
+        self.name = name
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self.processed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.workers = workers
+        self._pid = None
+
+    def _ensure_workers(self):
+        # Started lazily (and again after fork) so preloaded gunicorn workers get their own threads
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            for i in range(self.workers):
+                threading.Thread(target=self._loop, name=f"{self.name}-{i}", daemon=True).start()
+            self._pid = os.getpid()
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue `fn(*args, **kwargs)`; returns False if the queue was full and the work was dropped."""
+        self._ensure_workers()
+        try:
+            self._queue.put_nowait((fn, args, kwargs))
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def _loop(self):
+        while True:
+            fn, args, kwargs = self._queue.get()
+            try:
+                fn(*args, **kwargs)
+            except Exception as e:
+                print(f"[ERROR] {self.name} task failed: {e}")
+                with self._lock:
+                    self.failed += 1
+            else:
+                with self._lock:
+                    self.processed += 1
+            finally:
+                self._queue.task_done()
+
+    def join(self):
+        """Block until every queued task has run."""
+        self._queue.join()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "processed": self.processed,
+                "dropped": self.dropped,
+                "failed": self.failed
+            }
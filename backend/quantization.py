@@ -0,0 +1,72 @@
+# ------------------------------------------------------------
+# quantization.py — fp32 vs int8 quality/latency/memory comparison
+# ------------------------------------------------------------
+# Usage:
+#   python quantization.py nllb
+import os
+import sys
+import time
+from model_manager import MODEL_REGISTRY, load_model, model_footprint_bytes, _generate_translations
+from evaluation import CorpusScorer, EVALUATION_DATASET
+
+# Largest corpus BLEU drop (0-1 scale) the int8 variant may show and still pass the gate
+QUANT_MAX_BLEU_DROP = float(os.getenv("QUANT_MAX_BLEU_DROP", "0.02"))
+
+
+def _evaluate_variant(model_key, quantize, dataset):
+    # An explicit `quantize` always loads the PyTorch model, even if ONNX serves this key
+    _, model = load_model(model_key, quantize=quantize)
+    latencies = []
+    scorer = CorpusScorer()
+
+    for pair in dataset:
+        start = time.perf_counter()
+        translation = _generate_translations([pair["english"]], model_key, quantize=quantize)[0]
+        latencies.append(time.perf_counter() - start)
+        scorer.add(pair["hindi"], translation)
+
+    scores = scorer.result(include_sentences=False)
+    return {
+        "corpus_bleu": scores["corpus_bleu"],
+        "avg_bleu": scores["avg_bleu"],
+        "avg_meteor": scores["avg_meteor"],
+        "avg_latency": round(sum(latencies) / len(latencies), 4) if latencies else 0.0,
+        "model_size_mb": round(model_footprint_bytes(model) / (1024 * 1024), 1)
+    }
+
+
+def compare_quantization(model_key, dataset=None):
+    """
+    Evaluate the fp32 and int8 PyTorch variants of a model on the same dataset and
+    report BLEU/METEOR deltas alongside latency and memory savings. The gate uses
+    corpus BLEU, which is far less noisy than mean sentence BLEU on short segments.
+    """
+    if model_key not in MODEL_REGISTRY or model_key == "gru":
+        raise ValueError(f"Quantization comparison needs a seq2seq model, got '{model_key}'")
+    dataset = dataset or EVALUATION_DATASET
+
+    fp32 = _evaluate_variant(model_key, False, dataset)
+    int8 = _evaluate_variant(model_key, True, dataset)
+
+    bleu_delta = round(int8["corpus_bleu"] - fp32["corpus_bleu"], 4)
+    return {
+        "model": model_key,
+        "fp32": fp32,
+        "int8": int8,
+        "delta": {
+            "corpus_bleu": bleu_delta,
+            "avg_bleu": round(int8["avg_bleu"] - fp32["avg_bleu"], 4),
+            "meteor": round(int8["avg_meteor"] - fp32["avg_meteor"], 4),
+            "latency_speedup": round(fp32["avg_latency"] / int8["avg_latency"], 2) if int8["avg_latency"] else 0.0,
+            "memory_saved_mb": round(fp32["model_size_mb"] - int8["model_size_mb"], 1)
+        },
+        "max_bleu_drop": QUANT_MAX_BLEU_DROP,
+        "passed": -bleu_delta <= QUANT_MAX_BLEU_DROP
+    }
+
+
+if __name__ == "__main__":
+    import json
+    report = compare_quantization(sys.argv[1] if len(sys.argv) > 1 else "nllb")
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["passed"] else 1)
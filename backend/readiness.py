@@ -0,0 +1,78 @@
+# ------------------------------------------------------------
+# readiness.py — Background component loading and readiness tracking
+# ------------------------------------------------------------
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ComponentRegistry:
+    """
+    Tracks the load state of startup components (models, NLTK data, similarity
+    model). Critical components must be `ready` for the service to be ready;
+    non-critical ones only need to have finished (ready or failed).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._components = {}
+
+    def register(self, name, critical=True, state="pending"):
+        with self._lock:
+            self._components[name] = {
+                "state": state,
+                "critical": critical,
+                "load_time": None,
+                "error": None
+            }
+
+    def _update(self, name, **fields):
+        with self._lock:
+            self._components[name].update(fields)
+
+    def run(self, name, fn):
+        """Run a component's loader, recording state transitions and load time."""
+        self._update(name, state="loading")
+        start = time.monotonic()
+        try:
+            fn()
+        except Exception as e:
+            print(f"[ERROR] Failed to load {name}: {e}")
+            self._update(name, state="failed", error=str(e), load_time=round(time.monotonic() - start, 2))
+        else:
+            print(f"[OK] {name} ready in {time.monotonic() - start:.2f}s")
+            self._update(name, state="ready", load_time=round(time.monotonic() - start, 2))
+
+    def start_background(self, tasks, parallel=False):
+        """
+        Load `tasks` ([(name, fn, critical), ...]) on a background thread so the
+        server can bind immediately. With `parallel`, each task gets its own worker.
+        """
+        for name, _, critical in tasks:
+            self.register(name, critical=critical)
+
+        def _load_all():
+            if parallel:
+                with ThreadPoolExecutor(max_workers=len(tasks), thread_name_prefix="startup") as pool:
+                    for name, fn, _ in tasks:
+                        pool.submit(self.run, name, fn)
+            else:
+                for name, fn, _ in tasks:
+                    self.run(name, fn)
+
+        thread = threading.Thread(target=_load_all, name="startup-loader", daemon=True)
+        thread.start()
+        return thread
+
+    def is_ready(self):
+        with self._lock:
+            for component in self._components.values():
+                if component["critical"] and component["state"] != "ready":
+                    return False
+                if not component["critical"] and component["state"] in ("pending", "loading"):
+                    return False
+            return True
+
+    def report(self):
+        with self._lock:
+            return {name: dict(component) for name, component in self._components.items()}
@@ -0,0 +1,114 @@
+# ------------------------------------------------------------
+# reference_index.py — Precomputed embeddings for closest-reference lookup
+# ------------------------------------------------------------
+import hashlib
+import os
+import threading
+import numpy as np
+
+
+class ReferenceIndex:
+    """
+    Holds L2-normalised embeddings of the reference English sentences so the
+    closest reference for a query is a single matrix-vector product.
+
+    Embeddings are computed once per dataset (and model) and, when `cache_dir`
+    is set, persisted as `.npy` files keyed by a fingerprint of both. The dataset
+    version the matrix was built from is kept next to it, so checking for a
+    change is a single comparison instead of a pass over the dataset.
+    """
+
+    def __init__(self, encoder, model_name, cache_dir=None):
+        self.encoder = encoder
+        self.model_name = model_name
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        # (matrix, references) swapped as one tuple so readers never see a mixed state
+        self._state = (np.zeros((0, 0), dtype=np.float32), [])
+        self._fingerprint = None
+        self._content_hash = None
+        self._version = None
+
+    @property
+    def size(self):
+        return len(self._state[1])
+
+    def _compute_fingerprint(self, english_sentences):
+        digest = hashlib.sha1(self.model_name.encode("utf-8"))
+        for sentence in english_sentences:
+            digest.update(b"\x00" + sentence.encode("utf-8"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def _compute_content_hash(pairs):
+        digest = hashlib.sha1()
+        for pair in pairs:
+            digest.update(pair["english"].encode("utf-8") + b"\x00")
+            digest.update(pair["hindi"].encode("utf-8") + b"\x01")
+        return digest.hexdigest()
+
+    def _cache_path(self, fingerprint):
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, f"reference_index_{fingerprint}.npy")
+
+    def build(self, pairs, version=None):
+        """
+        (Re)builds the index from English→Hindi pairs, reusing a persisted matrix if available.
+        `version` identifies the dataset revision for `ensure_current`.
+        """
+        english_sentences = [pair["english"] for pair in pairs]
+        references = [pair["hindi"] for pair in pairs]
+        fingerprint = self._compute_fingerprint(english_sentences)
+        content_hash = self._compute_content_hash(pairs)
+
+        with self._lock:
+            if content_hash == self._content_hash:
+                self._version = version
+                return
+
+            matrix = None
+            if fingerprint == self._fingerprint:
+                # Only the Hindi references changed: the embeddings are still valid
+                matrix = self._state[0]
+
+            cache_path = self._cache_path(fingerprint)
+            if matrix is None and cache_path and os.path.exists(cache_path):
+                try:
+                    matrix = np.load(cache_path)
+                    print(f"[OK] Loaded reference index from {cache_path}")
+                except Exception as e:
+                    print(f"[WARN] Could not load reference index cache: {e}")
+                    matrix = None
+
+            if matrix is None:
+                matrix = self.encoder.encode(
+                    english_sentences, convert_to_numpy=True, normalize_embeddings=True
+                ).astype(np.float32)
+                if cache_path:
+                    try:
+                        os.makedirs(self.cache_dir, exist_ok=True)
+                        np.save(cache_path, matrix)
+                    except Exception as e:
+                        print(f"[WARN] Could not persist reference index: {e}")
+
+            self._state = (matrix, references)
+            self._fingerprint = fingerprint
+            self._content_hash = content_hash
+            self._version = version
+            print(f"[OK] Reference index ready ({len(references)} sentences).")
+
+    def ensure_current(self, pairs, version):
+        """Rebuilds the index when the dataset version has changed since the last build."""
+        if version != self._version:
+            self.build(pairs, version)
+
+    def closest_reference(self, text):
+        """Returns (hindi_reference, similarity) for the English sentence most similar to `text`."""
+        matrix, references = self._state
+        if not references:
+            return "", 0.0
+        query = self.encoder.encode(text, convert_to_numpy=True, normalize_embeddings=True)
+        scores = matrix @ query.astype(np.float32)
+        best = int(scores.argmax())
+        return references[best], float(scores[best])
@@ -0,0 +1,163 @@
+# ------------------------------------------------------------
+# residency.py — Memory-budgeted model residency with LRU eviction
+# ------------------------------------------------------------
+import gc
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class ModelResidency:
+    """
+    Keeps loaded models within a memory budget.
+
+    Each entry records its footprint; when a new model must load and the budget
+    would be exceeded, least-recently-used unpinned models are evicted first.
+    Room is made before loading, from the footprint of the last load or, for a
+    model never loaded, from the caller's estimate; that amount stays reserved
+    while the load runs and is corrected to the measured footprint afterwards.
+    Concurrent requests for a model that is still loading wait on the same load.
+    Requests already holding an evicted model keep it alive until they finish.
+    `on_evict(key, value)` is called (outside the lock) for every evicted entry,
+    so callers can drop state derived from it.
+    """
+
+    def __init__(self, budget_bytes=None, pinned=(), on_evict=None):
+        self.budget_bytes = budget_bytes
+        self.pinned = set(pinned)
+        self.on_evict = on_evict
+        self._lock = threading.Lock()
+        self._models = OrderedDict()        # key -> (value, footprint_bytes)
+        self._loading = {}                  # key -> Future shared by concurrent loaders
+        self._known_footprints = {}         # key -> footprint from the last load
+        self._reserved = {}                 # key -> bytes set aside for a load in progress
+        self.loads = 0
+        self.evictions = 0
+        self.hits = 0
+
+    def _is_pinned(self, key):
+        return key in self.pinned or key.split(":", 1)[0] in self.pinned
+
+    def _used_bytes(self):
+        return sum(footprint for _, footprint in self._models.values()) + sum(self._reserved.values())
+
+    def _make_room(self, needed, keep):
+        """
+        Evict LRU unpinned models until `needed` more bytes fit. Caller holds the
+        lock and passes the returned [(key, value)] to `_evicted()` after releasing it.
+        """
+        if self.budget_bytes is None:
+            return []
+        evicted = []
+        for key in list(self._models):
+            if self._used_bytes() + needed <= self.budget_bytes:
+                break
+            if key == keep or self._is_pinned(key):
+                continue
+            value, _ = self._models.pop(key)
+            self.evictions += 1
+            evicted.append((key, value))
+        if self._used_bytes() + needed > self.budget_bytes:
+            print(f"[WARN] Model memory budget exceeded: pinned/in-use models need "
+                  f"{(self._used_bytes() + needed) / 2**20:.0f} MB of {self.budget_bytes / 2**20:.0f} MB")
+        return evicted
+
+    def _evicted(self, evicted):
+        if not evicted:
+            return
+        print(f"[OK] Evicted models: {[key for key, _ in evicted]}")
+        if self.on_evict is not None:
+            for key, value in evicted:
+                try:
+                    self.on_evict(key, value)
+                except Exception as e:
+                    print(f"[WARN] Eviction callback failed for {key}: {e}")
+        del evicted[:]
+        gc.collect()
+
+    def get_or_load(self, key, loader, footprint_fn, estimate_fn=None):
+        """
+        Return the resident model for `key`, loading it (once) via `loader()` if needed.
+        `estimate_fn()` gives the expected footprint of a first load, before any weights exist.
+        """
+        estimate = 0
+        if estimate_fn is not None and key not in self._known_footprints:
+            try:
+                estimate = estimate_fn() or 0
+            except Exception as e:
+                print(f"[WARN] Could not estimate the footprint of {key}: {e}")
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                self.hits += 1
+                return self._models[key][0]
+            future = self._loading.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._loading[key] = future
+                # Free memory before loading, and hold it until the load finishes
+                needed = self._known_footprints.get(key, estimate)
+                evicted = self._make_room(needed, key)
+                self._reserved[key] = needed
+            else:
+                evicted = []
+
+        if not owner:
+            return future.result()
+        self._evicted(evicted)
+
+        try:
+            value = loader()
+            footprint = footprint_fn(value)
+            with self._lock:
+                self._reserved.pop(key, None)
+                evicted = self._make_room(footprint, key)
+                self._models[key] = (value, footprint)
+                self._known_footprints[key] = footprint
+                self.loads += 1
+            self._evicted(evicted)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._reserved.pop(key, None)
+                self._loading.pop(key, None)
+
+    def register(self, key, value, footprint=0):
+        """Insert an already-built model (e.g. a local stand-in) as resident."""
+        with self._lock:
+            evicted = self._make_room(footprint, key)
+            self._models[key] = (value, footprint)
+            self._known_footprints[key] = footprint
+        self._evicted(evicted)
+
+    def evict(self, key):
+        with self._lock:
+            entry = self._models.pop(key, None)
+            if entry is not None:
+                self.evictions += 1
+        if entry is None:
+            return False
+        self._evicted([(key, entry[0])])
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {
+                "budget_mb": round(self.budget_bytes / 2**20, 1) if self.budget_bytes is not None else None,
+                "used_mb": round(self._used_bytes() / 2**20, 1),
+                "pinned": sorted(self.pinned),
+                "resident": [
+                    {"key": key, "footprint_mb": round(footprint / 2**20, 1), "pinned": self._is_pinned(key)}
+                    for key, (_, footprint) in self._models.items()
+                ],
+                "loading": sorted(self._loading),
+                "reserved_mb": round(sum(self._reserved.values()) / 2**20, 1),
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "hits": self.hits
+            }
@@ -0,0 +1,115 @@
+# ------------------------------------------------------------
+# speech.py — Pluggable speech recognizers and chunked upload spooling
+# ------------------------------------------------------------
+import importlib
+import os
+import tempfile
+from abc import ABC, abstractmethod
+
+
+class SpeechNotUnderstood(Exception):
+    """The recognizer heard audio but could not transcribe it."""
+
+
+class SpeechServiceError(Exception):
+    """The recognizer backend failed (network, quota, missing engine)."""
+
+
+class UploadTooLarge(Exception):
+    def __init__(self, max_bytes):
+        super().__init__(f"Upload exceeds {max_bytes / 2**20:g} MB")
+        self.max_bytes = max_bytes
+
+
+# ------------------------------------------------------------
+# 🎙️ Recognizers
+# ------------------------------------------------------------
+class _SpeechRecognitionEngine(ABC):
+    """Shared plumbing for engines provided by the SpeechRecognition package."""
+
+    name = None
+
+    @abstractmethod
+    def _recognize(self, recognizer, audio, language):
+        """Transcribe `audio` with one of the recognizer's `recognize_*` methods."""
+
+    def transcribe(self, path, language="en-US"):
+        import speech_recognition as sr
+        recognizer = sr.Recognizer()
+        with sr.AudioFile(path) as source:
+            audio = recognizer.record(source)
+        try:
+            return self._recognize(recognizer, audio, language)
+        except sr.UnknownValueError:
+            raise SpeechNotUnderstood("Could not understand audio")
+        except sr.RequestError as e:
+            raise SpeechServiceError(f"Speech recognition error: {e}")
+
+
+class GoogleRecognizer(_SpeechRecognitionEngine):
+    """Google Web Speech API (network) — the default engine."""
+
+    name = "google"
+
+    def _recognize(self, recognizer, audio, language):
+        return recognizer.recognize_google(audio, language=language)
+
+
+class SphinxRecognizer(_SpeechRecognitionEngine):
+    """CMU PocketSphinx, fully offline (needs `pocketsphinx`)."""
+
+    name = "sphinx"
+
+    def _recognize(self, recognizer, audio, language):
+        return recognizer.recognize_sphinx(audio, language=language)
+
+
+class WhisperRecognizer(_SpeechRecognitionEngine):
+    """Local OpenAI Whisper model (needs `openai-whisper`); WHISPER_MODEL picks the size."""
+
+    name = "whisper"
+
+    def _recognize(self, recognizer, audio, language):
+        return recognizer.recognize_whisper(
+            audio, model=os.getenv("WHISPER_MODEL", "base"), language=language.split("-")[0]
+        ).strip()
+
+
+RECOGNIZERS = {"google": GoogleRecognizer, "sphinx": SphinxRecognizer, "whisper": WhisperRecognizer}
+
+
+def load_recognizer(spec="google"):
+    """Builds a recognizer from a registered name or a `module:ClassName` path."""
+    if spec in RECOGNIZERS:
+        return RECOGNIZERS[spec]()
+    module_name, _, class_name = spec.partition(":")
+    if not class_name:
+        raise ValueError(f"Unknown speech engine '{spec}' (use {', '.join(RECOGNIZERS)} or module:Class)")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+# ------------------------------------------------------------
+# 📥 Uploads
+# ------------------------------------------------------------
+def spool_upload(source, max_bytes, suffix=".wav", chunk_size=64 * 1024):
+    """
+    Copy a file-like upload to a temp file in fixed-size chunks, never holding
+    more than one chunk in memory. Returns the path (caller deletes it);
+    raises UploadTooLarge once more than `max_bytes` have been read.
+    """
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    written = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > max_bytes:
+                    raise UploadTooLarge(max_bytes)
+                out.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
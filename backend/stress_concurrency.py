@@ -0,0 +1,64 @@
+# ------------------------------------------------------------
+# stress_concurrency.py — Concurrent inference on one shared model instance
+# ------------------------------------------------------------
+# Translates a mix of language pairs sequentially, then again from many threads
+# at once (on the same loaded model/tokenizer), and checks every concurrent
+# output matches its sequential counterpart.
+#
+# Usage:
+#   python stress_concurrency.py [model_key] [threads] [rounds]
+import os
+import sys
+
+os.environ.setdefault("TRANSLATION_CACHE_ENABLED", "0")  # force real inference every time
+os.environ.setdefault("TM_ENABLED", "0")
+
+from concurrent.futures import ThreadPoolExecutor
+from model_manager import translate_text_with_model, supported_languages
+
+SENTENCES = [
+    "Hello, how are you?",
+    "The weather is nice today.",
+    "We are going to school.",
+    "She is reading a book.",
+]
+
+
+def build_cases(model_key):
+    languages = supported_languages(model_key)
+    targets = [lang for lang in ("hi", "bn", "mr", "fr") if lang in languages and lang != "en"] or ["hi"]
+    return [(text, "en", tgt) for text in SENTENCES for tgt in targets]
+
+
+def run(model_key="nllb", threads=16, rounds=4):
+    cases = build_cases(model_key)
+
+    def translate(case):
+        text, src, tgt = case
+        result = translate_text_with_model(text, model_key, src_lang=src, tgt_lang=tgt)
+        if "error" in result:
+            raise RuntimeError(result["error"])
+        return result["translation"]
+
+    expected = {case: translate(case) for case in cases}
+    workload = cases * rounds
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        outputs = list(pool.map(translate, workload))
+
+    mismatches = [(case, got) for case, got in zip(workload, outputs) if got != expected[case]]
+    print(f"{len(workload)} concurrent translations over {len(cases)} language-pair cases, "
+          f"{threads} threads: {len(mismatches)} mismatches")
+    for (text, src, tgt), got in mismatches[:10]:
+        print(f"  {src}→{tgt} {text!r}: expected {expected[(text, src, tgt)]!r}, got {got!r}")
+    return not mismatches
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    ok = run(
+        args[0] if len(args) > 0 else "nllb",
+        int(args[1]) if len(args) > 1 else 16,
+        int(args[2]) if len(args) > 2 else 4
+    )
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,62 @@
+import threading
+import time
+
+import pytest
+
+from batching import BatchScheduler
+
+
+def test_queued_items_run_as_one_batch_in_submission_order():
+    started, release = threading.Event(), threading.Event()
+    batches = []
+
+    def run_batch(items):
+        batches.append(list(items))
+        started.set()
+        release.wait(5)
+        return [item * 10 for item in items]
+
+    scheduler = BatchScheduler("test", run_batch, window_ms=100, max_batch_size=4)
+    first = scheduler.submit(0)
+    started.wait(5)  # the worker is now busy with the first batch
+    futures = [scheduler.submit(i) for i in range(1, 7)]
+    release.set()
+
+    assert first.result(5) == 0
+    assert [f.result(5) for f in futures] == [10, 20, 30, 40, 50, 60]
+    assert batches == [[0], [1, 2, 3, 4], [5, 6]]
+
+    # Counters are updated just after the futures resolve
+    deadline = time.monotonic() + 5
+    while scheduler.stats()["total_batches"] < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stats = scheduler.stats()
+    assert stats["total_batches"] == 3 and stats["total_requests"] == 7
+    assert stats["max_batch_size_seen"] == 4
+    assert stats["batch_size_histogram"] == {"1": 1, "2": 1, "4": 1}
+
+
+def test_a_failed_batch_fails_every_request_in_it():
+    def run_batch(items):
+        raise RuntimeError("generate failed")
+
+    scheduler = BatchScheduler("test", run_batch, window_ms=50, max_batch_size=8)
+    futures = [scheduler.submit(i) for i in range(3)]
+    for future in futures:
+        with pytest.raises(RuntimeError, match="generate failed"):
+            future.result(5)
+
+
+def test_a_short_result_list_fails_the_batch_instead_of_hanging():
+    scheduler = BatchScheduler("test", lambda items: items[:1], window_ms=50, max_batch_size=8)
+    futures = [scheduler.submit(i) for i in range(3)]
+    for future in futures:
+        with pytest.raises(RuntimeError, match="returned 1 results for 3 requests"):
+            future.result(5)
+
+
+def test_configure_clamps_values():
+    scheduler = BatchScheduler("test", lambda items: items)
+    scheduler.configure(window_ms=-5, max_batch_size=0)
+    assert (scheduler.window_ms, scheduler.max_batch_size) == (0.0, 1)
+    assert scheduler.submit("x").result(5) == "x"
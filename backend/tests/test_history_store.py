@@ -0,0 +1,121 @@
+import threading
+import time
+
+from history_store import HistoryStore
+
+
+def entry(i, model="nllb"):
+    return {"english": f"sentence {i}", "hindi": f"वाक्य {i}", "model": model,
+            "timestamp": f"2026-01-01T00:00:{i:02d}"}
+
+
+def test_reads_never_wait_for_the_writer_and_flush_makes_appends_visible(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"), flush_interval=5)
+    for i in range(3):
+        store.append(entry(i))
+
+    started = time.monotonic()
+    store.query()
+    store.count()
+    assert time.monotonic() - started < 1
+
+    assert store.flush(timeout=2)
+    page, cursor = store.query()
+    assert [e["english"] for e in page] == ["sentence 0", "sentence 1", "sentence 2"]
+    assert cursor is None
+
+
+def test_flush_does_not_wait_for_entries_appended_meanwhile(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"), batch_size=10, flush_interval=0.05)
+    stop = threading.Event()
+
+    def traffic():
+        i = 0
+        while not stop.is_set():
+            store.append(entry(i % 60))
+            i += 1
+            time.sleep(0.001)
+
+    writer = threading.Thread(target=traffic)
+    writer.start()
+    try:
+        time.sleep(0.05)
+        for _ in range(5):
+            assert store.flush(timeout=5)
+    finally:
+        stop.set()
+        writer.join()
+
+
+def test_cursor_pagination_and_filters(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"))
+    for i in range(5):
+        store.append(entry(i, model="nllb" if i % 2 else "mt5"))
+    store.flush()
+
+    page, cursor = store.query(limit=2)
+    assert [e["english"] for e in page] == ["sentence 3", "sentence 4"]
+    page, cursor = store.query(limit=2, cursor=cursor)
+    assert [e["english"] for e in page] == ["sentence 1", "sentence 2"]
+    page, cursor = store.query(limit=2, cursor=cursor)
+    assert [e["english"] for e in page] == ["sentence 0"] and cursor is None
+
+    assert store.count(model="nllb") == 2
+    assert store.count(since="2026-01-01T00:00:02", until="2026-01-01T00:00:04") == 2
+    assert [e["english"] for e in store.iter_all(model="mt5", page_size=1)] == \
+        ["sentence 0", "sentence 2", "sentence 4"]
+
+
+def test_history_persists_with_a_stable_identity(tmp_path):
+    path = str(tmp_path / "history.db")
+    first = HistoryStore(path)
+    first.append(entry(1))
+    first.flush()
+
+    second = HistoryStore(path)
+    assert second.identity == first.identity
+    second.flush()
+    assert second.count() == 1
+
+    second.clear()
+    first.flush()
+    assert first.count() == 0 and first.query() == ([], None)
+    assert HistoryStore(str(tmp_path / "other.db")).identity != first.identity
+
+
+def test_recent_pages_come_from_the_ring_and_older_ones_from_sqlite(tmp_path):
+    path = str(tmp_path / "history.db")
+    store = HistoryStore(path, ring_size=3)
+    for i in range(5):
+        store.append(entry(i))
+    store.flush()
+
+    with store._lock:
+        assert [e["english"] for e in store._ring] == ["sentence 2", "sentence 3", "sentence 4"]
+    page, cursor = store.query(limit=2)
+    assert [e["english"] for e in page] == ["sentence 3", "sentence 4"]
+    page, cursor = store.query(limit=2, cursor=cursor)
+    assert [e["english"] for e in page] == ["sentence 1", "sentence 2"]
+    page, cursor = store.query(limit=2, cursor=cursor)
+    assert [e["english"] for e in page] == ["sentence 0"] and cursor is None
+    assert store.count() == 5 and store.count(model="nllb") == 5
+
+    # Another process writing to the same table shows up after the next sync
+    other = HistoryStore(path, ring_size=3)
+    other.append(entry(5, model="mt5"))
+    other.flush()
+    store.flush()
+    assert store.query(limit=1)[0][0]["english"] == "sentence 5"
+    assert store.count() == 6
+
+
+def test_memory_only_store_keeps_a_bounded_ring():
+    store = HistoryStore(ring_size=3)
+    for i in range(5):
+        store.append(entry(i))
+
+    page, cursor = store.query(limit=2)
+    assert [(e["id"], e["english"]) for e in page] == [(4, "sentence 3"), (5, "sentence 4")]
+    assert [e["english"] for e in store.query(limit=2, cursor=cursor)[0]] == ["sentence 2"]
+    assert store.count() == 3 and store.flush()
+    assert HistoryStore().identity != store.identity
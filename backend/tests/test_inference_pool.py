@@ -0,0 +1,45 @@
+import threading
+import time
+
+import pytest
+
+from inference_pool import InferenceExecutor, QueueFullError
+
+
+def test_submissions_beyond_the_queue_are_rejected_immediately():
+    release = threading.Event()
+    executor = InferenceExecutor("test", max_concurrency=2, max_queue=1)
+    accepted = [executor.submit(release.wait, 5) for _ in range(3)]
+
+    with pytest.raises(QueueFullError) as excinfo:
+        executor.submit(release.wait, 5)
+    assert excinfo.value.name == "test" and excinfo.value.retry_after >= 1
+
+    deadline = time.monotonic() + 5
+    while executor.stats()["running"] < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stats = executor.stats()
+    assert (stats["running"], stats["queued"], stats["rejected"]) == (2, 1, 1)
+
+    release.set()
+    assert all(future.result(5) for future in accepted)
+    assert executor.stats()["completed"] == 3
+    # Capacity is released once jobs finish
+    assert executor.run(lambda: "ok") == "ok"
+
+
+def test_exceptions_reach_the_caller_and_free_the_slot():
+    executor = InferenceExecutor("test", max_concurrency=1, max_queue=0)
+    with pytest.raises(ZeroDivisionError):
+        executor.run(lambda: 1 / 0)
+    assert executor.run(lambda: 2) == 2
+    assert executor.queue_depth == 0
+
+
+def test_queue_time_is_reported():
+    waits = []
+    executor = InferenceExecutor("test", max_concurrency=1, max_queue=4, on_queue_time=waits.append)
+    for i in range(3):
+        executor.run(lambda: i)
+    assert len(waits) == 3 and all(wait >= 0 for wait in waits)
+    assert executor.stats()["max_queue_time"] >= executor.stats()["average_queue_time"] >= 0
@@ -0,0 +1,40 @@
+from residency import ModelResidency
+
+MB = 2**20
+
+
+def test_first_load_makes_room_from_the_estimate_before_loading():
+    residency = ModelResidency(budget_bytes=100 * MB)
+    residency.get_or_load("a", lambda: "A", lambda value: 60 * MB)
+    during_load = {}
+
+    def loader():
+        stats = residency.stats()
+        during_load.update(resident=[m["key"] for m in stats["resident"]], reserved=stats["reserved_mb"])
+        return "B"
+
+    residency.get_or_load("b", loader, lambda value: 50 * MB, estimate_fn=lambda: 60 * MB)
+    assert during_load == {"resident": [], "reserved": 60.0}
+    stats = residency.stats()
+    assert (stats["used_mb"], stats["reserved_mb"], stats["evictions"]) == (50.0, 0.0, 1)
+
+
+def test_known_footprint_wins_over_the_estimate_and_failed_estimates_are_ignored():
+    residency = ModelResidency(budget_bytes=100 * MB)
+    estimates = []
+    residency.get_or_load("a", lambda: "A", lambda value: 10 * MB, estimate_fn=lambda: 1 / 0)
+    residency.evict("a")
+    residency.get_or_load("a", lambda: "A", lambda value: 10 * MB,
+                          estimate_fn=lambda: estimates.append(1) or 90 * MB)
+    assert estimates == []
+    assert residency.stats()["used_mb"] == 10.0
+
+
+def test_pinned_models_survive_and_evictions_are_reported():
+    evicted = []
+    residency = ModelResidency(budget_bytes=100 * MB, pinned=["nllb"], on_evict=lambda k, v: evicted.append(k))
+    residency.get_or_load("nllb:int8", lambda: "N", lambda value: 50 * MB)
+    residency.get_or_load("mt5", lambda: "M", lambda value: 40 * MB)
+    residency.get_or_load("marian", lambda: "R", lambda value: 40 * MB)
+    assert evicted == ["mt5"]
+    assert [m["key"] for m in residency.stats()["resident"]] == ["nllb:int8", "marian"]
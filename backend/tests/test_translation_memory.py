@@ -0,0 +1,126 @@
+import random
+import string
+
+import pytest
+
+from translation_memory import TranslationMemory, _PairIndex, char_ngrams
+
+
+def dice(a, b):
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+def random_sentences(rng, count, vocabulary=200, words=(1, 6)):
+    lexicon = ["".join(rng.choices(string.ascii_lowercase[:6], k=rng.randint(1, 4))) for _ in range(vocabulary)]
+    return list({" ".join(rng.choices(lexicon, k=rng.randint(*words))) for _ in range(count)})
+
+
+@pytest.mark.parametrize("min_score", [0.5, 0.6, 0.7, 0.75, 0.8, 0.85, 0.9, 1.0])
+def test_fuzzy_search_matches_brute_force_dice(min_score):
+    rng = random.Random(min_score)
+    sources = {source: char_ngrams(source) for source in random_sentences(rng, 1000)}
+    index = _PairIndex()
+    for source, grams in sources.items():
+        index.add(source, source.upper(), "import", grams)
+
+    for query in random_sentences(rng, 100):
+        grams = char_ngrams(query)
+        expected = {source for source, stored in sources.items() if dice(grams, stored) >= min_score}
+        found = {index.entries[entry_id][0] for _, entry_id in index.search(grams, min_score, len(sources))}
+        assert found == expected, query
+
+
+def test_search_keeps_entries_scoring_exactly_the_threshold():
+    index = _PairIndex()
+    # 3 query grams vs 7 stored grams sharing 3: Dice = 6 / 10 = 0.6 exactly
+    query = frozenset({"aaa", "bbb", "ccc"})
+    stored = frozenset({"aaa", "bbb", "ccc", "ddd", "eee", "fff", "ggg"})
+    index.add("stored", "target", "import", stored)
+    assert [score for score, _ in index.search(query, 0.6, 5)] == [0.6]
+
+
+def test_exact_and_fuzzy_lookup():
+    tm = TranslationMemory(min_score=0.85, fuzzy=True)
+    tm.import_pairs([{"english": "Where is the railway station?", "hindi": "रेलवे स्टेशन कहाँ है?"}])
+
+    exact = tm.lookup("Where is  the railway station?")
+    assert exact.match == "exact" and exact.score == 1.0
+
+    fuzzy = tm.lookup("where is the railway station")
+    assert fuzzy.match == "fuzzy" and 0.85 <= fuzzy.score < 1.0
+    assert fuzzy.translation == "रेलवे स्टेशन कहाँ है?"
+
+    assert tm.lookup("Where is the bus stop?") is None
+    assert tm.stats()["exact_hits"] == 1 and tm.stats()["fuzzy_hits"] == 1 and tm.stats()["misses"] == 1
+
+
+def test_learned_pairs_only_serve_their_model_and_profile():
+    tm = TranslationMemory(fuzzy=True)
+    tm.import_pairs([{"english": "Good morning", "hindi": "from nllb", "model": "nllb:quality"}],
+                    origin="history", overwrite=False)
+
+    assert tm.lookup("Good morning", model="mt5:quality") is None
+    assert tm.lookup("Good morning", model="nllb:fast") is None
+    assert tm.lookup("Good morning", model="nllb:quality").model == "nllb:quality"
+    # Learned pairs never serve near-duplicates, even with fuzzy matching on
+    assert tm.lookup("good morning", model="nllb:quality") is None
+
+    tm.add("Good morning", "curated")
+    match = tm.lookup("Good morning", model="nllb:quality")
+    assert (match.translation, match.model) == ("curated", None)
+    assert tm.lookup("Good morning", model="mt5:quality").translation == "curated"
+
+
+def test_fuzzy_matching_is_off_by_default():
+    tm = TranslationMemory(min_score=0.5)
+    tm.add("Where is the railway station?", "रेलवे स्टेशन कहाँ है?")
+    assert tm.lookup("where is the railway station") is None
+    assert tm.stats()["fuzzy"] is False
+
+
+@pytest.mark.parametrize("stored, query", [
+    ("The ticket costs 500 rupees.", "The ticket costs 800 rupees."),
+    ("I liked the movie very much.", "I disliked the movie very much."),
+    ("This road is open today.", "This road isn't open today."),
+    ("Please do not close the door.", "Please do close the door."),
+])
+def test_fuzzy_hits_are_rejected_when_numbers_or_negations_differ(stored, query):
+    tm = TranslationMemory(min_score=0.5, fuzzy=True)
+    tm.add(stored, "target")
+    assert tm.lookup(query) is None
+    assert tm.lookup(stored.upper()).match == "fuzzy"
+
+
+def test_import_skips_empty_pairs_and_keeps_existing_without_overwrite():
+    tm = TranslationMemory()
+    assert tm.import_pairs([("a", "b"), ("", "x"), ("c", "")]) == {"added": 1, "skipped": 2}
+    assert not tm.add("a", "other", overwrite=False)
+    assert tm.lookup("a").translation == "b"
+    assert tm.add("a", "other")
+    assert tm.lookup("a").translation == "other"
+
+
+def test_persistent_memory_is_shared_after_load_and_refresh(tmp_path):
+    path = str(tmp_path / "tm.db")
+    writer = TranslationMemory(path, refresh_seconds=0)
+    writer.add("Thank you very much", "बहुत धन्यवाद")
+
+    reader = TranslationMemory(path, refresh_seconds=0)
+    assert not reader.loaded
+    assert reader.lookup("Thank you very much") is None
+    reader.load()
+    assert reader.lookup("Thank you very much").translation == "बहुत धन्यवाद"
+
+    writer.add("See you tomorrow", "कल मिलते हैं")
+    assert reader.lookup("See you tomorrow").translation == "कल मिलते हैं"
+
+    writer.clear()
+    assert reader.lookup("Thank you very much") is None
+    assert reader.size() == 0
+
+
+def test_meta_values_persist(tmp_path):
+    path = str(tmp_path / "tm.db")
+    TranslationMemory(path).set_meta("history_id", 42)
+    assert TranslationMemory(path).get_meta("history_id") == "42"
+    assert TranslationMemory().get_meta("history_id", "0") == "0"
@@ -0,0 +1,89 @@
+import os
+import threading
+import time
+import wave
+
+import pytest
+
+from tts_cache import TTSCache, ToneSynthesizer
+
+
+class CountingSynthesizer(ToneSynthesizer):
+    def __init__(self, delay=0.0, fail=False):
+        super().__init__()
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    def synthesize(self, text, lang, slow, path):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("engine down")
+        super().synthesize(text, lang, slow, path)
+
+
+def test_concurrent_requests_share_one_synthesis(tmp_path):
+    synthesizer = CountingSynthesizer(delay=0.1)
+    cache = TTSCache(str(tmp_path), synthesizer=synthesizer)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_synthesize("नमस्ते दुनिया")))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert synthesizer.calls == 1
+    assert len(set(results)) == 1
+    with wave.open(results[0][1]) as audio:
+        assert audio.getnframes() > 0
+
+    cache.get_or_synthesize("नमस्ते दुनिया")
+    assert synthesizer.calls == 1
+    stats = cache.stats()
+    assert (stats["misses"], stats["entries"], stats["in_flight"]) == (1, 1, 0)
+
+
+def test_keys_depend_on_language_and_speed(tmp_path):
+    cache = TTSCache(str(tmp_path), synthesizer=ToneSynthesizer())
+    keys = {cache.make_key("hello", "hi", False), cache.make_key("hello", "en", False),
+            cache.make_key("hello", "hi", True)}
+    assert len(keys) == 3
+    assert cache.make_key(" hello ") == cache.make_key("hello")
+
+
+def test_least_recently_used_audio_is_evicted(tmp_path):
+    cache = TTSCache(str(tmp_path), synthesizer=ToneSynthesizer())
+    size = os.path.getsize(cache.get_or_synthesize("one")[1])
+    cache.max_bytes = int(size * 2.5)
+    cache.get_or_synthesize("two")
+    cache.get_or_synthesize("one")          # now most recently used
+    cache.get_or_synthesize("six")
+
+    assert cache.stats()["evictions"] == 1
+    assert os.path.exists(cache.path_for(cache.make_key("one")))
+    assert not os.path.exists(cache.path_for(cache.make_key("two")))
+
+
+def test_open_serves_audio_and_a_new_cache_reuses_it(tmp_path):
+    cache = TTSCache(str(tmp_path), synthesizer=ToneSynthesizer())
+    key, handle = cache.open("reuse me")
+    with handle:
+        assert handle.read(4) == b"RIFF"
+
+    synthesizer = CountingSynthesizer()
+    restarted = TTSCache(str(tmp_path), synthesizer=synthesizer)
+    assert restarted.get_or_synthesize("reuse me")[0] == key
+    assert synthesizer.calls == 0 and restarted.stats()["hits"] == 1
+
+
+def test_failed_synthesis_is_not_cached(tmp_path):
+    synthesizer = CountingSynthesizer(fail=True)
+    cache = TTSCache(str(tmp_path), synthesizer=synthesizer)
+    for _ in range(2):
+        with pytest.raises(RuntimeError, match="engine down"):
+            cache.get_or_synthesize("broken")
+    assert synthesizer.calls == 2
+    assert cache.stats()["entries"] == 0
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".part")]
@@ -0,0 +1,182 @@
+# ------------------------------------------------------------
+# tracing.py — Opt-in per-stage request tracing, Server-Timing and sampled profiling
+# ------------------------------------------------------------
+import contextvars
+import cProfile
+import json
+import os
+import pstats
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+TRACE_STAGES = os.getenv("TRACE_STAGES", "0") == "1"            # Server-Timing header on responses
+TRACE_LOG = os.getenv("TRACE_LOG", "0") == "1"                  # one JSON log line per traced request
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+
+# Traces the current code is working for. A tuple, because one micro-batch
+# (or one generate call) can serve several requests at once.
+_active = contextvars.ContextVar("active_traces", default=())
+_profiling = threading.local()
+
+
+class Trace:
+    """
+    Stage timings for one request, measured with a monotonic clock.
+
+    Stages recorded in other threads (inference executor, batch worker) land
+    here as long as they run inside `activate()` for this trace. Repeated
+    stages are summed, e.g. two tokenize calls for one document request.
+    """
+
+    def __init__(self, name, profile=False):
+        self.name = name
+        self.id = uuid.uuid4().hex[:12]
+        self.profile = profile
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._profiles = []
+        self._start = time.perf_counter()
+        self.duration = None
+
+    def record(self, stage, seconds):
+        with self._lock:
+            self._stages[stage] = self._stages.get(stage, 0.0) + seconds
+
+    def add_profile(self, profiler):
+        with self._lock:
+            self._profiles.append(profiler)
+
+    def stages(self):
+        with self._lock:
+            return dict(self._stages)
+
+    def server_timing(self):
+        """Format stages as a Server-Timing header value (durations in ms)."""
+        total = self.duration if self.duration is not None else time.perf_counter() - self._start
+        parts = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in self.stages().items()]
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+    def to_dict(self):
+        return {
+            "trace_id": self.id,
+            "name": self.name,
+            "total_ms": round((self.duration or 0.0) * 1000, 2),
+            "stages_ms": {stage: round(seconds * 1000, 2) for stage, seconds in self.stages().items()}
+        }
+
+    def dump_profile(self):
+        """Merge the collected per-thread profiles into one pstats file; returns its path."""
+        with self._lock:
+            profiles = list(self._profiles)
+        if not profiles:
+            return None
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        stats = pstats.Stats(profiles[0])
+        for profiler in profiles[1:]:
+            stats.add(profiler)
+        safe_name = self.name.strip("/").replace("/", "_") or "root"
+        path = os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{safe_name}-{self.id}.prof")
+        stats.dump_stats(path)
+        return path
+
+
+def active_traces():
+    return _active.get()
+
+
+@contextmanager
+def activate(traces):
+    """Attribute stages recorded inside the block to `traces` (any thread)."""
+    token = _active.set(tuple(traces))
+    try:
+        yield
+    finally:
+        _active.reset(token)
+
+
+def record(stage, seconds):
+    for trace in _active.get():
+        trace.record(stage, seconds)
+
+
+@contextmanager
+def stage(name):
+    """Time a block and record it as `name` on the active traces (no-op when none)."""
+    if not _active.get():
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def _start_profiler():
+    """Enable a profiler for this thread, or return None if one is already running."""
+    if getattr(_profiling, "on", False):
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Python 3.12+ allows one cProfile per process; skip rather than fail the request
+        return None
+    _profiling.on = True
+    return profiler
+
+
+def _stop_profiler(profiler, traces):
+    profiler.disable()
+    _profiling.on = False
+    for trace in traces:
+        trace.add_profile(profiler)
+
+
+def call(fn, *args, **kwargs):
+    """Run `fn`, under cProfile if an active trace was sampled for profiling."""
+    traces = [trace for trace in _active.get() if trace.profile]
+    profiler = _start_profiler() if traces else None
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        if profiler is not None:
+            _stop_profiler(profiler, traces)
+
+
+def enabled():
+    return TRACE_STAGES or TRACE_LOG or PROFILE_SAMPLE_RATE > 0
+
+
+@contextmanager
+def trace_request(name):
+    """
+    Trace one request when tracing is enabled, yielding the Trace (or None).
+    On exit, logs a JSON line (TRACE_LOG) and dumps a profile if sampled.
+    """
+    if not enabled():
+        yield None
+        return
+    trace = Trace(name, profile=random.random() < PROFILE_SAMPLE_RATE)
+    token = _active.set(_active.get() + (trace,))
+    profiler = _start_profiler() if trace.profile else None
+    try:
+        yield trace
+    finally:
+        if profiler is not None:
+            _stop_profiler(profiler, [trace])
+        _active.reset(token)
+        trace.duration = time.perf_counter() - trace._start
+        entry = trace.to_dict()
+        if trace.profile:
+            try:
+                entry["profile"] = trace.dump_profile()
+            except Exception as e:
+                print(f"[WARN] Failed to write profile for {name}: {e}")
+        if TRACE_LOG:
+            print(json.dumps(dict(entry, event="trace"), ensure_ascii=False), flush=True)
@@ -0,0 +1,133 @@
+# ------------------------------------------------------------
+# translation_cache.py — LRU/TTL translation cache with optional SQLite store
+# ------------------------------------------------------------
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_source(text):
+    """Collapse whitespace so trivially different inputs share a cache entry."""
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def make_cache_key(model_key, text, settings=None):
+    """Builds a stable key from model, normalised source text and generation settings."""
+    payload = json.dumps(
+        [model_key, normalize_source(text), settings or {}],
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+    """
+    Size-bounded LRU cache of translations with optional TTL.
+
+    When `db_path` is given, entries are also written to a SQLite table so warm
+    entries survive restarts; memory misses fall through to the disk store.
+    """
+
+    def __init__(self, max_size=10000, ttl_seconds=None, db_path=None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.db_path = db_path
+        self._db = None
+        if db_path:
+            self._connect()
+            # SQLite connections must not be shared across fork (preloaded gunicorn workers)
+            os.register_at_fork(after_in_child=self._connect)
+
+    def _connect(self):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS translation_cache "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def _expired(self, created):
+        return self.ttl_seconds is not None and time.time() - created > self.ttl_seconds
+
+    def _load_from_disk(self, key):
+        row = self._db.execute(
+            "SELECT value, created FROM translation_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, created = row
+        if self._expired(created):
+            self._db.execute("DELETE FROM translation_cache WHERE key = ?", (key,))
+            self._db.commit()
+            return None
+        return value, created
+
+    def _store(self, key, value, created):
+        self._entries[key] = (value, created)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key):
+        """Returns the cached translation for `key`, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[1]):
+                del self._entries[key]
+                entry = None
+            if entry is None and self._db is not None:
+                entry = self._load_from_disk(key)
+                if entry is not None:
+                    self._store(key, *entry)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """Stores a translation, evicting the least recently used entry if full."""
+        created = time.time()
+        with self._lock:
+            self._store(key, value, created)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO translation_cache (key, value, created) VALUES (?, ?, ?)",
+                    (key, value, created)
+                )
+                self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM translation_cache")
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "persistent": self._db is not None,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
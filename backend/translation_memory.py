@@ -0,0 +1,405 @@
+# ------------------------------------------------------------
+# translation_memory.py — Exact and fuzzy (character n-gram) translation memory
+# ------------------------------------------------------------
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, namedtuple
+
+from translation_cache import normalize_source
+
+# translation: stored target text; score: 1.0 for exact, Dice similarity for fuzzy;
+# match: "exact" or "fuzzy"; source: the stored source sentence; origin: "import" or "history";
+# model: the key a learned entry was stored under (None for curated pairs)
+TMMatch = namedtuple("TMMatch", "translation score match source origin model")
+
+_EPSILON = 1e-9
+
+# Small edits that flip the meaning while keeping the n-grams almost identical
+_NUMBER_RE = re.compile(r"\d+")
+_WORD_RE = re.compile(r"\w+(?:'\w+)?")
+NEGATION_WORDS = frozenset({"no", "not", "never", "none", "nobody", "nothing", "nowhere", "neither", "nor",
+                            "without", "cannot"})
+NEGATION_PREFIXES = ("dis", "un", "non", "in", "im", "ir", "il", "mis")
+
+
+def char_ngrams(text, n=3):
+    """Character n-grams of the case-folded, whitespace-collapsed text, padded with spaces."""
+    padded = f" {normalize_source(text).casefold()} "
+    if len(padded) <= n:
+        return frozenset([padded])
+    return frozenset(padded[i:i + n] for i in range(len(padded) - n + 1))
+
+
+def _meaning_markers(text):
+    words = _WORD_RE.findall(normalize_source(text).casefold())
+    negations = sorted(w for w in words if w in NEGATION_WORDS or w.endswith("n't"))
+    return tuple(_NUMBER_RE.findall(text)), negations, set(words)
+
+
+def same_meaning_markers(a, b):
+    """
+    False when two similar sentences differ in their numbers or negation ("500" vs "800",
+    "is" vs "isn't", "liked" vs "disliked"), which character n-gram similarity barely sees.
+    """
+    numbers_a, negations_a, words_a = _meaning_markers(a)
+    numbers_b, negations_b, words_b = _meaning_markers(b)
+    if numbers_a != numbers_b or negations_a != negations_b:
+        return False
+    for x in words_a - words_b:
+        for y in words_b - words_a:
+            longer, shorter = (x, y) if len(x) > len(y) else (y, x)
+            if longer.endswith(shorter) and longer[:-len(shorter)] in NEGATION_PREFIXES:
+                return False
+    return True
+
+
+def _pair_fields(pair):
+    """(source, target) from a dict with english/hindi or source/target keys, or a 2-tuple."""
+    if isinstance(pair, dict):
+        source = pair.get("source", pair.get("english"))
+        target = pair.get("target", pair.get("hindi"))
+    else:
+        source, target = pair[0], pair[1]
+    return normalize_source(source), (target or "").strip()
+
+
+class _PairIndex:
+    """Entries of one language pair: an exact-match map plus an inverted n-gram index."""
+
+    def __init__(self):
+        self.exact = {}        # normalized source -> entry id
+        self.entries = {}      # entry id -> (source, target, origin, grams)
+        self.postings = {}     # n-gram -> ids of entries containing it
+        self._next_id = 0
+
+    def add(self, source, target, origin, grams):
+        old = self.exact.get(source)
+        if old is not None:
+            self.remove(old)
+        entry_id = self._next_id
+        self._next_id += 1
+        self.exact[source] = entry_id
+        self.entries[entry_id] = (source, target, origin, grams)
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(entry_id)
+
+    def remove(self, entry_id):
+        source, _, _, grams = self.entries.pop(entry_id)
+        del self.exact[source]
+        for gram in grams:
+            ids = self.postings[gram]
+            ids.discard(entry_id)
+            if not ids:
+                del self.postings[gram]
+
+    def search(self, grams, min_score, limit):
+        """
+        Entries whose Dice similarity to `grams` is at least `min_score`, best first.
+
+        Only the postings of the rarest query n-grams are scanned: an entry must
+        share at least `min_overlap` n-grams, so it cannot miss more than
+        `size - min_overlap` of any scanned set. Common n-grams (" th", "the", ...)
+        are never read, and entries sharing too few scanned n-grams are never scored.
+        """
+        size = len(grams)
+        # Widened by _EPSILON so float rounding (1.4 * 3 / 0.6 = 6.999...) never prunes an
+        # entry scoring exactly `min_score`; the score itself is compared below.
+        min_len = math.ceil(min_score * size / (2 - min_score) - _EPSILON)
+        max_len = math.floor((2 - min_score) * size / min_score + _EPSILON) if min_score > 0 else math.inf
+        min_overlap = max(1, math.ceil(min_score * (size + min_len) / 2 - _EPSILON))
+        rarest = sorted(grams, key=lambda gram: len(self.postings.get(gram, ())))
+        # Scanning twice the minimal prefix costs a few more postings but prunes far more candidates
+        prefix = size - min_overlap + 1
+        scanned = min(size, 2 * prefix)
+        required = scanned - prefix + 1
+        shared = Counter()
+        for gram in rarest[:scanned]:
+            shared.update(self.postings.get(gram, ()))
+
+        scored = []
+        for entry_id, count in shared.items():
+            if count < required:
+                continue
+            entry_grams = self.entries[entry_id][3]
+            if not min_len <= len(entry_grams) <= max_len:
+                continue
+            score = 2 * len(grams & entry_grams) / (size + len(entry_grams))
+            if score >= min_score:
+                scored.append((score, entry_id))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return scored[:limit]
+
+
+class TranslationMemory:
+    """
+    Source → target pairs looked up before model inference.
+
+    Curated pairs serve every model. Pairs learned from a model's output are
+    kept under the caller's key (model and decoding settings) and only serve
+    requests with that same key, so a hit is never another model's translation
+    under the requested model's name.
+    An exact hit needs the same whitespace-normalized source. With `fuzzy`,
+    lookups may also return the closest *curated* source by character n-gram
+    Dice similarity if it scores at least `min_score` and has the same numbers
+    and negations; learned pairs only ever match exactly. Fuzzy hits can still
+    change the meaning ("Monday" vs "Friday"), so they are off by default.
+    With `db_path`, pairs live in a SQLite table
+    and every process keeps an in-memory index, picking up rows added by other
+    workers at most `refresh_seconds` after they were written. The index starts
+    empty; `load()` reads the table (call it off the request path at startup).
+    """
+
+    def __init__(self, db_path=None, min_score=0.9, ngram=3, refresh_seconds=5.0, fuzzy=False):
+        self.min_score = min_score
+        self.fuzzy = fuzzy
+        self.ngram = ngram
+        self.refresh_seconds = refresh_seconds
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._pairs = {}            # (src_lang, tgt_lang, model or "") -> _PairIndex
+        self._meta = {}
+        self._last_row = 0
+        self._generation = 0
+        self._last_refresh = 0.0
+        self.exact_hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+        self._db = None
+        self.loaded = not db_path
+        if db_path:
+            self._connect()
+            # SQLite connections must not be shared across fork (preloaded gunicorn workers)
+            os.register_at_fork(after_in_child=self._connect)
+
+    def _connect(self):
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # AUTOINCREMENT keeps ids increasing after deletes, so `id > last seen` finds every new row
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS translation_memory ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, src_lang TEXT NOT NULL, tgt_lang TEXT NOT NULL, "
+            "model TEXT NOT NULL DEFAULT '', source TEXT NOT NULL, target TEXT NOT NULL, "
+            "origin TEXT NOT NULL, created REAL NOT NULL, UNIQUE (src_lang, tgt_lang, model, source))"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS translation_memory_meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self._db.commit()
+
+    # --------------------------------------------------------
+    # Index maintenance
+    # --------------------------------------------------------
+    def _index_pair(self, src_lang, tgt_lang, model, source, target, origin):
+        index = self._pairs.get((src_lang, tgt_lang, model))
+        if index is None:
+            index = self._pairs[(src_lang, tgt_lang, model)] = _PairIndex()
+        index.add(source, target, origin, char_ngrams(source, self.ngram))
+
+    def _stored_generation(self):
+        row = self._db.execute(
+            "SELECT value FROM translation_memory_meta WHERE name = 'generation'"
+        ).fetchone()
+        return int(row[0]) if row else 0
+
+    def load(self):
+        """Index every stored pair; lookups before this only see pairs added in this process."""
+        self.refresh(force=True)
+        self.loaded = True
+
+    def refresh(self, force=False):
+        """Index rows written since the last refresh (by this or another process)."""
+        if not self.db_path:
+            return
+        if not force and (not self.loaded or time.monotonic() - self._last_refresh < self.refresh_seconds):
+            return
+        with self._lock:
+            self._last_refresh = time.monotonic()
+            generation = self._stored_generation()
+            if generation != self._generation:
+                # Cleared elsewhere: rebuild from scratch
+                self._pairs.clear()
+                self._last_row = 0
+                self._generation = generation
+            rows = self._db.execute(
+                "SELECT id, src_lang, tgt_lang, model, source, target, origin FROM translation_memory "
+                "WHERE id > ? ORDER BY id", (self._last_row,)
+            ).fetchall()
+            for row_id, src_lang, tgt_lang, model, source, target, origin in rows:
+                self._index_pair(src_lang, tgt_lang, model, source, target, origin)
+                self._last_row = row_id
+
+    # --------------------------------------------------------
+    # Writes
+    # --------------------------------------------------------
+    def import_pairs(self, pairs, src_lang="en", tgt_lang="hi", origin="import", overwrite=True, model=None,
+                     chunk_size=1000):
+        """
+        Bulk-add pairs (dicts with english/hindi or source/target keys, optionally
+        src_lang/tgt_lang/model; or (source, target) tuples). Pairs without a
+        model are curated. Existing entries for the same source are replaced;
+        with overwrite=False they are kept. Returns counts of added and skipped pairs.
+        """
+        added = skipped = 0
+        chunk = []
+
+        def flush():
+            nonlocal added, skipped
+            with self._lock:
+                for pair_src, pair_tgt, pair_model, source, target in chunk:
+                    index = self._pairs.get((pair_src, pair_tgt, pair_model))
+                    if not overwrite and index is not None and source in index.exact:
+                        skipped += 1
+                        continue
+                    if self._db is not None:
+                        verb = "INSERT OR REPLACE" if overwrite else "INSERT OR IGNORE"
+                        cursor = self._db.execute(
+                            f"{verb} INTO translation_memory "
+                            "(src_lang, tgt_lang, model, source, target, origin, created) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (pair_src, pair_tgt, pair_model, source, target, origin, time.time())
+                        )
+                        if not cursor.rowcount:
+                            skipped += 1
+                            continue
+                    self._index_pair(pair_src, pair_tgt, pair_model, source, target, origin)
+                    added += 1
+                if self._db is not None:
+                    self._db.commit()
+            chunk.clear()
+
+        for pair in pairs:
+            source, target = _pair_fields(pair)
+            if not source or not target:
+                skipped += 1
+                continue
+            if isinstance(pair, dict):
+                chunk.append((pair.get("src_lang") or src_lang, pair.get("tgt_lang") or tgt_lang,
+                              pair.get("model") or model or "", source, target))
+            else:
+                chunk.append((src_lang, tgt_lang, model or "", source, target))
+            if len(chunk) >= chunk_size:
+                flush()
+        flush()
+        return {"added": added, "skipped": skipped}
+
+    def add(self, source, target, src_lang="en", tgt_lang="hi", origin="import", overwrite=True, model=None):
+        """Add one pair; returns True if it was stored."""
+        return self.import_pairs([(source, target)], src_lang, tgt_lang, origin, overwrite, model)["added"] == 1
+
+    def clear(self):
+        with self._lock:
+            self._pairs.clear()
+            if self._db is not None:
+                self._generation = self._stored_generation() + 1
+                self._db.execute("DELETE FROM translation_memory")
+                self._db.execute(
+                    "INSERT OR REPLACE INTO translation_memory_meta (name, value) VALUES ('generation', ?)",
+                    (str(self._generation),)
+                )
+                self._db.commit()
+                self._last_row = self._db.execute(
+                    "SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name = 'translation_memory'"
+                ).fetchone()[0]
+
+    # --------------------------------------------------------
+    # Lookups
+    # --------------------------------------------------------
+    def search(self, text, src_lang="en", tgt_lang="hi", model=None, min_score=None, limit=5):
+        """
+        Up to `limit` stored pairs similar to `text`, best first (an exact match
+        scores 1.0): curated pairs, similar or exact, plus an exact pair learned
+        under `model`. On equal scores curated pairs come first. This lists
+        candidates regardless of `fuzzy`; `lookup` decides what may be served.
+        """
+        source = normalize_source(text)
+        if not source:
+            return []
+        min_score = self.min_score if min_score is None else min_score
+        self.refresh()
+        grams = char_ngrams(source, self.ngram)
+        with self._lock:
+            found = []
+            for rank, key in enumerate(["", model] if model else [""]):
+                index = self._pairs.get((src_lang, tgt_lang, key))
+                if index is None:
+                    continue
+                exact_id = index.exact.get(source)
+                if exact_id is not None:
+                    _, target, origin, _ = index.entries[exact_id]
+                    found.append((1.0, 0, rank, TMMatch(target, 1.0, "exact", source, origin, key or None)))
+                if key or min_score > 1.0:
+                    continue  # learned pairs only match exactly
+                for score, entry_id in index.search(grams, min_score, limit + 1):
+                    if entry_id == exact_id:
+                        continue
+                    stored, target, origin, _ = index.entries[entry_id]
+                    found.append((score, 1, rank, TMMatch(target, round(score, 4), "fuzzy", stored, origin, key or None)))
+            found.sort(key=lambda item: (-item[0], item[1], item[2]))
+            return [item[3] for item in found[:limit]]
+
+    def lookup(self, text, src_lang="en", tgt_lang="hi", model=None):
+        """
+        The exact match (curated, or learned under `model`), else with `fuzzy` the best
+        curated match scoring at least `min_score` whose numbers and negations agree, or None.
+        """
+        if self.fuzzy:
+            candidates = self.search(text, src_lang, tgt_lang, model, limit=5)
+        else:
+            candidates = self.search(text, src_lang, tgt_lang, model, min_score=math.inf, limit=1)
+        match = next((m for m in candidates if m.match == "exact" or same_meaning_markers(text, m.source)), None)
+        with self._lock:
+            if match is None:
+                self.misses += 1
+            elif match.match == "exact":
+                self.exact_hits += 1
+            else:
+                self.fuzzy_hits += 1
+            return match
+
+    # --------------------------------------------------------
+    # Bookkeeping
+    # --------------------------------------------------------
+    def get_meta(self, name, default=None):
+        with self._lock:
+            if self._db is None:
+                return self._meta.get(name, default)
+            row = self._db.execute("SELECT value FROM translation_memory_meta WHERE name = ?", (name,)).fetchone()
+            return row[0] if row else default
+
+    def set_meta(self, name, value):
+        with self._lock:
+            if self._db is None:
+                self._meta[name] = str(value)
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO translation_memory_meta (name, value) VALUES (?, ?)", (name, str(value))
+            )
+            self._db.commit()
+
+    def size(self):
+        with self._lock:
+            return sum(len(index.entries) for index in self._pairs.values())
+
+    def stats(self):
+        with self._lock:
+            lookups = self.exact_hits + self.fuzzy_hits + self.misses
+            return {
+                "entries": self.size(),
+                "language_pairs": {
+                    f"{src}-{tgt}" + (f":{model}" if model else ""): len(index.entries)
+                    for (src, tgt, model), index in self._pairs.items()
+                },
+                "exact_hits": self.exact_hits,
+                "fuzzy_hits": self.fuzzy_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.exact_hits + self.fuzzy_hits) / lookups, 4) if lookups else 0.0,
+                "fuzzy": self.fuzzy,
+                "min_score": self.min_score,
+                "ngram": self.ngram,
+                "persistent": self.db_path is not None,
+                "loaded": self.loaded
+            }
@@ -0,0 +1,260 @@
+# ------------------------------------------------------------
+# tts_cache.py — Content-addressed on-disk cache for synthesized speech
+# ------------------------------------------------------------
+import hashlib
+import importlib
+import json
+import math
+import os
+import struct
+import tempfile
+import threading
+import time
+import wave
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+# ------------------------------------------------------------
+# 🔊 Synthesizers
+# ------------------------------------------------------------
+class GTTSSynthesizer:
+    """Google Text-to-Speech (network) — the default engine."""
+
+    name = "gtts"
+    suffix = ".mp3"
+    media_type = "audio/mpeg"
+
+    def synthesize(self, text, lang, slow, path):
+        from gtts import gTTS
+        gTTS(text=text, lang=lang, slow=slow).save(path)
+
+
+class ToneSynthesizer:
+    """
+    Offline stand-in: a short WAV tone per word, so the cache and endpoints can
+    be exercised without network access. Slow speech doubles each tone.
+    """
+
+    name = "tone"
+    suffix = ".wav"
+    media_type = "audio/wav"
+
+    def __init__(self, sample_rate=8000, tone_seconds=0.12):
+        self.sample_rate = sample_rate
+        self.tone_seconds = tone_seconds
+
+    def synthesize(self, text, lang, slow, path):
+        frames = bytearray()
+        samples_per_word = int(self.sample_rate * self.tone_seconds * (2 if slow else 1))
+        for word in text.split() or [""]:
+            frequency = 300 + (sum(map(ord, word)) % 500)
+            for i in range(samples_per_word):
+                value = int(12000 * math.sin(2 * math.pi * frequency * i / self.sample_rate))
+                frames += struct.pack("<h", value)
+        with wave.open(path, "wb") as out:
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(self.sample_rate)
+            out.writeframes(bytes(frames))
+
+
+SYNTHESIZERS = {"gtts": GTTSSynthesizer, "tone": ToneSynthesizer}
+
+
+def load_synthesizer(spec="gtts"):
+    """Builds a synthesizer from a registered name or a `module:ClassName` path."""
+    if spec in SYNTHESIZERS:
+        return SYNTHESIZERS[spec]()
+    module_name, _, class_name = spec.partition(":")
+    if not class_name:
+        raise ValueError(f"Unknown TTS engine '{spec}' (use {', '.join(SYNTHESIZERS)} or module:Class)")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+# ------------------------------------------------------------
+# 🗄️ Audio Cache
+# ------------------------------------------------------------
+class TTSCache:
+    """
+    Synthesized audio stored under a hash of (engine, text, language, speed).
+
+    Files are written to a temp name and renamed into place, so readers never
+    see partial audio and worker processes can share one directory. Concurrent
+    requests for the same key in a process wait on a single synthesis. Total
+    size is kept under `max_bytes` by evicting least-recently-used files (file
+    mtime is bumped on every hit so recency survives restarts).
+    """
+
+    def __init__(self, cache_dir, max_bytes=200 * 2**20, synthesizer=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.synthesizer = synthesizer or GTTSSynthesizer()
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()       # key -> size in bytes, least recently used first
+        self._pending = {}                  # key -> Future shared by concurrent requests
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        """Index audio already on disk, oldest first, and drop abandoned partial writes."""
+        files = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith(".part"):
+                try:
+                    if time.time() - os.path.getmtime(path) > 600:
+                        os.unlink(path)
+                except OSError:
+                    pass
+                continue
+            if not name.endswith(self.synthesizer.suffix):
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, name[:-len(self.synthesizer.suffix)], stat.st_size))
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._bytes += size
+
+    def _adopt(self, key, path):
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        self._entries[key] = size
+        self._bytes += size
+        self._evict()
+
+    def make_key(self, text, lang="hi", slow=False):
+        payload = json.dumps([self.synthesizer.name, text.strip(), lang, bool(slow)], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, key + self.synthesizer.suffix)
+
+    @property
+    def media_type(self):
+        return self.synthesizer.media_type
+
+    def _evict(self):
+        """Drop LRU files until under budget. Caller holds the lock."""
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+            try:
+                os.unlink(self.path_for(key))
+            except FileNotFoundError:
+                pass
+
+    def _synthesize(self, key, text, lang, slow):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+        os.close(fd)
+        try:
+            self.synthesizer.synthesize(text, lang, slow, tmp_path)
+            os.replace(tmp_path, self.path_for(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return os.path.getsize(self.path_for(key))
+
+    def get_or_synthesize(self, text, lang="hi", slow=False):
+        """Return (key, path) of the audio for this text, synthesizing it at most once."""
+        key = self.make_key(text, lang, slow)
+        path = self.path_for(key)
+        with self._lock:
+            if os.path.exists(path):
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                else:
+                    # Written by another worker process sharing the directory
+                    self._adopt(key, path)
+                self.hits += 1
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+                return key, path
+            future = self._pending.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._pending[key] = future
+                self.misses += 1
+
+        if not owner:
+            future.result()
+            return key, path
+
+        try:
+            size = self._synthesize(key, text, lang, slow)
+            with self._lock:
+                self._bytes -= self._entries.pop(key, 0)
+                self._entries[key] = size
+                self._bytes += size
+                self._evict()
+            future.set_result(path)
+            return key, path
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def open(self, text, lang="hi", slow=False):
+        """Return (key, open binary file) for the audio; the handle stays valid even if evicted."""
+        for _ in range(3):
+            key, path = self.get_or_synthesize(text, lang, slow)
+            try:
+                return key, open(path, "rb")
+            except FileNotFoundError:
+                # Evicted (possibly by another worker) between lookup and open: forget it and retry
+                with self._lock:
+                    self._bytes -= self._entries.pop(key, 0)
+        raise RuntimeError("Audio was evicted before it could be served")
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                try:
+                    os.unlink(self.path_for(key))
+                except FileNotFoundError:
+                    pass
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "engine": self.synthesizer.name,
+                "entries": len(self._entries),
+                "size_mb": round(self._bytes / 2**20, 2),
+                "max_mb": round(self.max_bytes / 2**20, 2),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "in_flight": len(self._pending)
+            }
+
+
+def iter_file(handle, chunk_size=64 * 1024):
+    """Yield a file's contents in chunks, closing it at the end."""
+    try:
+        while True:
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        handle.close()
@@ -1,7 +1,7 @@
 import { useState, useEffect, useRef } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import { FaVolumeUp, FaMicrophone, FaCopy, FaDownload, FaStop } from 'react-icons/fa';
-import { translateText, textToSpeech, getModels } from '../services/api';
+import { translateText, scoreTranslation, textToSpeech, getModels } from '../services/api';
 import './Translation.css';
 
 const Translation = () => {
@@ -18,6 +18,7 @@ const Translation = () => {
   const [playingAudio, setPlayingAudio] = useState(false);
   const [playingEnglish, setPlayingEnglish] = useState(false);
   const recognitionRef = useRef(null);
+  const translationRequestRef = useRef(0);
 
   useEffect(() => {
     loadModels();
@@ -26,7 +27,7 @@ const Translation = () => {
   const loadModels = async () => {
     try {
       const data = await getModels();
-      setModels(Object.keys(data.models || {}));
+      setModels([...Object.keys(data.models || {}), ...Object.keys(data.pseudo_models || {})]);
     } catch (error) {
       console.error('Error loading models:', error);
     }
@@ -35,6 +36,7 @@ const Translation = () => {
   const handleTranslate = async () => {
     if (!englishText.trim()) return;
 
+    const requestId = ++translationRequestRef.current;
     setLoading(true);
     setHindiText('');
     setBleuScore(null);
@@ -46,10 +48,8 @@ const Translation = () => {
       } else {
         setHindiText(result.translation || '');
         setTimeTaken(result.time_taken || 0);
-        setModelUsed(result.model_used || selectedModel);
-        // Live metrics from backend
-        if (result.bleu !== undefined) setBleuScore(result.bleu);
-        if (result.meteor !== undefined) setMeteorScore(result.meteor);
+        setModelUsed(result.served_by === 'tm' ? 'translation memory' : result.model_used || selectedModel);
+        loadScores(requestId, englishText, result.translation || '');
       }
     } catch (error) {
       setHindiText(`Error: ${error.message}`);
@@ -58,6 +58,20 @@ const Translation = () => {
     }
   };
 
+  // Live metrics arrive after the translation is already on screen
+  const loadScores = async (requestId, text, translation) => {
+    if (!translation) return;
+    try {
+      const scores = await scoreTranslation(text, translation);
+      // Ignore scores for a translation that has since been replaced
+      if (requestId !== translationRequestRef.current) return;
+      if (scores.bleu !== null && scores.bleu !== undefined) setBleuScore(scores.bleu);
+      if (scores.meteor !== null && scores.meteor !== undefined) setMeteorScore(scores.meteor);
+    } catch (error) {
+      console.error('Error loading scores:', error);
+    }
+  };
+
   // ─── Speaker: Play Hindi translation using backend TTS (gTTS) ───
   const handlePlayAudio = async () => {
     if (!hindiText.trim() || playingAudio) return;
@@ -10,10 +10,16 @@ const api = axios.create({
 });
 
 export const translateText = async (text, model = 'nllb') => {
+  // Scores are fetched separately (scoreTranslation) so the translation shows up first
   const response = await api.post(`/translate?model=${model}`, { text });
   return response.data;
 };
 
+export const scoreTranslation = async (text, translation) => {
+  const response = await api.post('/translate/score', { text, translation });
+  return response.data;
+};
+
 export const textToSpeech = async (text) => {
   const response = await api.post('/tts', { text }, { responseType: 'blob' });
   return response.data;